@@ -1,4 +1,7 @@
+import contextvars
 import os
+import logging
+from contextlib import closing
 from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_restful import Api, Resource
 from flask_cors import CORS
@@ -14,10 +17,17 @@ from demo_data_generator import DemoStockDataGenerator
 from crypto_service import CryptoDataService
 from crypto_backtest_service import CryptoBacktestService
 from streaming_backtest_service import StreamingBacktestService
+from backtest_worker_pool import BacktestWorkerPool, WorkerPoolBusyError
+from backtest_job_queue import BacktestJobQueue, JobQueueUnavailableError
+from cache_warmer import CacheWarmer
+from backtest_result_format import RESULT_FORMATS, COLUMNAR_MEDIA_TYPE, convert_result, lossless_format
+from chart_downsampling import DEFAULT_CHART_POINTS, downsample_result
 from travel_api import travel_bp
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 Compress(app)  # Enable gzip/brotli compression for all responses
@@ -53,7 +63,16 @@ crypto_service = CryptoDataService(
 
 # Initialize crypto backtest service
 backtest_service = CryptoBacktestService(DB_CONFIG)
-streaming_backtest_service = StreamingBacktestService(DB_CONFIG)
+
+# Persistent worker pool shared by run-all and SSE streaming (workers start on first use)
+backtest_worker_pool = BacktestWorkerPool(DB_CONFIG)
+streaming_backtest_service = StreamingBacktestService(DB_CONFIG, worker_pool=backtest_worker_pool)
+
+# Long run-all and batch backtests submitted with "async": true run as jobs on the same pool
+backtest_job_queue = BacktestJobQueue(backtest_service, backtest_worker_pool)
+
+# Warms the backtest cache after price updates (runs in the update job); run-all requests feed its usage log
+cache_warmer = CacheWarmer(backtest_service)
 
 def serialize_for_json(obj):
     """Convert datetime and Decimal objects for JSON serialization"""
@@ -860,6 +879,67 @@ class CryptoStrategies(Resource):
         except Exception as e:
             return {'error': str(e)}, 500
 
+def requested_result_format(data):
+    """
+    Backtest result format negotiated from the request
+    
+    The body's 'result_format' ('rows', 'columnar', 'columnar32') wins; otherwise
+    an Accept header of application/vnd.backtest.columnar+json selects columnar.
+    'float32': true (or ';precision=float32' on the Accept header) picks the
+    float32 variant of the columnar format.
+    """
+    accept = request.headers.get('Accept', '')
+    result_format = data.get('result_format')
+    if result_format is None:
+        result_format = 'columnar' if COLUMNAR_MEDIA_TYPE in accept else 'rows'
+    if result_format == 'columnar' and (data.get('float32') or 'precision=float32' in accept):
+        result_format = 'columnar32'
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Invalid result_format '{result_format}' (expected one of {', '.join(RESULT_FORMATS)})")
+    return result_format
+
+def requested_max_points(data):
+    """
+    Chart point budget for price_history from the request
+    
+    Results are downsampled to 'max_points' (default BACKTEST_CHART_POINTS)
+    with every trade kept; 'full_resolution': true returns every bar.
+    """
+    if data.get('full_resolution'):
+        return None
+    try:
+        max_points = int(data.get('max_points', DEFAULT_CHART_POINTS))
+    except (TypeError, ValueError):
+        raise ValueError("max_points must be an integer")
+    if max_points < 10:
+        raise ValueError("max_points must be at least 10")
+    return max_points
+
+def submit_backtest_job(kind, data):
+    """
+    Queue a run-all or batch request as a background job ("async": true)
+    
+    Returns:
+        202 with the job's status and its URLs; poll the status, read results
+        page by page (also while it runs) or cancel it there
+    """
+    job_request = {
+        'strategy_id': data['strategy_id'],
+        'parameters': backtest_service.canonical_parameters(data['strategy_id'], data['parameters']),
+        'start_date': data.get('start_date'),
+        'end_date': data.get('end_date'),
+        'interval': data.get('interval', '1d'),
+        'result_format': requested_result_format(data),
+        'max_points': requested_max_points(data),
+        'low_memory': data.get('low_memory', False)
+    }
+    if kind == 'batch':
+        job_request['crypto_ids'] = data['crypto_ids']
+    job = backtest_job_queue.submit(kind, job_request)
+    job['status_url'] = f"/crypto/backtest/jobs/{job['job_id']}"
+    job['results_url'] = f"/crypto/backtest/jobs/{job['job_id']}/results"
+    return job, 202
+
 class CryptoBacktestRun(Resource):
     def post(self):
         """Run backtest for a single cryptocurrency with optional date range"""
@@ -884,9 +964,15 @@ class CryptoBacktestRun(Resource):
                 start_date=start_date,
                 end_date=end_date,
                 interval=interval,
-                use_daily_sampling=use_daily_sampling
+                use_daily_sampling=use_daily_sampling,
+                result_format=requested_result_format(data),
+                max_points=requested_max_points(data),
+                low_memory=data.get('low_memory', False)
             )
+            cache_warmer.record_request(data['strategy_id'], data['parameters'], start_date, end_date, interval)
             return result, 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': str(e)}, 500
 
@@ -899,8 +985,14 @@ class CryptoBacktestAll(Resource):
             return {'error': 'Missing required fields: strategy_id, parameters'}, 400
             
         try:
+            if data.get('async'):
+                cache_warmer.record_request(data['strategy_id'], data['parameters'], data.get('start_date'),
+                                            data.get('end_date'), data.get('interval', '1d'))
+                return submit_backtest_job('run-all', data)
+            
             # Check if parallel processing is requested (default: True for performance)
             use_parallel = data.get('use_parallel', True)
+            use_shared_memory = data.get('use_shared_memory', True)
             
             # Get optional date range and interval
             start_date = data.get('start_date')
@@ -910,6 +1002,10 @@ class CryptoBacktestAll(Resource):
             # Determine if we should use daily sampling based on interval
             use_daily_sampling = (interval == '1d')
             
+            # Daily data fits in one price panel: backtest every coin in a single vectorized pass
+            use_panel = data.get('use_panel', interval == '1d')
+            max_points = requested_max_points(data)
+            
             results = backtest_service.run_strategy_against_all_cryptos(
                 data['strategy_id'],
                 data['parameters'],
@@ -917,8 +1013,15 @@ class CryptoBacktestAll(Resource):
                 start_date=start_date,
                 end_date=end_date,
                 interval=interval,
-                use_daily_sampling=use_daily_sampling
+                use_daily_sampling=use_daily_sampling,
+                use_shared_memory=use_shared_memory,
+                worker_pool=backtest_worker_pool,
+                result_format=requested_result_format(data),
+                use_panel=use_panel,
+                low_memory=data.get('low_memory', False)
             )
+            cache_warmer.record_request(data['strategy_id'], data['parameters'], start_date, end_date, interval)
+            results = [downsample_result(result, max_points) for result in results]
             
             # Calculate summary statistics
             successful_results = [r for r in results if r.get('success', False)]
@@ -957,6 +1060,10 @@ class CryptoBacktestAll(Resource):
                 'results': results
             }, 200
             
+        except (WorkerPoolBusyError, JobQueueUnavailableError) as e:
+            return {'error': str(e)}, 503
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': str(e)}, 500
 
@@ -983,7 +1090,8 @@ class CryptoBacktestBatch(Resource):
             "start_date": "2024-01-01",     // Optional
             "end_date": "2024-12-31",       // Optional
             "interval": "1d",               // Optional, default: 1d
-            "use_parallel": true            // Optional, default: true
+            "use_parallel": true,           // Optional, default: true
+            "async": false                  // Optional: queue as a job, answer 202 with its ID
         }
         """
         data = request.get_json()
@@ -996,91 +1104,123 @@ class CryptoBacktestBatch(Resource):
             return {'error': 'crypto_ids must be a non-empty list'}, 400
         
         try:
+            if data.get('async'):
+                return submit_backtest_job('batch', data)
+            
             from concurrent.futures import ThreadPoolExecutor, as_completed
             from datetime import datetime as dt
             
-            strategy_id = data['strategy_id']
-            parameters = data['parameters']
-            start_date = data.get('start_date')
-            end_date = data.get('end_date')
-            interval = data.get('interval', '1d')
-            use_parallel = data.get('use_parallel', True)
-            use_daily_sampling = (interval == '1d')
-            
-            start_time = dt.now()
-            
-            # OPTIMIZATION 1: Batch fetch all price data in single query
-            logger.info(f"📊 Batch fetching price data for {len(crypto_ids)} cryptocurrencies...")
-            price_data_dict = backtest_service.get_price_data_batch(
-                crypto_ids=crypto_ids,
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                use_daily_sampling=use_daily_sampling
-            )
-            
-            fetch_time = (dt.now() - start_time).total_seconds()
-            logger.info(f"✅ Batch fetch completed in {fetch_time:.2f}s (vs {len(crypto_ids)}x individual queries)")
-            
-            results = {}
-            errors = []
-            
-            if use_parallel and len(crypto_ids) > 1:
-                # OPTIMIZATION 2: Parallel backtest execution
-                logger.info(f"🚀 Running {len(crypto_ids)} backtests in parallel...")
+            # Every database round trip of the request is counted for the summary
+            with backtest_service.count_db_queries() as db_queries:
+                strategy_id = data['strategy_id']
+                parameters = backtest_service.canonical_parameters(strategy_id, data['parameters'])
+                start_date = data.get('start_date')
+                end_date = data.get('end_date')
+                interval = data.get('interval', '1d')
+                use_parallel = data.get('use_parallel', True)
+                use_daily_sampling = (interval == '1d')
+                result_format = requested_result_format(data)
+                max_points = requested_max_points(data)
+                low_memory = data.get('low_memory', False)
                 
-                with ThreadPoolExecutor(max_workers=min(4, len(crypto_ids))) as executor:
-                    # Submit all backtest jobs
-                    future_to_crypto = {}
-                    for crypto_id in crypto_ids:
-                        if crypto_id in price_data_dict:
-                            future = executor.submit(
-                                backtest_service.run_backtest,
-                                strategy_id,
-                                crypto_id,
-                                parameters,
-                                start_date=start_date,
-                                end_date=end_date,
-                                interval=interval,
-                                use_daily_sampling=use_daily_sampling
-                            )
-                            future_to_crypto[future] = crypto_id
-                    
-                    # Collect results as they complete
-                    for future in as_completed(future_to_crypto):
-                        crypto_id = future_to_crypto[future]
-                        try:
-                            result = future.result()
-                            results[crypto_id] = result
-                        except Exception as e:
-                            errors.append({
-                                'crypto_id': crypto_id,
-                                'error': str(e)
-                            })
-                            logger.error(f"❌ Backtest failed for crypto {crypto_id}: {e}")
-            else:
-                # Sequential execution (for small batches or debugging)
-                logger.info(f"📈 Running {len(crypto_ids)} backtests sequentially...")
-                for crypto_id in crypto_ids:
-                    if crypto_id in price_data_dict:
-                        try:
-                            result = backtest_service.run_backtest(
-                                strategy_id,
-                                crypto_id,
-                                parameters,
-                                start_date=start_date,
-                                end_date=end_date,
-                                interval=interval,
-                                use_daily_sampling=use_daily_sampling
-                            )
-                            results[crypto_id] = result
-                        except Exception as e:
-                            errors.append({
-                                'crypto_id': crypto_id,
-                                'error': str(e)
-                            })
-            
-            total_time = (dt.now() - start_time).total_seconds()
+                start_time = dt.now()
+                
+                # OPTIMIZATION 1: One cache/result store lookup for all coins; the misses are computed below
+                results = backtest_service.get_cached_backtests(strategy_id, crypto_ids, parameters, start_date,
+                                                                end_date, interval, use_daily_sampling,
+                                                                result_format, low_memory)
+                misses = [crypto_id for crypto_id in crypto_ids if crypto_id not in results]
+                
+                # OPTIMIZATION 2: Batch fetch the misses' price data in a single query, resolve strategy once
+                # (an unknown strategy has no cached results, so it is always resolved then)
+                logger.info(f"📊 Batch fetching price data for {len(misses)} cryptocurrencies...")
+                strategy = backtest_service.get_strategy(strategy_id) if misses else None
+                if misses and not strategy:
+                    return {'error': f'Strategy {strategy_id} not found'}, 404
+                if low_memory or not misses:
+                    # Low-memory mode streams each coin's prices on its own instead of holding all of them
+                    price_data_dict = {}
+                else:
+                    price_data_dict = backtest_service.get_price_data_batch(
+                        crypto_ids=misses,
+                        start_date=start_date,
+                        end_date=end_date,
+                        interval=interval,
+                        use_daily_sampling=use_daily_sampling
+                    )
+                
+                fetch_time = (dt.now() - start_time).total_seconds()
+                logger.info(f"✅ Batch fetch completed in {fetch_time:.2f}s (vs {len(misses)}x individual queries)")
+                
+                computed = {}
+                errors = []
+                
+                def run_preloaded(crypto_id):
+                    # Prices and strategy are passed in and the coin was looked up above, so
+                    # run_backtest makes no DB queries; results are stored together below
+                    return backtest_service.run_backtest(
+                        strategy_id,
+                        crypto_id,
+                        parameters,
+                        start_date=start_date,
+                        end_date=end_date,
+                        interval=interval,
+                        use_daily_sampling=use_daily_sampling,
+                        price_data=price_data_dict.get(crypto_id),
+                        strategy=strategy,
+                        result_format=lossless_format(result_format),
+                        low_memory=low_memory,
+                        bulk=True
+                    )
+                
+                compute_start = dt.now()
+                if use_parallel and len(misses) > 1:
+                    # OPTIMIZATION 3: Parallel backtest execution
+                    logger.info(f"🚀 Running {len(misses)} backtests in parallel...")
+                
+                    with ThreadPoolExecutor(max_workers=min(4, len(misses))) as executor:
+                        # Submit all backtest jobs
+                        future_to_crypto = {}
+                        for crypto_id in misses:
+                            if low_memory or crypto_id in price_data_dict:
+                                # Each thread runs in a copy of this context, so its queries are counted
+                                future = executor.submit(contextvars.copy_context().run, run_preloaded, crypto_id)
+                                future_to_crypto[future] = crypto_id
+                
+                        # Collect results as they complete
+                        for future in as_completed(future_to_crypto):
+                            crypto_id = future_to_crypto[future]
+                            try:
+                                result = future.result()
+                                computed[crypto_id] = result
+                            except Exception as e:
+                                errors.append({
+                                    'crypto_id': crypto_id,
+                                    'error': str(e)
+                                })
+                                logger.error(f"❌ Backtest failed for crypto {crypto_id}: {e}")
+                else:
+                    # Sequential execution (for small batches or debugging)
+                    logger.info(f"📈 Running {len(misses)} backtests sequentially...")
+                    for crypto_id in misses:
+                        if low_memory or crypto_id in price_data_dict:
+                            try:
+                                computed[crypto_id] = run_preloaded(crypto_id)
+                            except Exception as e:
+                                errors.append({
+                                    'crypto_id': crypto_id,
+                                    'error': str(e)
+                                })
+                
+                # OPTIMIZATION 4: One result store write for every computed coin
+                backtest_service.store_backtests(strategy_id, computed, parameters, start_date, end_date, interval,
+                                                 use_daily_sampling, low_memory)
+                results.update({crypto_id: convert_result(result, result_format)
+                                for crypto_id, result in computed.items()})
+                results = {crypto_id: downsample_result(result, max_points) for crypto_id, result in results.items()}
+                
+                compute_time = (dt.now() - compute_start).total_seconds()
+                total_time = (dt.now() - start_time).total_seconds()
             
             # Calculate summary statistics
             successful_results = [r for r in results.values() if r.get('success', False)]
@@ -1091,8 +1231,11 @@ class CryptoBacktestBatch(Resource):
                 'failed_backtests': len(errors),
                 'execution_time_seconds': round(total_time, 2),
                 'fetch_time_seconds': round(fetch_time, 2),
+                'compute_time_seconds': round(compute_time, 2),
                 'parallel_execution': use_parallel,
-                'performance_note': f"Batch query saved {len(crypto_ids) - 1} database round-trips"
+                'database_queries': len(db_queries),
+                'performance_note': f"{len(db_queries)} database queries for {len(crypto_ids)} cryptocurrencies "
+                                    f"({len(crypto_ids) - len(misses)} served from the cache)"
             }
             
             if successful_results:
@@ -1122,16 +1265,174 @@ class CryptoBacktestBatch(Resource):
                 'errors': errors if errors else None
             }, 200
             
+        except JobQueueUnavailableError as e:
+            return {'error': str(e)}, 503
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             logger.error(f"❌ Batch backtest error: {e}")
             return {'error': str(e)}, 500
 
+class CryptoBacktestSweep(Resource):
+    def post(self):
+        """
+        Parameter sweep / grid search for one strategy over a set of cryptocurrencies
+        
+        Request body:
+        {
+            "strategy_id": 1,
+            "parameter_grid": {                           // Values to sweep
+                "rsi_period": [7, 14, 21],
+                "oversold_threshold": {"min": 20, "max": 40, "step": 5},
+                "stop_loss_threshold": [5, 10]
+            },
+            "parameters": {"initial_investment": 10000, "transaction_fee": 0.1},  // Fixed values
+            "crypto_ids": [1, 2, 3],                      // Optional, default: all with data
+            "start_date": "2024-01-01",                   // Optional
+            "end_date": "2024-12-31",                     // Optional
+            "interval": "1d",                             // Optional, default: 1d
+            "rank_by": "average_return",                  // Optional
+            "top_n": 50,                                  // Optional
+            "grid_axes": ["rsi_period", "oversold_threshold"]  // Optional
+        }
+        """
+        data = request.get_json()
+        
+        if not data or 'strategy_id' not in data or 'parameter_grid' not in data:
+            return {'error': 'Missing required fields: strategy_id, parameter_grid'}, 400
+        
+        crypto_ids = data.get('crypto_ids')
+        if crypto_ids is not None and (not isinstance(crypto_ids, list) or len(crypto_ids) == 0):
+            return {'error': 'crypto_ids must be a non-empty list'}, 400
+        
+        try:
+            interval = data.get('interval', '1d')
+            result = backtest_service.run_parameter_sweep(
+                data['strategy_id'],
+                data['parameter_grid'],
+                base_parameters=data.get('parameters', {}),
+                crypto_ids=crypto_ids,
+                start_date=data.get('start_date'),
+                end_date=data.get('end_date'),
+                interval=interval,
+                use_daily_sampling=(interval == '1d'),
+                rank_by=data.get('rank_by', 'average_return'),
+                top_n=int(data.get('top_n', 50)),
+                grid_axes=data.get('grid_axes')
+            )
+            return result, 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except Exception as e:
+            logger.error(f"❌ Parameter sweep error: {e}")
+            return {'error': str(e)}, 500
+
+class CryptoBacktestPoolStatus(Resource):
+    def get(self):
+        """Utilisation and queue depth of the persistent backtest worker pool"""
+        return backtest_worker_pool.get_stats(), 200
+
+class CryptoBacktestCacheStats(Resource):
+    def get(self):
+        """Redis cache statistics and the backtest result hit rate per strategy"""
+        cache = backtest_service.cache
+        return {
+            'cache': cache.get_stats() if cache else {'enabled': False},
+            'result_store_enabled': bool(backtest_service.store and backtest_service.store.enabled),
+            'strategies': backtest_service.get_cache_hit_rates()
+        }, 200
+
+class CryptoBacktestCacheWarmer(Resource):
+    def get(self):
+        """State and progress of the backtest cache warm-up after the latest price update"""
+        return cache_warmer.get_status(), 200
+
+class CryptoBacktestJob(Resource):
+    def get(self, job_id):
+        """State, progress and (once finished) summary of a backtest job"""
+        job = backtest_job_queue.get(job_id)
+        if job is None:
+            return {'error': f'Job {job_id} not found or expired'}, 404
+        return job, 200
+    
+    def delete(self, job_id):
+        """Cancel a backtest job (results finished so far are kept)"""
+        job = backtest_job_queue.cancel(job_id)
+        if job is None:
+            return {'error': f'Job {job_id} not found or expired'}, 404
+        return job, 200
+
+class CryptoBacktestJobCancel(Resource):
+    def post(self, job_id):
+        """Cancel a backtest job (for clients that cannot send DELETE)"""
+        return CryptoBacktestJob().delete(job_id)
+
+class CryptoBacktestJobResults(Resource):
+    def get(self, job_id):
+        """
+        Results of a backtest job in completion order, one page at a time
+        
+        Query parameters:
+            offset: First result (default: 0); poll from the previous page's
+                    next_offset for partial results while the job runs
+            limit: Page size (default: 50, max 500)
+        """
+        page = backtest_job_queue.get_results(
+            job_id,
+            offset=request.args.get('offset', 0, type=int),
+            limit=min(request.args.get('limit', 50, type=int), 500)
+        )
+        if page is None:
+            return {'error': f'Job {job_id} not found or expired'}, 404
+        return page, 200
+
+class CryptoBacktestLeaderboard(Resource):
+    def get(self):
+        """
+        Best stored parameter sets of a strategy from the durable result store (no recomputation)
+        
+        Query parameters:
+            strategy_id: Strategy to rank (required)
+            crypto_id: Rank runs on one coin ("best RSI params for BTC"); omitted,
+                       parameter sets are ranked by their average over all coins
+            interval: Data interval (default: 1d)
+            metric: Metric to rank by (default: total_return)
+            limit: Number of entries (default: 10, max 100)
+            start_date, end_date: Only runs of exactly this requested range
+        """
+        strategy_id = request.args.get('strategy_id', type=int)
+        if strategy_id is None:
+            return {'error': 'Missing required parameter: strategy_id'}, 400
+        if not backtest_service.store:
+            return {'error': 'Backtest result store is disabled'}, 503
+        
+        try:
+            entries = backtest_service.store.leaderboard(
+                strategy_id,
+                crypto_id=request.args.get('crypto_id', type=int),
+                interval=request.args.get('interval', '1d'),
+                metric=request.args.get('metric', 'total_return'),
+                limit=min(request.args.get('limit', 10, type=int), 100),
+                start_date=request.args.get('start_date'),
+                end_date=request.args.get('end_date')
+            )
+            return {'strategy_id': strategy_id, 'entries': entries}, 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except Exception as e:
+            logger.error(f"❌ Leaderboard error: {e}")
+            return {'error': str(e)}, 500
+
 # Progressive Loading: SSE endpoint for streaming results
 @app.route('/crypto/backtest/stream', methods=['POST'])
 def stream_backtest():
     """
     Stream backtest results progressively using Server-Sent Events (SSE)
     Results are sent as they complete for real-time UI updates
+    
+    Events are numbered; repeating the request with a Last-Event-ID header
+    (or a last_event_id field) after a dropped connection replays the missed
+    events and continues the same run without recomputing finished coins.
     """
     data = request.get_json()
     
@@ -1144,20 +1445,37 @@ def stream_backtest():
     interval = data.get('interval', '1d')
     use_daily_sampling = (interval == '1d')
     max_workers = data.get('max_workers', 4)  # Control parallelism
+    last_event_id = request.headers.get('Last-Event-ID') or data.get('last_event_id')
+    try:
+        result_format = requested_result_format(data)
+        max_points = requested_max_points(data)
+        parameters = backtest_service.canonical_parameters(data['strategy_id'], data['parameters'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    cache_warmer.record_request(data['strategy_id'], parameters, start_date, end_date, interval)
     
     def generate():
-        """Generator function for SSE stream"""
+        """
+        Generator function for SSE stream
+        
+        When the client disconnects, the server closes this generator; closing
+        the service's stream with it cancels the backtests not yet started.
+        """
         try:
-            for event in streaming_backtest_service.stream_strategy_against_all_cryptos(
+            with closing(streaming_backtest_service.stream_strategy_against_all_cryptos(
                 strategy_id=data['strategy_id'],
-                parameters=data['parameters'],
+                parameters=parameters,
                 start_date=start_date,
                 end_date=end_date,
                 interval=interval,
                 use_daily_sampling=use_daily_sampling,
-                max_workers=max_workers
-            ):
-                yield event
+                max_workers=max_workers,
+                result_format=result_format,
+                max_points=max_points,
+                last_event_id=last_event_id
+            )) as events:
+                for event in events:
+                    yield event
         except Exception as e:
             # Send error event if something goes wrong
             import json
@@ -1179,6 +1497,14 @@ api.add_resource(CryptoStrategies, '/crypto/strategies')
 api.add_resource(CryptoBacktestRun, '/crypto/backtest/run')
 api.add_resource(CryptoBacktestAll, '/crypto/backtest/run-all')
 api.add_resource(CryptoBacktestBatch, '/crypto/backtest/batch')  # NEW: Optimized batch endpoint
+api.add_resource(CryptoBacktestSweep, '/crypto/backtest/sweep')
+api.add_resource(CryptoBacktestPoolStatus, '/crypto/backtest/pool')
+api.add_resource(CryptoBacktestJob, '/crypto/backtest/jobs/<string:job_id>')
+api.add_resource(CryptoBacktestJobCancel, '/crypto/backtest/jobs/<string:job_id>/cancel')
+api.add_resource(CryptoBacktestJobResults, '/crypto/backtest/jobs/<string:job_id>/results')
+api.add_resource(CryptoBacktestLeaderboard, '/crypto/backtest/leaderboard')
+api.add_resource(CryptoBacktestCacheStats, '/crypto/backtest/cache-stats')
+api.add_resource(CryptoBacktestCacheWarmer, '/crypto/backtest/cache-warmer')
 api.add_resource(CryptosWithData, '/crypto/with-data')
 
 if __name__ == '__main__':
@@ -1190,4 +1516,7 @@ if __name__ == '__main__':
     stock_scheduler.start_scheduler()
     print("Stock data scheduler started")
     
+    # Pick up backtest jobs queued before a restart without waiting for the next request
+    backtest_job_queue.start()
+    
     app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Backtest Checkpoints
+The warm state of a backtest after its settled bars, so a later request with
+the same start and parameters but a later end date only processes the new bars
+(see CryptoBacktestService._backtest_signals_resumable).
+
+A checkpoint covers the settled bars of a run, i.e. all but the last bar: the
+last daily bar is still filling up (and the last hourly bar may be revised), so
+it is recomputed on resume. It holds the kernel state (cash, open position,
+entry price, last sell time), the number of warm-up bars the indicators need
+before a resumed bar, the settled trades and the runs of recorded bars. It
+holds no prices: a resumed run loads the whole range anyway (charts and
+metrics need it) and reads the indicator windows from it, after checking the
+settled bars against the checkpoint's digest. Indicators only depend on their
+window (VectorizedIndicators.rolling_mean), and the equity of the settled bars
+follows from the trades, so a resumed run gives the full run's result.
+"""
+
+import hashlib
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+CHECKPOINT_VERSION = 2
+
+
+def create_checkpoint(df: pd.DataFrame, bars: int, initial_cash: float, warmup_bars: int, recorded: np.ndarray,
+                      trades: List[Dict], trade_bars: List[int]) -> Dict:
+    """
+    Checkpoint of the first `bars` bars of a run over df
+
+    Args:
+        df: Price frame of the run
+        bars: Number of settled bars the checkpoint covers
+        initial_cash: Starting capital of the run
+        warmup_bars: Bars the strategy's indicators need before a resumed bar
+        recorded: Mask of the bars the strategy records (at least `bars` long)
+        trades: Trade records (decorated) of the run, in order
+        trade_bars: Bar index of each trade
+    """
+    settled = [(trade, int(bar)) for trade, bar in zip(trades, trade_bars) if bar < bars]
+    return {
+        'version': CHECKPOINT_VERSION,
+        'bars': int(bars),
+        'digest': _bars_digest(df, bars),
+        'state': _kernel_state(settled, float(initial_cash), df.index[:bars].asi8),
+        'warmup_bars': int(warmup_bars),
+        'recorded': _mask_runs(np.asarray(recorded[:bars], dtype=bool)),
+        'trades': [trade for trade, _ in settled],
+        'trade_bars': [bar for _, bar in settled]
+    }
+
+
+def checkpoint_matches(checkpoint: Dict, df: pd.DataFrame) -> bool:
+    """Whether df continues the checkpoint: the same settled bars (timestamps and closes) and later bars"""
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return False
+    bars = checkpoint['bars']
+    return len(df) > bars and _bars_digest(df, bars) == checkpoint['digest']
+
+
+def checkpoint_recorded(checkpoint: Dict) -> np.ndarray:
+    """Mask of the checkpoint's settled bars the strategy records"""
+    recorded = np.zeros(checkpoint['bars'], dtype=bool)
+    for start, stop in checkpoint['recorded']:
+        recorded[start:stop] = True
+    return recorded
+
+
+def checkpoint_equity(checkpoint: Dict, close: np.ndarray, initial_cash: float) -> np.ndarray:
+    """
+    Equity of the checkpoint's settled bars, from its trades and the closes
+
+    Marked to market before each bar's trade, the same arithmetic as
+    VectorizedBacktestEngine.execute_trades_vectorized.
+    """
+    trades = checkpoint['trades']
+    cash_after = [0.0 if trade['action'] == 'BUY' else trade['value'] - trade['fee'] for trade in trades]
+    position_after = [trade['amount'] if trade['action'] == 'BUY' else 0.0 for trade in trades]
+    trades_before = np.searchsorted(np.asarray(checkpoint['trade_bars'], dtype=np.int64),
+                                    np.arange(checkpoint['bars']), side='left')
+    cash_path = np.concatenate(([float(initial_cash)], cash_after))[trades_before]
+    position_path = np.concatenate(([0.0], position_after))[trades_before]
+    return cash_path + position_path * np.asarray(close[:checkpoint['bars']], dtype=np.float64)
+
+
+def _kernel_state(trades: List, cash: float, timestamps: np.ndarray) -> Dict:
+    """Kernel 'state' after (trade, bar) pairs, as execute_trades_vectorized returns it"""
+    state = {'cash': cash, 'position': 0.0, 'entry_price': 0.0, 'last_sell_ts': None}
+    for trade, bar in trades:
+        if trade['action'] == 'BUY':
+            state.update(cash=0.0, position=float(trade['amount']), entry_price=float(trade['price']))
+        else:
+            state.update(cash=float(trade['value'] - trade['fee']), position=0.0, entry_price=0.0,
+                         last_sell_ts=int(timestamps[bar]))
+    return state
+
+
+def _bars_digest(df: pd.DataFrame, bars: int) -> str:
+    """Digest of the timestamps and closes of df's first `bars` bars"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.index[:bars].asi8).tobytes())
+    digest.update(np.ascontiguousarray(df['close_price'].to_numpy(dtype=np.float64)[:bars]).tobytes())
+    return digest.hexdigest()
+
+
+def _mask_runs(mask: np.ndarray) -> List[List[int]]:
+    """[start, stop) runs of True in a boolean mask"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges.reshape(-1, 2).tolist()
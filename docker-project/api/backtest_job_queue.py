@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Backtest Job Queue
+Runs long run-all and batch backtests outside the HTTP request: submitting
+returns a job ID at once, runner threads in the API process take jobs from a
+Redis list, and clients poll the job's status, page through its results
+while it runs, or cancel it. Both kinds fan their coins out over the
+persistent worker pool and record each result as it finishes; a run-all job
+first looks every coin up in bulk and runs only the misses. Job state and
+results live in Redis, so a page reload (or another API process) finds the
+job again, and queued jobs survive an API restart.
+
+Keys (expire BACKTEST_JOB_TTL seconds after the job's last update):
+    job:queue          IDs of queued jobs, oldest first
+    job:<id>           Hash: kind, state, request, progress counters, timestamps, summary
+    job:<id>:results   Result JSON per coin, in completion order
+
+States: queued -> running -> succeeded | failed | cancelled. A running job
+whose runner stopped updating it (the API restarted mid-job) is reported
+failed after stale_after seconds.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import redis
+
+from backtest_metrics import summarize_results
+from backtest_result_format import convert_result, lossless_format
+from backtest_worker_pool import HEARTBEAT
+from chart_downsampling import downsample_result
+from crypto_backtest_service import CryptoBacktestService
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('run-all', 'batch')
+FINAL_STATES = ('succeeded', 'failed', 'cancelled')
+QUEUE_KEY = 'job:queue'
+
+# Change a job's state only from the expected one (a runner and a cancel can race)
+TRANSITION_SCRIPT = """
+if redis.call('hget', KEYS[1], 'state') == ARGV[1] then
+    redis.call('hset', KEYS[1], 'state', ARGV[2], 'updated_at', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class JobQueueUnavailableError(Exception):
+    """Raised when a job is submitted while Redis is unreachable"""
+
+
+class BacktestJobQueue:
+    """Redis-backed queue of run-all and batch backtest jobs"""
+
+    # Seconds without a finished coin before a running job's liveness and cancel flag are checked
+    HEARTBEAT_SECONDS = 5
+
+    def __init__(self, backtest_service: CryptoBacktestService, worker_pool, runners: int = None,
+                 ttl: int = None, stale_after: float = 120, host=None, port=None, db=0):
+        """
+        Args:
+            backtest_service: Service resolving coins, strategies and cached results
+            worker_pool: BacktestWorkerPool the coins' backtests run on
+            runners: Jobs run at the same time (default: BACKTEST_JOB_RUNNERS env or 2)
+            ttl: Seconds a job is kept after its last update (default: BACKTEST_JOB_TTL env or 21600)
+            stale_after: Seconds without an update after which a running job counts as lost
+            host: Redis host (default: from REDIS_HOST env or 'redis')
+            port: Redis port (default: from REDIS_PORT env or 6379)
+            db: Redis database number (default: 0)
+        """
+        self.backtest_service = backtest_service
+        self.worker_pool = worker_pool
+        self.runners = runners or int(os.getenv('BACKTEST_JOB_RUNNERS', 2))
+        self.ttl = ttl or int(os.getenv('BACKTEST_JOB_TTL', 21600))
+        self.stale_after = stale_after
+        self.host = host or os.getenv('REDIS_HOST', 'redis')
+        self.port = int(port or os.getenv('REDIS_PORT', 6379))
+        self.enabled = True
+
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        try:
+            self.redis_client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                db=db,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=15,  # above the blocking queue pops
+                retry_on_timeout=True
+            )
+            self._transition_script = self.redis_client.register_script(TRANSITION_SCRIPT)
+            self.redis_client.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Backtest job queue unavailable: {e}")
+            self.enabled = False
+            self.redis_client = None
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f'job:{job_id}'
+
+    def start(self) -> 'BacktestJobQueue':
+        """Start the runner threads (once; also picks up jobs queued before a restart)"""
+        with self._lock:
+            if self._threads or not self.enabled:
+                return self
+            self._stop.clear()
+            for n in range(self.runners):
+                thread = threading.Thread(target=self._run_forever, name=f'backtest-job-runner-{n}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"🧵 Backtest job queue started with {self.runners} runner(s)")
+        return self
+
+    def stop(self):
+        """Let the runners exit after their current job"""
+        self._stop.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=10)
+
+    def submit(self, kind: str, request: Dict) -> Dict:
+        """
+        Queue a job
+
+        Args:
+            kind: 'run-all' (every coin with data) or 'batch' (request['crypto_ids'])
+            request: Validated request: strategy_id, canonical parameters, start_date,
+                     end_date, interval, result_format, max_points, low_memory
+                     (and crypto_ids for batch)
+
+        Returns:
+            The job's status (see get)
+
+        Raises:
+            JobQueueUnavailableError: Redis is unreachable
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Invalid job kind '{kind}' (expected one of {', '.join(JOB_KINDS)})")
+        if not self.enabled:
+            raise JobQueueUnavailableError("Backtest job queue is unavailable (Redis not reachable)")
+
+        job_id = uuid.uuid4().hex[:16]
+        now = time.time()
+        try:
+            pipeline = self.redis_client.pipeline()
+            pipeline.hset(self._key(job_id), mapping={
+                'kind': kind, 'state': 'queued', 'request': json.dumps(request),
+                'total': 0, 'completed': 0, 'successful': 0, 'failed': 0,
+                'created_at': now, 'updated_at': now, 'cancel_requested': 0
+            })
+            pipeline.expire(self._key(job_id), self.ttl)
+            pipeline.rpush(QUEUE_KEY, job_id)
+            pipeline.execute()
+        except Exception as e:
+            raise JobQueueUnavailableError(f"Could not queue backtest job: {e}")
+
+        self.start()
+        logger.info(f"🧾 Queued {kind} backtest job {job_id} for strategy {request.get('strategy_id')}")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Status of a job: state, progress, timestamps, error and (once finished) summary
+
+        Returns:
+            None for unknown or expired jobs
+        """
+        if not self.enabled:
+            return None
+        self.start()
+        raw = self.redis_client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+
+        if raw['state'] == 'running' and time.time() - float(raw['updated_at']) > self.stale_after:
+            # Its runner stopped updating it: the API process went away mid-job
+            if self._transition(job_id, 'running', 'failed'):
+                self.redis_client.hset(self._key(job_id), mapping={
+                    'error': 'Job runner stopped before the job finished', 'finished_at': time.time()
+                })
+            raw = self.redis_client.hgetall(self._key(job_id))
+
+        completed, total = int(raw['completed']), int(raw['total'])
+        started_at = float(raw['started_at']) if raw.get('started_at') else None
+        finished_at = float(raw['finished_at']) if raw.get('finished_at') else None
+        timestamp = lambda value: datetime.fromtimestamp(value).isoformat() if value else None
+        return {
+            'job_id': job_id,
+            'kind': raw['kind'],
+            'state': raw['state'],
+            'request': json.loads(raw['request']),
+            'progress': {
+                'completed': completed,
+                'total': total,
+                'successful': int(raw['successful']),
+                'failed': int(raw['failed']),
+                'percent': round(completed / total * 100, 1) if total else 0
+            },
+            'cancel_requested': raw.get('cancel_requested') == '1',
+            'created_at': timestamp(float(raw['created_at'])),
+            'started_at': timestamp(started_at),
+            'finished_at': timestamp(finished_at),
+            'elapsed_seconds': round((finished_at or time.time()) - started_at, 2) if started_at else None,
+            'error': raw.get('error'),
+            'summary': json.loads(raw['summary']) if raw.get('summary') else None
+        }
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 50) -> Optional[Dict]:
+        """
+        One page of a job's results in completion order
+
+        Works while the job runs (partial results): poll again from next_offset.
+        'complete' is true once the job finished and the page reached its end.
+
+        Returns:
+            None for unknown or expired jobs
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        offset, limit = max(0, int(offset)), max(1, int(limit))
+        items = self.redis_client.lrange(f'{self._key(job_id)}:results', offset, offset + limit - 1)
+        next_offset = offset + len(items)
+        return {
+            'job_id': job_id,
+            'state': job['state'],
+            'offset': offset,
+            'limit': limit,
+            'available': job['progress']['completed'],
+            'next_offset': next_offset,
+            'complete': job['state'] in FINAL_STATES and next_offset >= job['progress']['completed'],
+            'results': [json.loads(item) for item in items]
+        }
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job: a queued one never starts, a running one stops after the
+        coins in progress (results so far are kept)
+
+        Returns:
+            The job's status, or None for unknown or expired jobs
+        """
+        if not self.enabled or not self.redis_client.exists(self._key(job_id)):
+            return None
+        if self._transition(job_id, 'queued', 'cancelled'):
+            self.redis_client.hset(self._key(job_id), 'finished_at', time.time())
+        elif self.redis_client.hget(self._key(job_id), 'state') == 'running':
+            self.redis_client.hset(self._key(job_id), 'cancel_requested', 1)
+        return self.get(job_id)
+
+    def _transition(self, job_id: str, from_state: str, to_state: str) -> bool:
+        return bool(self._transition_script(keys=[self._key(job_id)], args=[from_state, to_state, time.time()]))
+
+    def _run_forever(self):
+        while not self._stop.is_set():
+            try:
+                item = self.redis_client.blpop(QUEUE_KEY, timeout=5)
+            except Exception as e:
+                logger.warning(f"Backtest job queue read error: {e}")
+                time.sleep(5)
+                continue
+            if not item:
+                continue
+            try:
+                self._run(item[1])
+            except Exception as e:
+                # Redis went away mid-job: the job turns stale; keep the runner alive
+                logger.error(f"❌ Backtest job runner error on job {item[1]}: {e}")
+                time.sleep(5)
+
+    def _run(self, job_id: str):
+        """Run one job (skipped when it was cancelled or expired while queued)"""
+        if not self._transition(job_id, 'queued', 'running'):
+            return
+        key = self._key(job_id)
+        raw = self.redis_client.hgetall(key)
+        kind, request = raw['kind'], json.loads(raw['request'])
+        logger.info(f"🏃 Running {kind} backtest job {job_id}")
+
+        results = []
+        state, error = 'succeeded', None
+        try:
+            cryptos, missing = self._job_cryptos(kind, request)
+            self.redis_client.hset(key, mapping={'started_at': time.time(), 'total': len(cryptos) + len(missing)})
+            cancelled = False
+            for crypto_id in missing:
+                result = {'crypto_id': crypto_id, 'success': False, 'error': 'No price data for this cryptocurrency'}
+                results.append(result)
+                cancelled = self._record(job_id, result)
+
+            if kind == 'run-all':
+                cancelled = self._run_all(job_id, request, cryptos, results)
+            elif not cancelled:
+                cancelled = self._run_batch(job_id, request, cryptos, results)
+            if cancelled:
+                state = 'cancelled'
+        except Exception as e:
+            logger.error(f"❌ Backtest job {job_id} failed: {e}")
+            state, error = 'failed', str(e)
+
+        total = int(self.redis_client.hget(key, 'total') or 0)
+        finished = {'state': state, 'finished_at': time.time(), 'updated_at': time.time(),
+                    'summary': json.dumps(job_summary(results, total))}
+        if error:
+            finished['error'] = error
+        pipeline = self.redis_client.pipeline()
+        pipeline.hset(key, mapping=finished)
+        pipeline.expire(key, self.ttl)
+        pipeline.expire(f'{key}:results', self.ttl)
+        pipeline.execute()
+        logger.info(f"🏁 Backtest job {job_id} {state}: {len(results)}/{total} coin(s)")
+
+    def _run_all(self, job_id: str, request: Dict, cryptos: List[Dict], results: List[Dict]) -> bool:
+        """
+        Run a run-all job: the cached coins are looked up in one query and
+        recorded first, the misses run on the worker pool (see _run_batch), and
+        the computed results are written to the result store in one query, also
+        after a cancel
+
+        Returns:
+            Whether the job was cancelled
+        """
+        service = self.backtest_service
+        interval = request.get('interval', '1d')
+        lookup = dict(start_date=request.get('start_date'), end_date=request.get('end_date'), interval=interval,
+                      use_daily_sampling=(interval == '1d'), low_memory=request.get('low_memory', False))
+        cached = service.get_cached_backtests(request['strategy_id'], [crypto['id'] for crypto in cryptos],
+                                              request['parameters'],
+                                              result_format=request.get('result_format', 'rows'), **lookup)
+        for crypto in cryptos:
+            if crypto['id'] in cached:
+                result = downsample_result(service._format_backtest_result(crypto, cached[crypto['id']]),
+                                           request.get('max_points'))
+                results.append(result)
+                if self._record(job_id, result):
+                    return True
+
+        misses = [crypto for crypto in cryptos if crypto['id'] not in cached]
+        if not misses:
+            return False
+        computed = {}
+        try:
+            return self._run_batch(job_id, request, misses, results, computed)
+        finally:
+            service.store_backtests(request['strategy_id'], computed, request['parameters'], **lookup)
+
+    def _run_batch(self, job_id: str, request: Dict, cryptos: List[Dict], results: List[Dict],
+                   computed: Optional[Dict[int, Dict]] = None) -> bool:
+        """
+        Run a batch job's coins on the worker pool, recording each result as it
+        finishes; closing the pool's iterator on cancel drops the coins that
+        have not started
+
+        Args:
+            computed: When given, the coins run in bulk mode (see run_backtest)
+                      and their full-resolution lossless results are collected
+                      here by coin id for the caller to store (store_backtests)
+
+        Returns:
+            Whether the job was cancelled
+        """
+        strategy = self.backtest_service.get_strategy(request['strategy_id'])
+        if not strategy:
+            raise ValueError(f"Strategy {request['strategy_id']} not found")
+        result_format = request.get('result_format', 'rows')
+        task = dict(
+            strategy_id=request['strategy_id'],
+            parameters=request['parameters'],
+            strategy=strategy,
+            start_date=request.get('start_date'),
+            end_date=request.get('end_date'),
+            interval=request.get('interval', '1d'),
+            use_daily_sampling=(request.get('interval', '1d') == '1d'),
+            result_format=result_format if computed is None else lossless_format(result_format),
+            low_memory=request.get('low_memory', False),
+            bulk=computed is not None
+        )
+
+        with closing(self.worker_pool.imap_unordered(
+            CryptoBacktestService._run_worker_backtest, cryptos,
+            heartbeat=self.HEARTBEAT_SECONDS, on_worker_crash=self.backtest_service._worker_crash_result, **task
+        )) as backtests:
+            for crypto, result in backtests:
+                if crypto is HEARTBEAT:
+                    cancelled = self._record(job_id)
+                else:
+                    if computed is not None:
+                        computed[crypto['id']] = result
+                        result = convert_result(result, result_format)
+                    result = downsample_result(result, request.get('max_points'))
+                    results.append(result)
+                    cancelled = self._record(job_id, result)
+                if cancelled:
+                    return True
+        return False
+
+    def _job_cryptos(self, kind: str, request: Dict):
+        """Coins of a job with price data, and the requested ids without any"""
+        cryptos = self.backtest_service.get_cryptocurrencies_with_data()
+        if kind == 'run-all':
+            return cryptos, []
+        by_id = {crypto['id']: crypto for crypto in cryptos}
+        requested = [int(crypto_id) for crypto_id in request['crypto_ids']]
+        return ([by_id[crypto_id] for crypto_id in requested if crypto_id in by_id],
+                [crypto_id for crypto_id in requested if crypto_id not in by_id])
+
+    def _record(self, job_id: str, result: Dict = None) -> bool:
+        """
+        Store a coin's result (or just mark the job alive)
+
+        Returns:
+            Whether a cancel was requested
+        """
+        key = self._key(job_id)
+        pipeline = self.redis_client.pipeline()
+        if result is not None:
+            pipeline.rpush(f'{key}:results', json.dumps(result, default=str))
+            pipeline.expire(f'{key}:results', self.ttl)
+            pipeline.hincrby(key, 'completed', 1)
+            pipeline.hincrby(key, 'successful' if result.get('success') else 'failed', 1)
+        pipeline.hset(key, 'updated_at', time.time())
+        pipeline.expire(key, self.ttl)
+        pipeline.hget(key, 'cancel_requested')
+        return pipeline.execute()[-1] == '1'
+
+
+def job_summary(results: List[Dict], total: int) -> Dict:
+    """Cross-coin summary of a job's results (of the coins finished so far when cancelled)"""
+    successful = [result for result in results if result.get('success')]
+    summary = {
+        'total_cryptocurrencies': total,
+        'completed_backtests': len(results),
+        'successful_backtests': len(successful),
+        'failed_backtests': len(results) - len(successful),
+        'average_return': 0,
+        'positive_returns_count': 0,
+        'best_performing': None,
+        'worst_performing': None
+    }
+    if successful:
+        stats = summarize_results(successful)
+        summary.update({
+            'average_return': round(stats['average_return'], 2),
+            'median_return': round(stats['median_return'], 2),
+            'positive_returns_count': stats['positive_returns_count'],
+            'best_performing': {'crypto_id': stats['best'].get('crypto_id'), 'symbol': stats['best'].get('symbol'),
+                                'return': round(stats['best']['total_return'], 2)},
+            'worst_performing': {'crypto_id': stats['worst'].get('crypto_id'), 'symbol': stats['worst'].get('symbol'),
+                                 'return': round(stats['worst']['total_return'], 2)}
+        })
+    return summary
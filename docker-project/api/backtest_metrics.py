@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Backtest Risk Metrics
+Vectorized performance metrics for one backtest (equity curve plus trade
+arrays) and for a set of run-all results.
+
+Ratios are annualised from the bar spacing with 365.25 trading days per year
+(crypto trades around the clock) and a zero risk-free rate. Metrics that are
+undefined for a run (e.g. Sortino without a losing bar) are None, which keeps
+results JSON-serializable.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from vectorized_indicators import VectorizedIndicators
+
+NS_PER_YEAR = 365.25 * 24 * 3600 * 1e9
+NS_PER_HOUR = 3600 * 1e9
+
+
+def periods_per_year(timestamps: np.ndarray) -> Optional[float]:
+    """Number of bars per year from the median spacing of int64 ns timestamps"""
+    if len(timestamps) < 2:
+        return None
+    spacing = float(np.median(np.diff(timestamps)))
+    return NS_PER_YEAR / spacing if spacing > 0 else None
+
+
+def calculate_backtest_metrics(initial_investment: float, final_value: float, equity: np.ndarray,
+                               equity_timestamps: np.ndarray, trade_actions: np.ndarray,
+                               trade_values: np.ndarray, trade_bars: np.ndarray,
+                               bar_timestamps: np.ndarray) -> Dict:
+    """
+    Full metric set of a single backtest
+
+    Args:
+        initial_investment: Starting capital
+        final_value: Portfolio value at the end of the run
+        equity: Portfolio value on the recorded bars
+        equity_timestamps: int64 ns timestamps of the equity values
+        trade_actions: 'BUY' / 'SELL' per trade, in execution order
+        trade_values: Trade value per trade (BUY: invested after fee, SELL: proceeds before fee)
+        trade_bars: Bar index of each trade in the price series
+        bar_timestamps: int64 ns timestamps of every bar of the price series
+
+    Returns:
+        Unrounded fractions/ratios: max_drawdown, profitable_trades, losing_trades,
+        win_rate, win_loss_ratio (average winning / average losing trade return),
+        sharpe_ratio, sortino_ratio, annualized_return, calmar_ratio, exposure_time
+        (fraction of the period in a position) and average_holding_period_hours
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    trade_actions = np.asarray(trade_actions)
+    trade_values = np.asarray(trade_values, dtype=np.float64)
+    trade_bars = np.asarray(trade_bars, dtype=np.int64)
+    bar_timestamps = np.asarray(bar_timestamps, dtype=np.int64)
+
+    # Drawdown with the running peak starting at the initial investment
+    max_drawdown = 0.0
+    if len(equity):
+        drawdown_peak, _ = VectorizedIndicators.calculate_drawdown_vectorized(
+            np.concatenate(([initial_investment], equity)))
+        max_drawdown = max(max_drawdown, float(drawdown_peak))
+
+    # Pair the n-th BUY with the n-th SELL (long-only, one position at a time)
+    is_buy = trade_actions == 'BUY'
+    buy_values, sell_values = trade_values[is_buy], trade_values[~is_buy]
+    buy_bars, sell_bars = trade_bars[is_buy], trade_bars[~is_buy]
+    closed = min(len(buy_values), len(sell_values))
+    trade_returns = sell_values[:closed] / buy_values[:closed] - 1
+    wins = trade_returns[sell_values[:closed] > buy_values[:closed]]
+    losses = trade_returns[sell_values[:closed] <= buy_values[:closed]]
+    average_loss = abs(float(losses.mean())) if len(losses) else 0.0
+
+    # Bar returns of the equity curve, annualised by the bar spacing
+    sharpe_ratio = sortino_ratio = None
+    periods = periods_per_year(np.asarray(equity_timestamps, dtype=np.int64))
+    if len(equity) > 2 and periods:
+        returns = equity[1:] / equity[:-1] - 1
+        volatility = returns.std(ddof=1)
+        if volatility > 0:
+            sharpe_ratio = float(returns.mean() / volatility * np.sqrt(periods))
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        if downside > 0:
+            sortino_ratio = float(returns.mean() / downside * np.sqrt(periods))
+
+    annualized_return = calmar_ratio = None
+    span = float(bar_timestamps[-1] - bar_timestamps[0]) if len(bar_timestamps) else 0.0
+    if span > 0:
+        years = span / NS_PER_YEAR
+        annualized_return = float(max(final_value / initial_investment, 0.0) ** (1 / years) - 1)
+        if max_drawdown > 0:
+            calmar_ratio = annualized_return / max_drawdown
+
+    # Time in a position (an open position is held to the last bar)
+    holding = bar_timestamps[sell_bars[:closed]] - bar_timestamps[buy_bars[:closed]]
+    held = float(holding.sum())
+    if len(buy_bars) > closed:
+        held += float(bar_timestamps[-1] - bar_timestamps[buy_bars[closed]])
+
+    return {
+        'max_drawdown': max_drawdown,
+        'profitable_trades': int(len(wins)),
+        'losing_trades': int(len(losses)),
+        'win_rate': len(wins) / closed if closed else None,
+        'win_loss_ratio': float(wins.mean()) / average_loss if len(wins) and average_loss > 0 else None,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'annualized_return': annualized_return,
+        'calmar_ratio': calmar_ratio,
+        'exposure_time': held / span if span > 0 else None,
+        'average_holding_period_hours': float(holding.mean()) / NS_PER_HOUR if closed else None
+    }
+
+
+def summarize_results(results: List[Dict]) -> Dict:
+    """
+    Cross-coin summary of successful run-all results
+
+    Returns:
+        average/median return, positive count, best/worst result, trade totals
+        and average risk metrics (None where no result reports them)
+    """
+    if not results:
+        return {}
+
+    returns = np.array([r['total_return'] for r in results], dtype=np.float64)
+    summary = {
+        'average_return': float(returns.mean()),
+        'median_return': float(np.median(returns)),
+        'positive_returns_count': int((returns > 0).sum()),
+        'best': results[int(np.argmax(returns))],
+        'worst': results[int(np.argmin(returns))],
+        'total_winning_trades': int(sum(r.get('profitable_trades', 0) for r in results)),
+        'total_losing_trades': int(sum(r.get('losing_trades', 0) for r in results)),
+        'average_max_drawdown': float(np.mean([r.get('max_drawdown', 0) for r in results]))
+    }
+    for metric in ('sharpe_ratio', 'sortino_ratio', 'exposure_time'):
+        values = np.array([r[metric] for r in results if r.get(metric) is not None], dtype=np.float64)
+        summary[f'average_{metric}'] = float(values.mean()) if len(values) else None
+    return summary
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Columnar Backtest Result Format
+Converts backtest results between the row format (lists of dicts for
+price_history and trades) and a compact columnar format with parallel arrays:
+
+    'result_format': 'columnar' | 'columnar32',
+    'price_history': {
+        'date_origin': '2024-01-01',        # dates are day offsets from here
+        'date_offsets': [0, 0, ..., 1, ...],
+        'price': [...],
+        'portfolio_value': [...]            # null where no value was recorded
+    },
+    'trades': {
+        'date_offsets': [...],              # same origin as price_history
+        'action': [...], 'price': [...], ...  # one array per trade field, null where absent
+    }
+
+'columnar32' additionally rounds floats to float32 precision (shortest repr),
+which roughly halves the digits; 'columnar' is lossless and round-trips to
+the exact row result, so it is also the format used for cache storage.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+RESULT_FORMATS = ('rows', 'columnar', 'columnar32')
+
+# Accept header value that selects the columnar format
+COLUMNAR_MEDIA_TYPE = 'application/vnd.backtest.columnar+json'
+
+
+def lossless_format(result_format: str) -> str:
+    """Closest format to result_format that can still be stored ('columnar' for 'columnar32')"""
+    return 'columnar' if result_format == 'columnar32' else result_format
+
+
+def is_columnar(result: Dict) -> bool:
+    """True when the result's price_history/trades are stored as columns"""
+    return result.get('result_format', 'rows') != 'rows'
+
+
+def convert_result(result: Dict, result_format: str = 'rows') -> Dict:
+    """
+    Return the result in the requested format (rows, columnar or columnar32)
+
+    Results that are already in that format are returned unchanged.
+    """
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Unknown result_format '{result_format}' (expected one of {', '.join(RESULT_FORMATS)})")
+
+    current = result.get('result_format', 'rows')
+    if current == result_format:
+        return result
+    if current != 'rows':
+        result = from_columnar(result)
+    if result_format == 'rows':
+        return result
+    return to_columnar(result, float32=(result_format == 'columnar32'))
+
+
+def to_columnar(result: Dict, float32: bool = False) -> Dict:
+    """Convert a row-format result into parallel arrays"""
+    price_history = result.get('price_history')
+    trades = result.get('trades')
+    if not isinstance(price_history, list) and not isinstance(trades, list):
+        return result
+
+    columnar = dict(result)
+    columnar['result_format'] = 'columnar32' if float32 else 'columnar'
+
+    origin = _date_origin(price_history, trades)
+    if isinstance(price_history, list):
+        columnar['price_history'] = {
+            'date_origin': origin,
+            'date_offsets': _encode_dates([point['date'] for point in price_history], origin),
+            'price': _encode_floats([point['price'] for point in price_history], float32),
+            'portfolio_value': _encode_floats([point['portfolio_value'] for point in price_history], float32)
+        }
+
+    if isinstance(trades, list):
+        columns = {}
+        for name in _trade_fields(trades):
+            values = [trade.get(name) for trade in trades]
+            if name == 'date':
+                columns['date_offsets'] = _encode_dates(values, origin)
+            else:
+                columns[name] = _encode_floats(values, float32) if _is_float_column(values) else values
+        columnar['trades'] = columns
+        if origin is not None and not isinstance(price_history, list):
+            columnar['trades_date_origin'] = origin
+
+    return columnar
+
+
+def from_columnar(result: Dict) -> Dict:
+    """Rebuild the row-format result from parallel arrays"""
+    if not is_columnar(result):
+        return result
+
+    rows = {key: value for key, value in result.items() if key not in ('result_format', 'trades_date_origin')}
+    price_history = result.get('price_history')
+    origin = result.get('trades_date_origin')
+
+    if isinstance(price_history, dict):
+        origin = price_history['date_origin']
+        dates = _decode_dates(price_history['date_offsets'], origin)
+        rows['price_history'] = [
+            {'date': date, 'price': price, 'portfolio_value': value}
+            for date, price, value in zip(dates, price_history['price'], price_history['portfolio_value'])
+        ]
+
+    trades = result.get('trades')
+    if isinstance(trades, dict):
+        columns = []
+        for name, values in trades.items():
+            if name == 'date_offsets':
+                columns.append(('date', _decode_dates(values, origin)))
+            else:
+                columns.append((name, values))
+        count = len(columns[0][1]) if columns else 0
+        rows['trades'] = [
+            {name: values[i] for name, values in columns if values[i] is not None}
+            for i in range(count)
+        ]
+
+    return rows
+
+
+def _trade_fields(trades: List[Dict]) -> List[str]:
+    """
+    Union of trade keys that preserves each trade's own key order
+
+    A key first seen in a later trade (e.g. 'reason' on SELL) is inserted
+    right after the key preceding it in that trade, so rebuilding BUY and
+    SELL rows yields their original key order.
+    """
+    fields = []
+    for trade in trades:
+        previous = None
+        for name in trade:
+            if name not in fields:
+                fields.insert(fields.index(previous) + 1 if previous is not None else 0, name)
+            previous = name
+    return fields
+
+
+def _date_origin(price_history: Optional[List[Dict]], trades: Optional[List[Dict]]) -> Optional[str]:
+    if price_history:
+        return price_history[0]['date']
+    if trades:
+        return trades[0].get('date')
+    return None
+
+
+def _encode_dates(dates: List[str], origin: Optional[str]) -> List[int]:
+    if not dates:
+        return []
+    days = np.array(dates, dtype='datetime64[D]')
+    return (days - np.datetime64(origin, 'D')).astype(np.int64).tolist()
+
+
+def _decode_dates(offsets: List[int], origin: Optional[str]) -> List[str]:
+    if not offsets:
+        return []
+    days = np.datetime64(origin, 'D') + np.asarray(offsets, dtype=np.int64)
+    return days.astype(str).tolist()
+
+
+def _is_float_column(values: List) -> bool:
+    return all(value is None or (isinstance(value, float)) for value in values) and \
+        any(value is not None for value in values)
+
+
+def _encode_floats(values: List[Optional[float]], float32: bool) -> List[Optional[float]]:
+    """Float array as a JSON list; float32 keeps the shortest repr at single precision"""
+    if not float32:
+        return [float(value) if value is not None else None for value in values]
+
+    array = np.array([np.nan if value is None else value for value in values], dtype=np.float32)
+    encoded = [float(text) for text in array.astype(str)]
+    for i, value in enumerate(values):
+        if value is None:
+            encoded[i] = None
+    return encoded
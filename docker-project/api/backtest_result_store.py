@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Store
+Durable second cache tier behind Redis: backtest results are kept in the
+crypto_backtest_results table (database/add_backtest_results_store.sql), keyed
+by strategy, coin, parameter hash, requested range, interval and precision.
+Each row holds the summary metrics as columns (for leaderboard queries) and the
+full result as a zlib-compressed columnar blob.
+
+A stored result is only served while it still covers the coin's newest price
+bar inside the requested range, so open-ended ranges ("up to now") are
+recomputed once new prices arrive instead of going stale.
+"""
+
+import hashlib
+import json
+import logging
+import zlib
+from typing import Dict, List, Optional
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+from backtest_result_format import convert_result
+
+logger = logging.getLogger(__name__)
+
+# Summary metrics stored as columns (and the metrics leaderboards rank by)
+METRIC_COLUMNS = (
+    'initial_investment', 'final_value', 'total_return', 'buy_hold_return', 'strategy_vs_hold',
+    'max_drawdown', 'total_trades', 'profitable_trades', 'losing_trades', 'win_rate', 'sharpe_ratio',
+    'sortino_ratio', 'annualized_return', 'calmar_ratio', 'exposure_time', 'total_fees'
+)
+
+# Metrics where lower is better
+ASCENDING_METRICS = ('max_drawdown', 'total_fees')
+
+# Last hourly bar (the source of both intervals) inside a row's requested range
+_DATA_END = """
+    SELECT MAX(p.datetime) FROM crypto_prices p
+    WHERE p.crypto_id = {crypto}
+      AND p.interval_type = '1h'
+      AND p.datetime BETWEEN COALESCE(NULLIF({start}, '')::timestamp, '2020-01-01'::timestamp)
+                         AND COALESCE(NULLIF({end}, '')::timestamp, CURRENT_TIMESTAMP)
+"""
+
+
+def parameter_hash(parameters: Dict) -> str:
+    """MD5 of the sorted parameter JSON (same as CryptoBacktestService.generate_parameter_hash)"""
+    return hashlib.md5(json.dumps(parameters, sort_keys=True).encode()).hexdigest()
+
+
+def encode_result(result: Dict) -> bytes:
+    """Compressed columnar JSON of a backtest result"""
+    payload = json.dumps(convert_result(result, 'columnar'), separators=(',', ':'))
+    return zlib.compress(payload.encode(), 6)
+
+
+def decode_result(blob: bytes) -> Dict:
+    """Columnar backtest result from encode_result"""
+    return json.loads(zlib.decompress(blob))
+
+
+class BacktestResultStore:
+    """Durable backtest results in PostgreSQL (second cache tier and leaderboards)"""
+
+    def __init__(self, get_connection):
+        """
+        Args:
+            get_connection: Callable returning a new psycopg connection
+        """
+        self.get_connection = get_connection
+        self.enabled = True
+
+    def get_many(self, strategy_id: int, crypto_ids: List[int], parameters: Dict,
+                 start_date: str = None, end_date: str = None, interval: str = '1d',
+                 use_daily_sampling: bool = True, precision: str = 'float64') -> Dict[int, Dict]:
+        """
+        Stored, still current results of several coins in one query
+
+        Returns:
+            crypto_id -> columnar result (coins without a current result are missing)
+        """
+        if not self.enabled or not crypto_ids:
+            return {}
+
+        query = """
+            SELECT r.cryptocurrency_id, r.result_blob
+            FROM crypto_backtest_results r
+            WHERE r.strategy_id = %s
+              AND r.cryptocurrency_id = ANY(%s)
+              AND r.parameters_hash = %s
+              AND r.interval_type = %s
+              AND r.use_daily_sampling = %s
+              AND r.range_start = %s
+              AND r.range_end = %s
+              AND r.price_precision = %s
+              AND r.data_end >= ({data_end})
+        """.format(data_end=_DATA_END.format(crypto='r.cryptocurrency_id', start='r.range_start',
+                                             end='r.range_end'))
+        params = [strategy_id, list(crypto_ids), parameter_hash(parameters), interval, use_daily_sampling,
+                  start_date or '', end_date or '', precision]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return {crypto_id: decode_result(blob) for crypto_id, blob in cur.fetchall()}
+        except Exception as e:
+            self._handle_error('get', e)
+            return {}
+
+    def get(self, strategy_id: int, crypto_id: int, parameters: Dict, **key) -> Optional[Dict]:
+        """Stored, still current result of one coin (None on a miss); key as in get_many"""
+        return self.get_many(strategy_id, [crypto_id], parameters, **key).get(crypto_id)
+
+    def put_many(self, strategy_id: int, results: Dict[int, Dict], parameters: Dict,
+                 start_date: str = None, end_date: str = None, interval: str = '1d',
+                 use_daily_sampling: bool = True, precision: str = 'float64') -> int:
+        """
+        Store (or replace) successful results of several coins
+
+        Returns:
+            Number of rows written
+        """
+        results = {crypto_id: result for crypto_id, result in results.items() if result.get('success', False)}
+        if not self.enabled or not results:
+            return 0
+
+        columns = ', '.join(METRIC_COLUMNS)
+        query = """
+            INSERT INTO crypto_backtest_results
+                (strategy_id, cryptocurrency_id, parameters_hash, interval_type, use_daily_sampling,
+                 range_start, range_end, price_precision, parameters, data_end,
+                 {columns}, result_blob, calculation_time_ms, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, ({data_end}),
+                    {placeholders}, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (strategy_id, cryptocurrency_id, parameters_hash, interval_type,
+                         use_daily_sampling, range_start, range_end, price_precision)
+            DO UPDATE SET parameters = EXCLUDED.parameters,
+                          data_end = EXCLUDED.data_end,
+                          {updates},
+                          result_blob = EXCLUDED.result_blob,
+                          calculation_time_ms = EXCLUDED.calculation_time_ms,
+                          created_at = EXCLUDED.created_at
+        """.format(
+            columns=columns,
+            data_end=_DATA_END.format(crypto='%s', start='%s', end='%s'),
+            placeholders=', '.join(['%s'] * len(METRIC_COLUMNS)),
+            updates=', '.join(f'{column} = EXCLUDED.{column}' for column in METRIC_COLUMNS)
+        )
+        key = [parameter_hash(parameters), interval, use_daily_sampling, start_date or '', end_date or '', precision]
+        rows = [
+            [strategy_id, crypto_id, *key, Jsonb(parameters), crypto_id, start_date or '', end_date or '',
+             *[result.get(column) for column in METRIC_COLUMNS],
+             encode_result(result), result.get('calculation_time_ms')]
+            for crypto_id, result in results.items()
+        ]
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(query, rows)
+            logger.info(f"🗄️ Stored {len(rows)} backtest result(s) for strategy {strategy_id}")
+            return len(rows)
+        except Exception as e:
+            self._handle_error('put', e)
+            return 0
+
+    def put(self, strategy_id: int, crypto_id: int, result: Dict, parameters: Dict, **key) -> bool:
+        """Store one coin's result; key as in put_many"""
+        return self.put_many(strategy_id, {crypto_id: result}, parameters, **key) > 0
+
+    def leaderboard(self, strategy_id: int, crypto_id: Optional[int] = None, interval: str = '1d',
+                    metric: str = 'total_return', limit: int = 10,
+                    start_date: str = None, end_date: str = None) -> List[Dict]:
+        """
+        Best stored parameter sets of a strategy, without recomputation
+
+        Args:
+            strategy_id: Strategy to rank
+            crypto_id: Rank the runs on this coin ("best RSI params for BTC");
+                       None ranks parameter sets by their average over all coins
+            interval: Data interval of the runs
+            metric: One of METRIC_COLUMNS (max_drawdown/total_fees rank ascending)
+            limit: Number of entries
+            start_date, end_date: Only runs of exactly this requested range
+
+        Returns:
+            Ranked entries with parameters and metrics
+
+        Raises:
+            ValueError: Unknown metric, or the store is unavailable
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Invalid metric '{metric}' (expected one of {', '.join(METRIC_COLUMNS)})")
+        if not self.enabled:
+            raise ValueError("Backtest result store is not available")
+        order = 'ASC' if metric in ASCENDING_METRICS else 'DESC'
+
+        conditions = ['r.strategy_id = %s', 'r.interval_type = %s', f'r.{metric} IS NOT NULL']
+        params = [strategy_id, interval]
+        if start_date is not None or end_date is not None:
+            conditions += ['r.range_start = %s', 'r.range_end = %s']
+            params += [start_date or '', end_date or '']
+
+        if crypto_id is not None:
+            conditions.append('r.cryptocurrency_id = %s')
+            params.append(crypto_id)
+            query = f"""
+                SELECT r.cryptocurrency_id AS crypto_id, c.symbol, c.name, r.parameters,
+                       NULLIF(r.range_start, '') AS start_date, NULLIF(r.range_end, '') AS end_date,
+                       {', '.join(f'r.{column}' for column in METRIC_COLUMNS)}, r.created_at
+                FROM crypto_backtest_results r
+                JOIN cryptocurrencies c ON c.id = r.cryptocurrency_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY r.{metric} {order}
+                LIMIT %s
+            """
+        else:
+            query = f"""
+                SELECT r.parameters_hash, (ARRAY_AGG(r.parameters))[1] AS parameters,
+                       COUNT(*) AS cryptocurrencies, AVG(r.{metric})::float8 AS average_{metric},
+                       AVG(r.total_return)::float8 AS average_return, MAX(r.created_at) AS created_at
+                FROM crypto_backtest_results r
+                WHERE {' AND '.join(conditions)}
+                GROUP BY r.parameters_hash
+                ORDER BY AVG(r.{metric}) {order}
+                LIMIT %s
+            """
+        params.append(int(limit))
+
+        with self.get_connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+        for row in rows:
+            row['created_at'] = row['created_at'].isoformat() if row['created_at'] else None
+        return rows
+
+    def _handle_error(self, operation: str, error: Exception):
+        """Log a store failure; a missing (or pre-migration) table disables the store for this process"""
+        if isinstance(error, (psycopg.errors.UndefinedTable, psycopg.errors.UndefinedColumn)):
+            logger.warning("⚠️ crypto_backtest_results store table missing "
+                           "(run database/add_backtest_results_store.sql); result store disabled")
+            self.enabled = False
+        else:
+            logger.warning(f"Backtest result store {operation} error: {error}")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Persistent Backtest Worker Pool
+A long-lived process pool owned by the API process. Workers are started once,
+import pandas/numpy and the backtest service up front and keep one
+CryptoBacktestService (and its DB/Redis configuration) for their whole
+lifetime, so a run-all or SSE stream no longer pays process spawn and
+service construction on every request.
+
+Submissions go through a bounded queue: at most max_workers + max_queue_size
+tasks are in flight, further submitters wait (backpressure) and give up with
+WorkerPoolBusyError after queue_timeout seconds.
+
+A worker process that dies (e.g. OOM-killed during an hourly backtest) breaks
+its executor: the tasks in flight on it fail, and the executor is replaced so
+later tasks run on fresh workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from crypto_backtest_service import CryptoBacktestService
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolBusyError(Exception):
+    """Raised when the task queue stays full for longer than queue_timeout"""
+
+
+def _warm_up_task() -> int:
+    """No-op task used to force every worker process to start"""
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class BacktestWorkerPool:
+    """Warm process pool with a bounded task queue and utilisation stats"""
+
+    def __init__(self, db_config: Dict, max_workers: int = None, max_queue_size: int = None,
+                 queue_timeout: float = 300, enable_cache: bool = True):
+        """
+        Args:
+            db_config: Database configuration passed to each worker's service
+            max_workers: Worker processes (default: BACKTEST_POOL_WORKERS or all cores)
+            max_queue_size: Tasks allowed to wait beyond the running ones
+                            (default: BACKTEST_POOL_QUEUE_SIZE or 4 per worker)
+            queue_timeout: Seconds a submitter waits for a free slot
+            enable_cache: Enable Redis caching in the workers
+        """
+        self.db_config = db_config
+        self.enable_cache = enable_cache
+        self.max_workers = max_workers or int(os.getenv('BACKTEST_POOL_WORKERS', os.cpu_count() or 1))
+        self.max_queue_size = max_queue_size or int(os.getenv('BACKTEST_POOL_QUEUE_SIZE', self.max_workers * 4))
+        self.queue_timeout = queue_timeout
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0  # bumped whenever a broken executor is replaced
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue_size)
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._busy_rejections = 0
+        self._total_task_time = 0.0
+        self._restarts = 0
+
+    def start(self) -> 'BacktestWorkerPool':
+        """Start (and warm up) the worker processes; safe to call repeatedly"""
+        with self._lock:
+            if self._executor is not None:
+                return self
+            self._executor = self._new_executor()
+            self._started_at = time.time()
+
+        # ProcessPoolExecutor spawns lazily; one task per worker brings them all up
+        start = time.time()
+        pids = {future.result() for future in
+                [self._executor.submit(_warm_up_task) for _ in range(self.max_workers)]}
+        logger.info(f"🔥 Backtest worker pool warm: {len(pids)} processes in {time.time() - start:.2f}s")
+        return self
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=CryptoBacktestService._init_pool_worker,
+            initargs=(self.db_config, self.enable_cache)
+        )
+
+    def _replace_executor(self, generation: int) -> Tuple[Optional[ProcessPoolExecutor], int]:
+        """
+        Replace the executor of a generation broken by a dead worker process
+
+        Its tasks in flight have already failed with BrokenProcessPool; the
+        new executor (and task queue) takes every later task. Callers that
+        notice the same breakage get the replacement made by the first one.
+
+        Returns:
+            The current (executor, generation)
+        """
+        broken = None
+        with self._lock:
+            if self._generation == generation and self._executor is not None:
+                broken, self._executor = self._executor, self._new_executor()
+                self._generation += 1
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue_size)
+                self._restarts += 1
+            current = self._executor, self._generation
+        if broken is not None:
+            logger.warning("⚠️ Backtest worker process died; replaced the worker pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+        return current
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """
+        Submit a task, waiting while the queue is full
+
+        A broken executor (a worker died since the last task) is replaced
+        first. The future's pool_generation tells which executor ran it.
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            WorkerPoolBusyError: No slot became free within queue_timeout
+        """
+        if self._executor is None:
+            self.start()
+
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._busy_rejections += 1
+            raise WorkerPoolBusyError(
+                f"Backtest worker pool is busy ({self.max_workers} workers, "
+                f"{self.max_queue_size} queued tasks)"
+            )
+
+        with self._lock:
+            self._in_flight += 1
+            executor, generation = self._executor, self._generation
+        submitted_at = time.time()
+        try:
+            try:
+                future = executor.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                executor, generation = self._replace_executor(generation)
+                future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None, submitted_at, slots)
+            raise
+        future.pool_generation = generation
+        future.add_done_callback(lambda f: self._release(f, submitted_at, slots))
+        return future
+
+    def imap_unordered(self, fn: Callable, items: Iterable, heartbeat: float = None,
+                       on_worker_crash: Callable = None, **kwargs) -> Iterator[Tuple[object, object]]:
+        """
+        Run fn(item, **kwargs) for every item, yielding (item, result) as tasks finish
+
+        Submission is incremental, so results stream back while later items
+        are still waiting for a slot. Closing the generator early (e.g. a
+        disconnected SSE client) cancels every task that has not started.
+
+        With heartbeat, (HEARTBEAT, None) is yielded whenever no task finished
+        for that many seconds, so a streaming caller gets to write (and notice a
+        closed connection) while long backtests are running.
+
+        A task whose worker process died yields on_worker_crash(item, error)
+        as its result (without on_worker_crash, BrokenProcessPool is raised);
+        the remaining items run on the replacement executor.
+        """
+        pending = {}
+        items = iter(items)
+        exhausted = False
+        try:
+            while True:
+                # Keep the queue topped up without blocking on a full pool while results are due
+                while not exhausted and (not pending or self._has_free_slot()):
+                    item = next(items, _END)
+                    if item is _END:
+                        exhausted = True
+                        break
+                    pending[self.submit(fn, item, **kwargs)] = item
+
+                if not pending:
+                    return
+
+                done, _ = wait(pending, timeout=heartbeat, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield HEARTBEAT, None
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        self._replace_executor(future.pool_generation)
+                        if on_worker_crash is None:
+                            raise
+                        result = on_worker_crash(item, e)
+                    yield item, result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _has_free_slot(self) -> bool:
+        with self._lock:
+            return self._in_flight < self.max_workers + self.max_queue_size
+
+    def _release(self, future, submitted_at: float, slots: threading.BoundedSemaphore):
+        with self._lock:
+            self._in_flight -= 1
+            if future is None or future.cancelled():
+                self._cancelled += 1
+            elif future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+                self._total_task_time += time.time() - submitted_at
+        slots.release()  # the semaphore the slot came from (a replaced pool has a new one)
+
+    def get_stats(self) -> Dict:
+        """Pool utilisation and queue depth"""
+        with self._lock:
+            running = min(self._in_flight, self.max_workers)
+            return {
+                'started': self._executor is not None,
+                'uptime_seconds': round(time.time() - self._started_at, 1) if self._started_at else 0,
+                'workers': self.max_workers,
+                'busy_workers': running,
+                'utilisation_percent': round(running / self.max_workers * 100, 1),
+                'queue_depth': max(0, self._in_flight - self.max_workers),
+                'queue_capacity': self.max_queue_size,
+                'tasks_completed': self._completed,
+                'tasks_failed': self._failed,
+                'tasks_cancelled': self._cancelled,
+                'busy_rejections': self._busy_rejections,
+                'worker_restarts': self._restarts,
+                'average_turnaround_ms': round(self._total_task_time / self._completed * 1000, 1) if self._completed else 0
+            }
+
+    def shutdown(self, wait_for_tasks: bool = True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._started_at = None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_tasks, cancel_futures=not wait_for_tasks)
+
+
+# Sentinel for exhausted item iterators in imap_unordered
+_END = object()
+
+# Item yielded by imap_unordered when no task finished within its heartbeat
+HEARTBEAT = object()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark Support/Resistance level detection
+Compares the incremental pivot tracker against rescanning the lookback
+window on every bar (the previous implementation) on multi-year hourly data
+"""
+
+import sys
+import time
+import numpy as np
+sys.path.append('/app')
+
+from crypto_backtest_service import CryptoBacktestService
+
+
+def rescan_support_resistance(close, lookback_period, min_touches, tolerance=0.02):
+    """Previous implementation: find and cluster pivots from scratch for every bar"""
+    n = len(close)
+    has_levels = np.zeros(n, dtype=bool)
+    nearest_support = np.full(n, np.nan)
+    nearest_resistance = np.full(n, np.nan)
+
+    for i in range(lookback_period, n):
+        prices = close[i-lookback_period:i]
+        levels = []
+        for k in range(2, len(prices) - 2):
+            if prices[k] < prices[k-1] and prices[k] < prices[k+1] and \
+               prices[k] < prices[k-2] and prices[k] < prices[k+2]:
+                levels.append(('support', prices[k]))
+            elif prices[k] > prices[k-1] and prices[k] > prices[k+1] and \
+                 prices[k] > prices[k-2] and prices[k] > prices[k+2]:
+                levels.append(('resistance', prices[k]))
+
+        clustered = []
+        for level_type, price in levels:
+            for j, (existing_type, existing_price, count) in enumerate(clustered):
+                if level_type == existing_type and abs(price - existing_price) / existing_price < tolerance:
+                    clustered[j] = (existing_type, (existing_price * count + price) / (count + 1), count + 1)
+                    break
+            else:
+                clustered.append((level_type, price, 1))
+
+        support_levels = [p for t, p, c in clustered if c >= min_touches and t == 'support']
+        resistance_levels = [p for t, p, c in clustered if c >= min_touches and t == 'resistance']
+        if not support_levels and not resistance_levels:
+            continue
+
+        has_levels[i] = True
+        current_price = close[i]
+        if support_levels:
+            nearest_support[i] = min(support_levels, key=lambda x: abs(x - current_price))
+        if resistance_levels:
+            nearest_resistance[i] = min(resistance_levels, key=lambda x: abs(x - current_price))
+
+    return has_levels, nearest_support, nearest_resistance
+
+
+def benchmark_support_resistance(years=3, reference_bars=8760):
+    """Time both implementations and check they produce identical levels"""
+    service = CryptoBacktestService(enable_cache=False)
+    rng = np.random.default_rng(11)
+    n = years * 8760
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+    print("=" * 70)
+    print(f"SUPPORT/RESISTANCE BENCHMARK ({years} years hourly, {n:,} bars)")
+    print("=" * 70)
+
+    for lookback_period, min_touches in ((20, 2), (50, 2), (100, 3), (200, 2)):
+        print(f"\nLookback {lookback_period}, min touches {min_touches}")
+
+        start = time.time()
+        incremental = service._nearest_support_resistance(close, lookback_period, min_touches)
+        time_incremental = time.time() - start
+
+        # The rescan is too slow for the full series; time a one-year slice
+        sample = close[:reference_bars]
+        start = time.time()
+        expected = rescan_support_resistance(sample, lookback_period, min_touches)
+        time_rescan = (time.time() - start) * n / len(sample)
+
+        actual = service._nearest_support_resistance(sample, lookback_period, min_touches)
+        for expected_array, actual_array in zip(expected, actual):
+            assert np.array_equal(expected_array, actual_array, equal_nan=True), "Level mismatch"
+        assert np.array_equal(incremental[1][:len(sample)], expected[1], equal_nan=True)
+
+        print(f"   Rescan (extrapolated): {time_rescan:.2f}s")
+        print(f"   Incremental:           {time_incremental:.3f}s")
+        print(f"   🚀 Speedup: {time_rescan / time_incremental:.0f}x faster, levels identical")
+
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    benchmark_support_resistance(years)
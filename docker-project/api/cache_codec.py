@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Cache Value Codecs
+Encoding of the values CacheService keeps in Redis: compact JSON text,
+compressed by a codec and prefixed with a 3-byte header (NUL, format version,
+codec id). Values written before the header existed are plain JSON text, which
+never starts with NUL, so they are still read.
+
+Codecs are looked up by id on read, so entries written with any registered
+codec stay readable when CACHE_CODEC changes.
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+CODEC_MAGIC = b'\x00'
+CODEC_FORMAT_VERSION = 1
+HEADER_SIZE = 3
+
+
+class CacheCodec:
+    """Compression applied to the JSON text of a cache value"""
+
+    def __init__(self, name: str, codec_id: int, compress: Callable[[bytes], bytes],
+                 decompress: Callable[[bytes], bytes]):
+        self.name = name
+        self.codec_id = codec_id
+        self.compress = compress
+        self.decompress = decompress
+
+
+CODECS: Dict[str, CacheCodec] = {}
+_CODECS_BY_ID: Dict[int, CacheCodec] = {}
+
+
+def register_codec(codec: CacheCodec):
+    """Make a codec available for writing (by name) and reading (by id)"""
+    if _CODECS_BY_ID.get(codec.codec_id, codec).name != codec.name:
+        raise ValueError(f"Codec id {codec.codec_id} is already used by '{_CODECS_BY_ID[codec.codec_id].name}'")
+    CODECS[codec.name] = codec
+    _CODECS_BY_ID[codec.codec_id] = codec
+
+
+register_codec(CacheCodec('json', 0, bytes, bytes))
+register_codec(CacheCodec('zlib', 1, lambda data: zlib.compress(data, 6), zlib.decompress))
+
+
+def get_codec(name: str) -> CacheCodec:
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec '{name}' (expected one of {', '.join(CODECS)})")
+    return CODECS[name]
+
+
+def encode_value(value: Any, codec: CacheCodec) -> Tuple[bytes, int]:
+    """(payload, JSON size) of a JSON-serializable value"""
+    text = json.dumps(value, separators=(',', ':')).encode()
+    header = CODEC_MAGIC + bytes((CODEC_FORMAT_VERSION, codec.codec_id))
+    return header + codec.compress(text), len(text)
+
+
+def decode_value(payload: bytes) -> Tuple[Any, int]:
+    """(value, JSON size) of a payload from encode_value or a legacy plain JSON entry"""
+    if not payload.startswith(CODEC_MAGIC):
+        return json.loads(payload), len(payload)
+    if len(payload) < HEADER_SIZE or payload[1] != CODEC_FORMAT_VERSION or payload[2] not in _CODECS_BY_ID:
+        raise ValueError(f"Unsupported cache entry header {payload[:HEADER_SIZE]!r}")
+    text = _CODECS_BY_ID[payload[2]].decompress(payload[HEADER_SIZE:])
+    return json.loads(text), len(text)
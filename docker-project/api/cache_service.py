@@ -2,6 +2,12 @@
 """
 Redis Cache Service for Crypto Backtest Results
 Provides caching layer to speed up repeated queries by 50-100x
+
+Two tiers: a small in-process LRU (L1) of decoded values in front of Redis
+(L2), which holds compressed payloads (see cache_codec). L1 entries live at
+most CACHE_L1_TTL seconds and are dropped in every process when a key is
+set, deleted or cleared (Redis pub/sub), so repeat hits cost microseconds
+instead of a round trip plus decoding.
 """
 
 import redis
@@ -9,15 +15,115 @@ import json
 import hashlib
 import logging
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import timedelta
+from cache_codec import get_codec, encode_value, decode_value
 
 logger = logging.getLogger(__name__)
 
+# Pub/sub channel announcing changed keys to the L1 caches of all processes
+INVALIDATION_CHANNEL = 'cache:invalidate'
+
+# Tag sets: 'tag:<tag>' holds the keys of the entries set with that tag
+TAG_PREFIX = 'tag:'
+
+# Keys per SCAN/SSCAN step and per UNLINK
+SCAN_BATCH = 500
+
+# Single-flight locks: 'lock:<key>' is held by the caller computing <key>
+LOCK_PREFIX = 'lock:'
+
+# Delete a lock only if it still holds the caller's token (it may have expired and been retaken)
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def crypto_tag(crypto_id: int) -> str:
+    """Tag of cached entries computed from a coin's price data"""
+    return f'crypto:{crypto_id}'
+
+
+def strategy_tag(strategy_id: int) -> str:
+    """Tag of cached entries computed by a strategy"""
+    return f'strategy:{strategy_id}'
+
+
+class LocalCache:
+    """
+    Size-bounded, TTL-aware LRU of decoded values (thread-safe)
+    
+    Sizes are the JSON lengths of the values, so the byte budget tracks what
+    the entries cost in Redis.
+    """
+    
+    def __init__(self, max_bytes: int, max_entries: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.bytes = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(found, value); expired entries count as missing"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self.entries.move_to_end(key)
+            return True, entry[2]
+    
+    def put(self, key: str, value: Any, size: int, ttl: Optional[float] = None):
+        """Store a value for min(ttl, L1 TTL) seconds; values over a quarter of the budget are skipped"""
+        with self.lock:
+            self._remove(key)
+            if size > self.max_bytes // 4:
+                return
+            lifetime = min(ttl, self.ttl) if ttl else self.ttl
+            self.entries[key] = (time.monotonic() + lifetime, size, value)
+            self.bytes += size
+            while self.entries and (self.bytes > self.max_bytes or len(self.entries) > self.max_entries):
+                self._remove(next(iter(self.entries)))
+    
+    def discard(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self._remove(key)
+    
+    def discard_pattern(self, pattern: str):
+        """Drop keys matching a Redis glob pattern"""
+        with self.lock:
+            for key in [key for key in self.entries if fnmatchcase(key, pattern)]:
+                self._remove(key)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+    
+    def _remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+
 class CacheService:
     """Redis-based caching service for backtest results"""
     
-    def __init__(self, host=None, port=None, db=0, default_ttl=86400):
+    def __init__(self, host=None, port=None, db=0, default_ttl=86400, local_max_mb=None,
+                 local_max_entries=None, local_ttl=None, codec=None):
         """
         Initialize Redis cache connection
         
@@ -26,12 +132,39 @@ class CacheService:
             port: Redis port (default: from REDIS_PORT env or 6379)
             db: Redis database number (default: 0)
             default_ttl: Default time-to-live in seconds (default: 86400 = 24 hours)
+            local_max_mb: L1 size budget (default: CACHE_L1_MAX_MB env or 64; 0 disables L1)
+            local_max_entries: L1 entry limit (default: CACHE_L1_MAX_ENTRIES env or 1024)
+            local_ttl: Longest L1 lifetime in seconds (default: CACHE_L1_TTL env or 60)
+            codec: Codec for new entries (default: CACHE_CODEC env or 'zlib');
+                   entries written with any registered codec are read
         """
         self.host = host or os.getenv('REDIS_HOST', 'redis')
         self.port = int(port or os.getenv('REDIS_PORT', 6379))
         self.db = db
         self.default_ttl = default_ttl
         self.enabled = True
+        self.codec = get_codec(codec or os.getenv('CACHE_CODEC', 'zlib'))
+        self.codec_stats = {'encoded': 0, 'encoded_bytes': 0, 'encoded_json_bytes': 0, 'encode_seconds': 0.0,
+                            'decoded': 0, 'decoded_bytes': 0, 'decode_seconds': 0.0}
+        
+        # L1: in-process LRU in front of Redis
+        local_max_mb = float(os.getenv('CACHE_L1_MAX_MB', 64)) if local_max_mb is None else local_max_mb
+        self.local = None
+        if local_max_mb > 0:
+            self.local = LocalCache(
+                max_bytes=int(local_max_mb * 2**20),
+                max_entries=local_max_entries or int(os.getenv('CACHE_L1_MAX_ENTRIES', 1024)),
+                ttl=local_ttl or float(os.getenv('CACHE_L1_TTL', 60))
+            )
+        self.local_stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+        self.instance_id = uuid.uuid4().hex
+        
+        # Single flight: lock timeout and the keys this process's callers wait for
+        self.lock_ttl = int(os.getenv('CACHE_LOCK_TTL', 120))
+        self._waiters = {}  # key -> threading.Event
+        self._waiters_lock = threading.Lock()
+        self._listener = None
+        self._listener_pid = None
         
         try:
             self.redis_client = redis.Redis(
@@ -43,13 +176,87 @@ class CacheService:
                 socket_timeout=5,
                 retry_on_timeout=True
             )
+            # Cached values are binary payloads: read and written without decoding
+            self.binary_client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True
+            )
+            self._release_lock_script = self.redis_client.register_script(RELEASE_LOCK_SCRIPT)
             # Test connection
             self.redis_client.ping()
-            logger.info(f"✅ Redis cache connected: {self.host}:{self.port} (TTL: {default_ttl}s)")
+            logger.info(f"✅ Redis cache connected: {self.host}:{self.port} (TTL: {default_ttl}s, codec: {self.codec.name})")
         except Exception as e:
             logger.warning(f"⚠️ Redis cache unavailable: {e}. Running without cache.")
             self.enabled = False
             self.redis_client = None
+            self.binary_client = None
+        
+        if self.enabled and self.local:
+            self._ensure_listener()
+    
+    def _ensure_listener(self):
+        """
+        Subscribe this process to L1 invalidations
+        
+        Forked workers inherit the parent's L1 but not its listener thread, so a
+        new process starts with an empty L1 and its own subscription.
+        """
+        if self._listener_pid == os.getpid():
+            return
+        if self._listener_pid is not None:
+            self.local.clear()
+        self._listener_pid = os.getpid()
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+            self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True,
+                                                  exception_handler=self._on_listener_error)
+        except Exception as e:
+            # Without invalidations L1 entries could outlive changes in other processes
+            logger.warning(f"⚠️ Cache invalidation channel unavailable, L1 disabled: {e}")
+            self.local = None
+    
+    def _on_invalidation(self, message):
+        """Apply an invalidation published by another process"""
+        try:
+            event = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        if event.get('sender') == self.instance_id:
+            return
+        if 'released' in event:
+            self._notify_waiters(event['released'])
+            return
+        if self.local:
+            if 'keys' in event:
+                self.local.discard(*event['keys'])
+            elif 'pattern' in event:
+                self.local.discard_pattern(event['pattern'])
+            else:
+                self.local.clear()
+        if 'keys' in event:
+            self._notify_waiters(event['keys'])
+    
+    def _on_listener_error(self, error, pubsub, thread):
+        """The invalidation listener died: stop serving from L1"""
+        logger.warning(f"⚠️ Cache invalidation listener stopped, L1 disabled: {error}")
+        self.local = None
+        thread.stop()
+    
+    def _publish_invalidation(self, client, **event):
+        """Announce changed keys (keys=[...], pattern=..., released=[...] or nothing for all) to other processes"""
+        client.publish(INVALIDATION_CHANNEL, json.dumps({'sender': self.instance_id, **event}))
+    
+    def _notify_waiters(self, keys: List[str]):
+        """Wake this process's callers waiting for any of the keys (see wait_for)"""
+        with self._waiters_lock:
+            events = [self._waiters.pop(key) for key in keys if key in self._waiters]
+        for event in events:
+            event.set()
     
     def generate_cache_key(self, prefix: str, **params) -> str:
         """
@@ -83,24 +290,84 @@ class CacheService:
             key: Cache key
         
         Returns:
-            Cached data as dictionary, or None if not found
+            Cached data as dictionary, or None if not found. L1 hits return the
+            object held in memory, so callers must not modify it
         """
         if not self.enabled:
             return None
         
+        if self.local:
+            self._ensure_listener()
+            found, value = self.local.get(key)
+            if found:
+                self.local_stats['l1_hits'] += 1
+                return value
+        
         try:
-            cached_data = self.redis_client.get(key)
+            cached_data = self.binary_client.get(key)
             if cached_data:
                 logger.debug(f"🎯 Cache HIT: {key}")
-                return json.loads(cached_data)
+                started = time.perf_counter()
+                value, json_size = decode_value(cached_data)
+                self._count_codec('decode', len(cached_data), time.perf_counter() - started)
+                self.local_stats['l2_hits'] += 1
+                if self.local:
+                    self.local.put(key, value, json_size)
+                return value
             else:
                 logger.debug(f"❌ Cache MISS: {key}")
+                self.local_stats['misses'] += 1
                 return None
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
             return None
     
-    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several cached values in one Redis round trip (MGET)
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            Key -> value for the keys that were found (same sharing rule as get)
+        """
+        if not self.enabled or not keys:
+            return {}
+        
+        found = {}
+        if self.local:
+            self._ensure_listener()
+            for key in keys:
+                hit, value = self.local.get(key)
+                if hit:
+                    found[key] = value
+            self.local_stats['l1_hits'] += len(found)
+        
+        remaining = [key for key in dict.fromkeys(keys) if key not in found]
+        if not remaining:
+            return found
+        try:
+            l2_hits = 0
+            for key, cached_data in zip(remaining, self.binary_client.mget(remaining)):
+                if not cached_data:
+                    continue
+                started = time.perf_counter()
+                value, json_size = decode_value(cached_data)
+                self._count_codec('decode', len(cached_data), time.perf_counter() - started)
+                found[key] = value
+                l2_hits += 1
+                if self.local:
+                    self.local.put(key, value, json_size)
+            self.local_stats['l2_hits'] += l2_hits
+            self.local_stats['misses'] += len(remaining) - l2_hits
+            logger.debug(f"🎯 Cache MGET: {len(found)}/{len(keys)} hits")
+        except Exception as e:
+            logger.warning(f"Cache get_many error: {e}")
+        return found
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None,
+            tags: Optional[List[str]] = None) -> bool:
         """
         Set cached value with TTL
         
@@ -108,6 +375,8 @@ class CacheService:
             key: Cache key
             value: Data to cache (must be JSON serializable)
             ttl: Time-to-live in seconds (default: self.default_ttl)
+            tags: Tags to index the key under (e.g. crypto_tag(1)), so
+                  invalidate_tags can delete it without knowing the key
         
         Returns:
             True if successful, False otherwise
@@ -117,8 +386,23 @@ class CacheService:
         
         try:
             ttl = ttl or self.default_ttl
-            json_data = json.dumps(value)
-            self.redis_client.setex(key, ttl, json_data)
+            started = time.perf_counter()
+            payload, json_size = encode_value(value, self.codec)
+            self._count_codec('encode', len(payload), time.perf_counter() - started, json_size)
+            pipeline = self.binary_client.pipeline(transaction=False)
+            pipeline.setex(key, ttl, payload)
+            for tag in tags or ():
+                # A tag set lives as long as its longest-lived key (NX: new set, GT: longer TTL)
+                pipeline.sadd(TAG_PREFIX + tag, key)
+                pipeline.expire(TAG_PREFIX + tag, ttl, nx=True)
+                pipeline.expire(TAG_PREFIX + tag, ttl, gt=True)
+            if self.local:
+                self._ensure_listener()
+                self._publish_invalidation(pipeline, keys=[key])
+            pipeline.execute()
+            if self.local:
+                self.local.put(key, value, json_size, ttl)
+            self._notify_waiters([key])
             logger.debug(f"💾 Cache SET: {key} (TTL: {ttl}s)")
             return True
         except Exception as e:
@@ -140,6 +424,9 @@ class CacheService:
         
         try:
             self.redis_client.delete(key)
+            if self.local:
+                self.local.discard(key)
+                self._publish_invalidation(self.redis_client, keys=[key])
             logger.debug(f"🗑️ Cache DELETE: {key}")
             return True
         except Exception as e:
@@ -150,6 +437,10 @@ class CacheService:
         """
         Delete all keys matching a pattern
         
+        Keys are found with SCAN and deleted in batches with UNLINK, so a large
+        keyspace does not block Redis (as KEYS would). Prefer invalidate_tags
+        when the entries are tagged.
+        
         Args:
             pattern: Redis key pattern (e.g., 'backtest:*')
         
@@ -160,22 +451,170 @@ class CacheService:
             return 0
         
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                deleted = self.redis_client.delete(*keys)
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH:
+                    deleted += self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis_client.unlink(*batch)
+            if self.local:
+                self.local.discard_pattern(pattern)
+                self._publish_invalidation(self.redis_client, pattern=pattern)
+            if deleted:
                 logger.info(f"🗑️ Cache CLEAR: {deleted} keys matching '{pattern}'")
-                return deleted
-            return 0
+            return deleted
         except Exception as e:
             logger.warning(f"Cache clear error: {e}")
             return 0
     
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every entry set with one of the tags
+        
+        Each tag set is renamed first, so keys tagged while it is being
+        processed go into a new set and are not lost; the renamed set is read
+        with SSCAN and its keys deleted in batches with UNLINK.
+        
+        Args:
+            *tags: Tags passed to set (e.g. crypto_tag(1))
+        
+        Returns:
+            Number of entries deleted
+        """
+        if not self.enabled or not tags:
+            return 0
+        
+        try:
+            deleted = 0
+            for tag in tags:
+                pending = f'{TAG_PREFIX}{tag}:invalidating:{uuid.uuid4().hex}'
+                try:
+                    self.redis_client.rename(TAG_PREFIX + tag, pending)
+                except redis.ResponseError:
+                    continue  # no entries with this tag
+                batch = []
+                for key in self.redis_client.sscan_iter(pending, count=SCAN_BATCH):
+                    batch.append(key)
+                    if len(batch) >= SCAN_BATCH:
+                        deleted += self._unlink_keys(batch)
+                        batch = []
+                deleted += self._unlink_keys(batch)
+                self.redis_client.unlink(pending)
+            if deleted:
+                logger.info(f"🗑️ Cache INVALIDATE: {deleted} entries tagged {', '.join(tags)}")
+            return deleted
+        except Exception as e:
+            logger.warning(f"Cache invalidate error: {e}")
+            return 0
+    
+    def _unlink_keys(self, keys: List[str]) -> int:
+        """Delete keys from Redis and from every process's L1"""
+        if not keys:
+            return 0
+        deleted = self.redis_client.unlink(*keys)
+        if self.local:
+            self.local.discard(*keys)
+            self._publish_invalidation(self.redis_client, keys=keys)
+        return deleted
+    
+    def acquire_lock(self, key: str, ttl: Optional[int] = None) -> Optional[str]:
+        """
+        Take the single-flight lock of a key before computing it (SET NX EX)
+        
+        Args:
+            key: Cache key about to be computed
+            ttl: Seconds after which the lock expires on its own, so a crashed
+                 holder cannot block the key (default: CACHE_LOCK_TTL env or 120)
+        
+        Returns:
+            Token for release_lock; None when another caller holds the lock
+            (see wait_for); '' when Redis is unavailable (compute without a lock)
+        """
+        if not self.enabled:
+            return ''
+        
+        token = uuid.uuid4().hex
+        try:
+            if self.redis_client.set(LOCK_PREFIX + key, token, nx=True, ex=ttl or self.lock_ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"Cache lock error: {e}")
+            return ''
+    
+    def release_lock(self, key: str, token: Optional[str]):
+        """Release a lock taken by acquire_lock (if this token still holds it) and wake the key's waiters"""
+        if not self.enabled or not token:
+            return
+        
+        try:
+            self._release_lock_script(keys=[LOCK_PREFIX + key], args=[token])
+            self._publish_invalidation(self.redis_client, released=[key])
+        except Exception as e:
+            logger.warning(f"Cache unlock error: {e}")
+        self._notify_waiters([key])
+    
+    def wait_for(self, key: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Wait for the caller holding a key's lock to store the key
+        
+        Returns once the key is set or the lock is gone (released, or expired
+        after a crash). Waiters are woken through the invalidation channel
+        and re-check at short intervals in case a notification is missed.
+        
+        Args:
+            key: Cache key locked by another caller
+            timeout: Longest wait in seconds (default: the lock TTL)
+        
+        Returns:
+            The stored value, or None when the holder stored nothing or the
+            wait timed out (the caller then computes the key itself)
+        """
+        if not self.enabled:
+            return None
+        
+        if self.local:
+            self._ensure_listener()
+        timeout = timeout or self.lock_ttl
+        deadline = time.monotonic() + timeout
+        interval = 0.05
+        try:
+            while True:
+                with self._waiters_lock:
+                    event = self._waiters.setdefault(key, threading.Event())
+                pipeline = self.binary_client.pipeline(transaction=False)
+                pipeline.get(key)
+                pipeline.exists(LOCK_PREFIX + key)
+                payload, locked = pipeline.execute()
+                if not payload and not locked:
+                    payload = self.binary_client.get(key)  # set just before the lock was released
+                if payload:
+                    logger.debug(f"🎯 Cache WAIT: {key} computed by another caller")
+                    return decode_value(payload)[0]
+                if not locked:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"⏳ Gave up waiting for {key} after {timeout}s")
+                    return None
+                event.wait(min(interval, remaining))
+                interval = min(interval * 2, 1.0)
+        except Exception as e:
+            logger.warning(f"Cache wait error: {e}")
+            return None
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics
         
         Returns:
-            Dictionary with cache stats (keys, memory, hits, misses)
+            Dictionary with cache stats (keys, memory, hits, misses); 'tiers'
+            has this process's L1 (in-process) and L2 (Redis) lookups and hit
+            rates (L2 rate: of the lookups L1 missed), 'codec' its payload
+            sizes and encode/decode times
         """
         if not self.enabled:
             return {
@@ -206,7 +645,9 @@ class CacheService:
                 'hit_rate': self._calculate_hit_rate(
                     info.get('keyspace_hits', 0),
                     info.get('keyspace_misses', 0)
-                )
+                ),
+                'tiers': self._tier_stats(),
+                'codec': self._codec_stats()
             }
         except Exception as e:
             logger.warning(f"Cache stats error: {e}")
@@ -215,6 +656,131 @@ class CacheService:
                 'error': str(e)
             }
     
+    def increment_counters(self, key: str, counts: Dict[str, int]) -> bool:
+        """
+        Atomically add to the integer fields of a counter hash (shared by all processes)
+        
+        Args:
+            key: Counter hash key (e.g., 'stats:backtest_cache:1')
+            counts: Field -> amount to add
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled or not counts:
+            return False
+        
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for field, amount in counts.items():
+                pipeline.hincrby(key, field, amount)
+            pipeline.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache counter error: {e}")
+            return False
+    
+    def get_counters(self, pattern: str) -> Dict[str, Dict[str, int]]:
+        """
+        Counter hashes matching a pattern
+        
+        Args:
+            pattern: Redis key pattern (e.g., 'stats:backtest_cache:*')
+        
+        Returns:
+            Key -> {field: count}
+        """
+        if not self.enabled:
+            return {}
+        
+        try:
+            return {
+                key: {field: int(count) for field, count in self.redis_client.hgetall(key).items()}
+                for key in self.redis_client.scan_iter(match=pattern, count=100)
+            }
+        except Exception as e:
+            logger.warning(f"Cache counter error: {e}")
+            return {}
+    
+    def increment_usage(self, key: str, member: str, ttl: Optional[int] = None) -> bool:
+        """
+        Add one to a member's score in a usage ranking (sorted set shared by all processes)
+        
+        Args:
+            key: Ranking key (e.g., one per day)
+            member: What was used (e.g., a JSON request description)
+            ttl: Time-to-live of the ranking in seconds (default: self.default_ttl)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
+            return False
+        
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.zincrby(key, 1, member)
+            pipeline.expire(key, ttl or self.default_ttl)
+            pipeline.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache usage error: {e}")
+            return False
+    
+    def get_top_usage(self, keys: List[str], limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Most-used members over several usage rankings (scores summed)
+        
+        Returns:
+            (member, score) pairs, highest score first
+        """
+        if not self.enabled or not keys:
+            return []
+        
+        try:
+            ranked = self.redis_client.zunion(keys, withscores=True)
+            return sorted(ranked, key=lambda entry: entry[1], reverse=True)[:limit]
+        except Exception as e:
+            logger.warning(f"Cache usage error: {e}")
+            return []
+    
+    def _tier_stats(self) -> Dict[str, Any]:
+        """L1/L2 lookup counts and hit rates of this process"""
+        l1_hits, l2_hits, misses = (self.local_stats[name] for name in ('l1_hits', 'l2_hits', 'misses'))
+        l1 = {'enabled': self.local is not None, 'hits': l1_hits, 'misses': l2_hits + misses,
+              'hit_rate': self._calculate_hit_rate(l1_hits, l2_hits + misses)}
+        if self.local:
+            l1.update(entries=len(self.local.entries), bytes=self.local.bytes, max_bytes=self.local.max_bytes,
+                      ttl_seconds=self.local.ttl)
+        return {
+            'l1': l1,
+            'l2': {'hits': l2_hits, 'misses': misses, 'hit_rate': self._calculate_hit_rate(l2_hits, misses)}
+        }
+    
+    def _count_codec(self, operation: str, payload_bytes: int, seconds: float, json_bytes: int = 0):
+        stats = self.codec_stats
+        stats[f'{operation}d'] += 1
+        stats[f'{operation}d_bytes'] += payload_bytes
+        stats[f'{operation}_seconds'] += seconds
+        if json_bytes:
+            stats['encoded_json_bytes'] += json_bytes
+    
+    def _codec_stats(self) -> Dict[str, Any]:
+        """Average entry size, compression ratio and encode/decode times of this process"""
+        stats = self.codec_stats
+        encoded, decoded = stats['encoded'], stats['decoded']
+        return {
+            'codec': self.codec.name,
+            'entries_encoded': encoded,
+            'entries_decoded': decoded,
+            'avg_entry_bytes': round(stats['encoded_bytes'] / encoded) if encoded else None,
+            'avg_read_bytes': round(stats['decoded_bytes'] / decoded) if decoded else None,
+            'compression_ratio': (round(stats['encoded_json_bytes'] / stats['encoded_bytes'], 2)
+                                  if stats['encoded_bytes'] else None),
+            'avg_encode_ms': round(stats['encode_seconds'] * 1000 / encoded, 3) if encoded else None,
+            'avg_decode_ms': round(stats['decode_seconds'] * 1000 / decoded, 3) if decoded else None
+        }
+    
     def _calculate_hit_rate(self, hits: int, misses: int) -> str:
         """Calculate cache hit rate percentage"""
         total = hits + misses
@@ -235,6 +801,9 @@ class CacheService:
         
         try:
             self.redis_client.flushdb()
+            if self.local:
+                self.local.clear()
+                self._publish_invalidation(self.redis_client)
             logger.warning("⚠️ Cache FLUSH: All keys deleted!")
             return True
         except Exception as e:
@@ -246,7 +815,9 @@ class CacheService:
         """
         Get cached value or compute and cache it
         
-        This is a convenience method that combines get/set logic.
+        This is a convenience method that combines get/set logic. On a miss only
+        one caller (across processes) computes the key; concurrent callers wait
+        for its result (see acquire_lock and wait_for).
         
         Args:
             key: Cache key
@@ -276,10 +847,20 @@ class CacheService:
         if cached is not None:
             return cached
         
-        # Cache miss - compute and store
-        result = compute_func()
-        self.set(key, result, ttl)
-        return result
+        # Cache miss - one caller computes and stores, the others wait for it
+        token = self.acquire_lock(key)
+        if token is None:
+            cached = self.wait_for(key)
+            if cached is not None:
+                return cached
+            # Holder failed, timed out or stored nothing: compute here
+            token = self.acquire_lock(key)
+        try:
+            result = compute_func()
+            self.set(key, result, ttl)
+            return result
+        finally:
+            self.release_lock(key, token)
 
 
 # Global cache instance (singleton)
@@ -302,3 +883,8 @@ def get_cache_service() -> CacheService:
     if _cache_instance is None:
         _cache_instance = CacheService()
     return _cache_instance
+
+
+def invalidate_crypto_cache(crypto_id: int) -> int:
+    """Drop cached entries computed from a coin's prices (called when new bars are stored)"""
+    return get_cache_service().invalidate_tags(crypto_tag(crypto_id))
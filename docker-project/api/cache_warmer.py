@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Backtest Cache Warmer
+Recomputes the run-all results users are most likely to open next, right after
+new prices are stored (collect_crypto_data.update_crypto_data), so the first
+visitor after an hourly update is served from the cache instead of paying the
+cold compute for every coin.
+
+Warmed per active strategy: its default parameters, plus the most-requested
+requests of the last days from the usage log (the run-all, single-coin and
+streaming endpoints record every request with record_request).
+
+Throttling: runs go one at a time, daily data as one panel pass in this process
+(no worker pool), with a pause between runs; warm_after_ingestion also lowers
+the process's CPU priority so interactive requests win. A Redis lock keeps two
+warmers from overlapping. Progress is kept in the cache (get_status), so the API
+reports it from any process.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = 'cache_warmer:status'
+LOCK_KEY = 'cache_warmer'
+USAGE_KEY = 'usage:run_all:{day}'
+
+
+class CacheWarmer:
+    """Recompute and cache the default and most-requested run-all backtests"""
+
+    def __init__(self, backtest_service, pause: float = None, top_requests: int = None,
+                 usage_days: int = None):
+        """
+        Args:
+            backtest_service: CryptoBacktestService the runs go through
+            pause: Seconds between runs (default: CACHE_WARM_PAUSE env or 2)
+            top_requests: Most-requested run-alls warmed besides the defaults
+                          (default: CACHE_WARM_TOP_REQUESTS env or 5)
+            usage_days: Days of the usage log that count (default: CACHE_WARM_USAGE_DAYS env or 7)
+        """
+        self.backtest_service = backtest_service
+        self.cache = get_cache_service()
+        self.pause = float(os.getenv('CACHE_WARM_PAUSE', 2)) if pause is None else pause
+        self.top_requests = int(os.getenv('CACHE_WARM_TOP_REQUESTS', 5)) if top_requests is None else top_requests
+        self.usage_days = usage_days or int(os.getenv('CACHE_WARM_USAGE_DAYS', 7))
+
+    def record_request(self, strategy_id: int, parameters: Dict, start_date: str = None, end_date: str = None,
+                       interval: str = '1d'):
+        """Count a backtest request in today's usage log (invalid parameters are not counted)"""
+        try:
+            parameters = self.backtest_service.canonical_parameters(strategy_id, parameters)
+        except (TypeError, ValueError):
+            return
+        member = json.dumps({'strategy_id': int(strategy_id), 'parameters': parameters, 'start_date': start_date,
+                             'end_date': end_date, 'interval': interval}, sort_keys=True)
+        day = datetime.now().strftime('%Y%m%d')
+        self.cache.increment_usage(USAGE_KEY.format(day=day), member, ttl=(self.usage_days + 1) * 86400)
+
+    def plan(self) -> List[Dict]:
+        """
+        Run-alls to warm: each active strategy's defaults, then the most-requested ones
+
+        Returns:
+            Dicts with strategy_id, parameters, start_date, end_date and interval
+            (duplicates removed, defaults first)
+        """
+        active = {strategy['id'] for strategy in self.backtest_service.get_available_strategies()}
+        runs = [{'strategy_id': strategy_id, 'parameters': self.backtest_service.canonical_parameters(strategy_id, {}),
+                 'start_date': None, 'end_date': None, 'interval': '1d'} for strategy_id in sorted(active)]
+
+        today = datetime.now()
+        days = [USAGE_KEY.format(day=(today - timedelta(days=n)).strftime('%Y%m%d')) for n in range(self.usage_days)]
+        for member, _ in self.cache.get_top_usage(days, limit=self.top_requests * 4):
+            request = json.loads(member)
+            if request['strategy_id'] in active and request not in runs:
+                runs.append(request)
+            if len(runs) >= len(active) + self.top_requests:
+                break
+        return runs
+
+    def run(self, reason: str = 'manual') -> Dict:
+        """
+        Warm the cache once (skipped while another warmer runs)
+
+        Returns:
+            Final status (see get_status)
+        """
+        if not self.cache.enabled:
+            return {'state': 'disabled'}
+        token = self.cache.acquire_lock(LOCK_KEY, ttl=3600)
+        if token is None:
+            logger.info("🔥 Cache warmer already running, skipped")
+            return self.get_status()
+
+        started = time.time()
+        status = {'state': 'running', 'reason': reason, 'started_at': datetime.now().isoformat(),
+                  'finished_at': None, 'runs_total': 0, 'runs_done': 0, 'current': None,
+                  'coins_cached': 0, 'coins_computed': 0, 'errors': []}
+        try:
+            runs = self.plan()
+            status['runs_total'] = len(runs)
+            self._save_status(status)
+            logger.info(f"🔥 Cache warmer: {len(runs)} run-all(s) after {reason}")
+
+            for request in runs:
+                status['current'] = request
+                self._save_status(status)
+                try:
+                    results = self.backtest_service.run_strategy_against_all_cryptos(
+                        request['strategy_id'],
+                        request['parameters'],
+                        use_parallel=False,
+                        start_date=request['start_date'],
+                        end_date=request['end_date'],
+                        interval=request['interval'],
+                        use_daily_sampling=(request['interval'] == '1d'),
+                        use_panel=(request['interval'] == '1d')
+                    )
+                    cached = sum(1 for result in results if result.get('from_cache'))
+                    status['coins_cached'] += cached
+                    status['coins_computed'] += len(results) - cached
+                except Exception as e:
+                    logger.warning(f"Cache warmer run failed for strategy {request['strategy_id']}: {e}")
+                    status['errors'].append({'strategy_id': request['strategy_id'], 'error': str(e)})
+                status['runs_done'] += 1
+                time.sleep(self.pause)
+
+            status['state'] = 'finished'
+        except Exception as e:
+            logger.error(f"Cache warmer failed: {e}")
+            status['state'] = 'failed'
+            status['errors'].append({'error': str(e)})
+        finally:
+            status['current'] = None
+            status['finished_at'] = datetime.now().isoformat()
+            status['duration_seconds'] = round(time.time() - started, 1)
+            self._save_status(status)
+            self.cache.release_lock(LOCK_KEY, token)
+
+        logger.info(f"🔥 Cache warmer {status['state']}: {status['runs_done']}/{status['runs_total']} run-all(s), "
+                    f"{status['coins_computed']} coin result(s) computed in {status['duration_seconds']}s")
+        return status
+
+    def get_status(self) -> Dict:
+        """State and progress of the current or last warm-up ('never' before the first)"""
+        if not self.cache.enabled:
+            return {'state': 'disabled'}
+        return self.cache.get(STATUS_KEY) or {'state': 'never'}
+
+    def _save_status(self, status: Dict):
+        self.cache.set(STATUS_KEY, status, ttl=7 * 86400)
+
+
+def warm_after_ingestion(reason: str = 'price update') -> Optional[Dict]:
+    """
+    Warm the backtest cache from a data collection process after new prices were stored
+
+    Lowers this process's CPU priority first (CACHE_WARM_NICE env, default 10),
+    so the warm-up yields to the API's interactive backtests.
+    """
+    if os.getenv('CACHE_WARM_ENABLED', 'true').lower() != 'true':
+        return None
+    try:
+        os.nice(int(os.getenv('CACHE_WARM_NICE', 10)))
+    except OSError as e:
+        logger.warning(f"Could not lower cache warmer priority: {e}")
+
+    from crypto_backtest_service import CryptoBacktestService
+    return CacheWarmer(CryptoBacktestService()).run(reason)
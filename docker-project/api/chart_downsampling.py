@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Chart Downsampling
+Reduces a backtest result's price_history to a point budget for charting with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape (peaks,
+troughs, trends) of a series far better than taking every n-th point.
+
+The budget is shared by the price and portfolio value curves (each is
+downsampled on its own and the selected points are merged), and the point of
+every trade is always kept so buy/sell markers stay on the chart. Works on
+row and columnar (see backtest_result_format) results.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+# Default point budget for chart responses
+DEFAULT_CHART_POINTS = int(os.getenv('BACKTEST_CHART_POINTS', 2000))
+
+
+def lttb_indices(values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps from an evenly spaced series
+
+    Args:
+        values: Series values (x is the position)
+        threshold: Number of points to keep (first and last are always kept)
+
+    Returns:
+        Sorted int64 indices
+    """
+    n = len(values)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 0)], dtype=np.int64)
+
+    values = np.asarray(values, dtype=np.float64)
+    positions = np.arange(n, dtype=np.float64)
+    # threshold - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = positions[end:next_end].mean()
+        next_y = values[end:next_end].mean()
+
+        # Point forming the largest triangle with the previous pick and the next bucket's average
+        areas = np.abs((positions[anchor] - next_x) * (values[start:end] - values[anchor]) -
+                       (positions[anchor] - positions[start:end]) * (next_y - values[anchor]))
+        anchor = start + int(np.argmax(areas))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def downsample_result(result: Dict, max_points: Optional[int]) -> Dict:
+    """
+    Copy of the result with price_history reduced to about max_points points
+
+    Results that already fit (or max_points=None, full resolution) are
+    returned unchanged. Downsampled results carry 'price_history_points'
+    with the original number of points.
+    """
+    price_history = result.get('price_history')
+    if max_points is None or not price_history:
+        return result
+
+    columnar = isinstance(price_history, dict)
+    if columnar:
+        dates = np.asarray(price_history['date_offsets'])
+        prices = price_history['price']
+        portfolio = price_history['portfolio_value']
+    else:
+        dates = np.array([point['date'] for point in price_history])
+        prices = [point['price'] for point in price_history]
+        portfolio = [point['portfolio_value'] for point in price_history]
+    if len(dates) <= max_points:
+        return result
+
+    prices = np.array(prices, dtype=np.float64)
+    keep = _trade_points(dates, prices, result.get('trades'), columnar)
+
+    # Split what the trade markers leave between the two curves
+    budget = max(max_points - len(keep), 6)
+    portfolio = np.array([np.nan if value is None else value for value in portfolio], dtype=np.float64)
+    recorded = np.flatnonzero(~np.isnan(portfolio))
+    keep.update(lttb_indices(prices, budget // 2).tolist())
+    keep.update(recorded[lttb_indices(portfolio[recorded], budget - budget // 2)].tolist())
+    indices = sorted(keep)
+
+    downsampled = dict(result)
+    if columnar:
+        downsampled['price_history'] = {
+            **price_history,
+            **{name: [price_history[name][i] for i in indices]
+               for name in ('date_offsets', 'price', 'portfolio_value')}
+        }
+    else:
+        downsampled['price_history'] = [price_history[i] for i in indices]
+    downsampled['price_history_points'] = len(dates)
+    return downsampled
+
+
+def _trade_points(dates: np.ndarray, prices: np.ndarray, trades, columnar: bool) -> set:
+    """
+    Positions of the trades in price_history
+
+    A trade executes at its bar's close, so the trade is the point on the
+    trade's date with the trade price (the first point of the date if none).
+    """
+    if not trades:
+        return set()
+    if columnar:
+        trade_dates, trade_prices = trades.get('date_offsets', []), trades.get('price', [])
+    else:
+        trade_dates = [trade.get('date') for trade in trades]
+        trade_prices = [trade.get('price') for trade in trades]
+
+    points = set()
+    starts = np.searchsorted(dates, trade_dates, side='left')
+    ends = np.searchsorted(dates, trade_dates, side='right')
+    for start, end, price in zip(starts, ends, trade_prices):
+        if start == end:
+            continue
+        matches = np.flatnonzero(prices[start:end] == price)
+        points.add(int(start + (matches[0] if len(matches) else 0)))
+    return points
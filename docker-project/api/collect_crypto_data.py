@@ -224,20 +224,8 @@ def update_crypto_data():
                 if not df.empty:
                     records_stored = service.store_crypto_data(crypto_id, df, '1h')
                     if records_stored > 0:
+                        # store_crypto_data invalidated this coin's cached prices and results
                         updated_count += 1
-                        
-                        # Invalidate backtest cache for this crypto
-                        try:
-                            from cache_service import get_cache_service
-                            cache = get_cache_service()
-                            if cache and cache.enabled:
-                                pattern = f"backtest:*:{crypto_id}:*"
-                                keys = cache.redis_client.keys(pattern)
-                                if keys:
-                                    cache.redis_client.delete(*keys)
-                                    logger.info(f"🗑️ Invalidated {len(keys)} cache entries for crypto {crypto_id}")
-                        except Exception as e:
-                            logger.warning(f"Cache invalidation failed: {e}")
                 
                 time.sleep(0.5)  # Rate limiting
                 
@@ -301,6 +289,13 @@ def update_crypto_data():
                 logger.info("✅ Technical indicators updated")
             except Exception as e:
                 logger.warning(f"Indicator calculation failed: {e}")
+            
+            # Recompute the default and most-requested backtests the update invalidated
+            try:
+                from cache_warmer import warm_after_ingestion
+                warm_after_ingestion(reason=f'hourly update of {updated_count} cryptocurrencies')
+            except Exception as e:
+                logger.warning(f"Backtest cache warm-up failed: {e}")
         
     except Exception as e:
         logger.error(f"Update failed: {e}")
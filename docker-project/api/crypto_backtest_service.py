@@ -10,28 +10,134 @@ import numpy as np
 import psycopg
 from psycopg.rows import dict_row
 import logging
-import hashlib
-import json
+import itertools
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+import atexit
+import contextvars
 import os
+import resource
+import threading
+import time
 from multiprocessing import Pool, cpu_count
 from functools import partial
-from cache_service import get_cache_service
-from vectorized_indicators import VectorizedIndicators
+from cache_service import get_cache_service, crypto_tag, strategy_tag
+from vectorized_indicators import VectorizedIndicators, VectorizedBacktestEngine, PanelBacktestEngine
+from shared_price_panel import SharedPricePanel
+from backtest_result_format import convert_result, lossless_format
+from backtest_result_store import BacktestResultStore, parameter_hash
+from price_data_cache import get_price_cache
+from backtest_metrics import calculate_backtest_metrics
+from backtest_checkpoint import create_checkpoint, checkpoint_equity, checkpoint_matches, checkpoint_recorded
+from chart_downsampling import downsample_result
+from strategy_parameters import normalize_parameters, schema_entry
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-process state of backtest workers (service and attached price panels)
+_worker_state = {}
+
+# Database connections opened inside count_db_queries (None outside of it)
+_db_queries = contextvars.ContextVar('db_queries', default=None)
+
+# Coin metadata _format_backtest_result adds to a result (not part of a stored result)
+RESULT_CRYPTO_FIELDS = ('crypto_id', 'symbol', 'name', 'total_records', 'days_of_data')
+
+
+class _PivotClusters:
+    """
+    Price clusters over a sliding window of pivots of one type (support or resistance)
+    
+    Pivots are clustered in time order: each joins the first cluster within
+    `tolerance` of the cluster average, otherwise it starts a new cluster.
+    Adding the newest pivot is an in-place update. Expiring the oldest pivot
+    is in place too when it was never joined (its cluster influenced no other
+    assignment); otherwise the remaining window is re-clustered, because
+    assignments depend on order.
+    """
+
+    def __init__(self, tolerance: float):
+        self.tolerance = tolerance
+        self.pivots = deque()
+        self.clusters = []  # [average_price, count] in creation order
+
+    def add(self, price: float):
+        self.pivots.append(price)
+        self._assign(price)
+
+    def expire_oldest(self):
+        self.pivots.popleft()
+        # The oldest pivot always founded the first cluster
+        if self.clusters[0][1] == 1:
+            self.clusters.pop(0)
+        else:
+            self.clusters = []
+            for price in self.pivots:
+                self._assign(price)
+
+    def levels(self, min_touches: int) -> List[float]:
+        return [average for average, count in self.clusters if count >= min_touches]
+
+    def _assign(self, price: float):
+        for cluster in self.clusters:
+            if abs(price - cluster[0]) / cluster[0] < self.tolerance:
+                # Update cluster average and increment count
+                cluster[0] = (cluster[0] * cluster[1] + price) / (cluster[1] + 1)
+                cluster[1] += 1
+                return
+        self.clusters.append([price, 1])
+
+
 class CryptoBacktestService:
+    # Strategy name (crypto_strategies.name) -> (backtest method, signal builder, trade decorator);
+    # the one strategy registry, the lookup tables below are derived from it
+    STRATEGIES = {
+        'RSI Buy/Sell': ('backtest_rsi_strategy', '_rsi_signals', '_decorate_rsi_trade'),
+        'Moving Average Crossover': ('backtest_ma_crossover_strategy', '_ma_crossover_signals',
+                                     '_decorate_ma_crossover_trade'),
+        'Price Momentum': ('backtest_momentum_strategy', '_momentum_signals', '_decorate_momentum_trade'),
+        'Support/Resistance': ('backtest_support_resistance_strategy', '_support_resistance_signals',
+                               '_decorate_support_resistance_trade'),
+        'Bollinger Bands': ('backtest_bollinger_strategy', '_bollinger_signals', '_decorate_bollinger_trade'),
+        'Mean Reversion': ('backtest_mean_reversion_strategy', '_mean_reversion_signals',
+                           '_decorate_mean_reversion_trade'),
+    }
+    
+    # Strategy name -> backtest method
+    STRATEGY_FUNCTIONS = {name: names[0] for name, names in STRATEGIES.items()}
+    
+    # Strategy name -> (signal builder, trade decorator), shared by single-coin and panel backtests
+    STRATEGY_SIGNALS = {name: names[1:] for name, names in STRATEGIES.items()}
+    
+    # (first day number, object array of 'YYYY-MM-DD' labels) used by _date_strings
+    _day_labels = (0, None)
+    
+    # (load time, strategy id -> parameter schema) used by get_parameter_schemas
+    _parameter_schemas = (None, {})
+    PARAMETER_SCHEMA_TTL = int(os.getenv('STRATEGY_SCHEMA_TTL', 300))
+    
+    # Result lookup counts are kept in process and added to Redis at most this often
+    LOOKUP_FLUSH_SECONDS = float(os.getenv('CACHE_STATS_FLUSH_SECONDS', 5))
+    
+    # Backtest checkpoints outlive results so daily refreshes can resume (see backtest_checkpoint)
+    CHECKPOINT_TTL = int(os.getenv('BACKTEST_CHECKPOINT_TTL', 7 * 86400))
+    
+    # 'stop_fill' parameter: 'close' checks stops on the close (default); 'stop' and
+    # 'worst' check them intra-bar on low/high (see execute_trades_vectorized)
+    STOP_FILLS = ('close', 'stop', 'worst')
+
     def __init__(self, db_config=None, enable_cache=True):
         """
         Initialize the backtesting service
         
         Args:
             db_config: Database configuration dict
-            enable_cache: Enable Redis caching (default: True)
+            enable_cache: Enable Redis caching and the durable result store
+                          (default: True)
         """
         if db_config is None:
             db_config = {
@@ -49,11 +155,45 @@ class CryptoBacktestService:
             logger.info("✅ Redis caching enabled for backtest service")
         else:
             logger.info("⚠️ Running without cache (Redis unavailable)")
+        
+        # Durable second tier behind Redis (crypto_backtest_results)
+        self.store = BacktestResultStore(self.get_connection) if enable_cache else None
+        
+        # Price frames shared by all strategies and parameter sets (see price_data_cache)
+        self.price_cache = get_price_cache() if enable_cache else None
+        if self.price_cache and not self.price_cache.enabled:
+            self.price_cache = None
+        
+        # Result lookups per strategy not yet added to Redis (see _record_cache_lookups)
+        self._lookup_counts = {}
+        self._lookup_lock = threading.Lock()
+        self._lookups_flushed_at = time.monotonic()
+        atexit.register(self.flush_cache_lookups)
 
     def get_connection(self):
-        """Get database connection"""
+        """Get database connection (counted inside count_db_queries)"""
+        queries = _db_queries.get()
+        if queries is not None:
+            queries.append(1)
         return psycopg.connect(**self.db_config)
 
+    @staticmethod
+    @contextmanager
+    def count_db_queries():
+        """
+        Count the database round trips of a request (each connection runs one query)
+        
+        Yields a list whose length is the number of connections opened in the
+        block, including the result store's. Worker threads are counted when
+        they run in a copy of the block's context (contextvars.copy_context).
+        """
+        queries = []
+        token = _db_queries.set(queries)
+        try:
+            yield queries
+        finally:
+            _db_queries.reset(token)
+
     def get_available_strategies(self) -> List[Dict]:
         """Get all available strategies with their parameters"""
         with self.get_connection() as conn:
@@ -141,7 +281,14 @@ class CryptoBacktestService:
             - Daily data: ~365 records/year (fast, pre-computed)
             - Hourly data: ~8,760 records/year (slower, full precision)
             - Daily data provides excellent results for most strategies
+            - Frames are served from the price cache until new bars are stored
         """
+        cached, versions = {}, {}
+        if self.price_cache:
+            cached, versions = self.price_cache.get_many([crypto_id], interval, start_date, end_date)
+            if crypto_id in cached:
+                return cached[crypto_id]
+        
         with self.get_connection() as conn:
             # OPTIMIZED: Aggregate hourly to daily at database level
             if interval == '1d':
@@ -186,7 +333,10 @@ class CryptoBacktestService:
             if not df.empty:
                 df['datetime'] = pd.to_datetime(df['datetime'])
                 df.set_index('datetime', inplace=True)
-            return df
+        
+        if self.price_cache:
+            self.price_cache.put_many({crypto_id: df}, versions, interval, start_date, end_date)
+        return df
 
     def get_price_data_with_indicators(self, crypto_id: int, start_date: str = None,
                                        end_date: str = None, interval: str = '1h',
@@ -256,7 +406,8 @@ class CryptoBacktestService:
             return df
     
     def get_price_data_batch(self, crypto_ids: List[int], start_date: str = None, 
-                            end_date: str = None, interval: str = '1d') -> Dict[int, pd.DataFrame]:
+                            end_date: str = None, interval: str = '1d',
+                            use_daily_sampling: bool = True) -> Dict[int, pd.DataFrame]:
         """
         Get price data for multiple cryptocurrencies in a single query
         Much faster than calling get_price_data() in a loop (eliminates N+1 query problem)
@@ -266,6 +417,7 @@ class CryptoBacktestService:
             start_date: Optional start date filter
             end_date: Optional end date filter
             interval: Data interval - '1d' (daily) or '1h' (hourly)
+            use_daily_sampling: Accepted for parity with get_price_data()
         
         Returns:
             Dictionary mapping crypto_id to DataFrame
@@ -273,10 +425,18 @@ class CryptoBacktestService:
         Performance:
             - Single query instead of N queries
             - 10-50x faster for multiple cryptos
+            - Coins in the price cache are not queried
         """
         if not crypto_ids:
             return {}
-            
+        
+        result, versions = {}, {}
+        if self.price_cache:
+            result, versions = self.price_cache.get_many(crypto_ids, interval, start_date, end_date)
+            crypto_ids = [crypto_id for crypto_id in crypto_ids if crypto_id not in result]
+            if not crypto_ids:
+                return result
+        
         with self.get_connection() as conn:
             if interval == '1d':
                 # Aggregate hourly to daily
@@ -320,20 +480,79 @@ class CryptoBacktestService:
             df_all = pd.read_sql(query, conn, params=params)
             
             if df_all.empty:
-                return {}
+                return result
             
             df_all['datetime'] = pd.to_datetime(df_all['datetime'])
             
-            # Split by crypto_id into separate DataFrames
-            result = {}
-            for crypto_id in crypto_ids:
-                df_crypto = df_all[df_all['crypto_id'] == crypto_id].copy()
-                if not df_crypto.empty:
-                    df_crypto.set_index('datetime', inplace=True)
-                    df_crypto.drop('crypto_id', axis=1, inplace=True)
-                    result[crypto_id] = df_crypto
+            # Split by crypto_id into separate DataFrames (single pass over the rows)
+            queried = {}
+            for crypto_id, df_crypto in df_all.groupby('crypto_id', sort=False):
+                df_crypto = df_crypto.drop('crypto_id', axis=1).set_index('datetime')
+                queried[int(crypto_id)] = df_crypto
+        
+        if self.price_cache:
+            self.price_cache.put_many(queried, versions, interval, start_date, end_date)
+        result.update(queried)
+        return result
+
+    def get_price_arrays(self, crypto_id: int, start_date: str = None, end_date: str = None,
+                         fetch_rows: int = 10000, with_high_low: bool = False) -> pd.DataFrame:
+        """
+        Hourly closes streamed from the database into preallocated float32 arrays
+        
+        Rows are read through a server-side cursor `fetch_rows` at a time and
+        written straight into the arrays, so no full-history Decimal/object
+        frame is ever built. The returned frame wraps the arrays without copying.
+        
+        Args:
+            crypto_id: Cryptocurrency ID
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            fetch_rows: Rows per database round trip
+            with_high_low: Also load float32 'low_price'/'high_price' (intra-bar stops)
+        
+        Returns:
+            DataFrame with a float32 'close_price' column and a datetime index
+        
+        Performance:
+            - 12 bytes per bar (float32 close + int64 timestamp) vs ~500 for read_sql
+        """
+        where = """
+            FROM crypto_prices
+            WHERE crypto_id = %s
+              AND interval_type = '1h'
+              AND datetime BETWEEN COALESCE(%s, '2020-01-01'::timestamp)
+                               AND COALESCE(%s, CURRENT_TIMESTAMP)
+        """
+        params = [crypto_id, start_date, end_date]
+        
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) " + where, params)
+                total = cur.fetchone()[0]
             
-            return result
+            columns = ['close_price', 'low_price', 'high_price'] if with_high_low else ['close_price']
+            values = np.empty((total, len(columns)), dtype=np.float32)
+            timestamps = np.empty(total, dtype=np.int64)
+            filled = 0
+            with conn.cursor(name=f'price_stream_{crypto_id}') as cur:
+                cur.execute(
+                    "SELECT (EXTRACT(EPOCH FROM datetime) * 1000000)::bigint, " +
+                    ", ".join(f"{column}::float8" for column in columns) + where +
+                    " ORDER BY datetime ASC LIMIT %s",
+                    params + [total]
+                )
+                while True:
+                    rows = cur.fetchmany(fetch_rows)
+                    if not rows:
+                        break
+                    block = np.array(rows, dtype=np.float64)
+                    timestamps[filled:filled + len(rows)] = block[:, 0].astype(np.int64) * 1000
+                    values[filled:filled + len(rows)] = block[:, 1:]
+                    filled += len(rows)
+        
+        index = pd.DatetimeIndex(timestamps[:filled].view('datetime64[ns]'), name='datetime')
+        return pd.DataFrame(values[:filled], index=index, columns=columns, copy=False)
 
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """
@@ -353,242 +572,435 @@ class CryptoBacktestService:
 
     def calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_mult: float = 2) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """
-        Calculate Bollinger Bands using pandas (optimized for this case)
+        Calculate Bollinger Bands of a price series (or of each column of a frame)
         
-        Note: pandas rolling std is actually faster than our NumPy implementation
-        for this specific calculation
+        Same alignment as pandas rolling (first band at bar period - 1), but
+        every value comes from its own window (VectorizedIndicators.rolling_mean /
+        rolling_std), so a resumed backtest reproduces a full run's bands.
         """
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        if isinstance(prices, pd.DataFrame):
+            wrap = lambda values: pd.DataFrame(values, index=prices.index, columns=prices.columns)
+        else:
+            wrap = lambda values: pd.Series(values, index=prices.index)
+        values = prices.to_numpy(dtype=np.float64)
+        sma = wrap(VectorizedIndicators.rolling_mean(values, period))
+        std = wrap(VectorizedIndicators.rolling_std(values, period))
         upper_band = sma + (std * std_mult)
         lower_band = sma - (std * std_mult)
         return upper_band, sma, lower_band
 
-    def backtest_rsi_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
-        """Backtest RSI buy/sell strategy"""
-        if len(df) < int(params['rsi_period']) + 1:
-            return self._empty_result("Insufficient data for RSI calculation")
-
-        df = df.copy()
-        df['rsi'] = self.calculate_rsi(df['close_price'], int(params['rsi_period']))
-        
-        initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
-        oversold = float(params['oversold_threshold'])
-        overbought = float(params['overbought_threshold'])
-        stop_loss = float(params.get('stop_loss_threshold', 10)) / 100
+    def _cached_indicator(self, indicator_cache: Optional[Dict], key: Tuple, compute):
+        """
+        Compute an indicator once per price frame
         
-        # Cooldown period
+        Parameter sweeps pass one dict per coin so every distinct indicator
+        configuration (e.g. RSI period) is computed once and shared by all
+        threshold/fee/stop-loss combinations. Without a cache this just computes.
+        """
+        if indicator_cache is None:
+            return compute()
+        if key not in indicator_cache:
+            indicator_cache[key] = compute()
+        return indicator_cache[key]
+
+    def _cooldown_timedelta(self, params: Dict) -> Optional[pd.Timedelta]:
+        """Parse the cooldown period shared by all strategies (None = no cooldown)"""
         cooldown_value = int(params.get('cooldown_value', 0))
         cooldown_unit = params.get('cooldown_unit', 'hours')
         cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+        return pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+
+    def _stop_fill_options(self, params: Dict, df: pd.DataFrame) -> Dict:
+        """
+        Kernel options for intra-bar stop loss / take profit
         
-        cash = initial_investment
-        position = 0  # Amount of crypto owned
-        position_entry_price = 0  # Track entry price for stop loss
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
+        Empty (stops on the close) for stop_fill='close' or when the frame has no
+        low/high prices. Missing lows/highs fall back to the bar's close.
         
-        for i, row in df.iterrows():
-            if pd.isna(row['rsi']):
-                continue
-                
-            current_price = row['close_price']
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': i, 'value': current_value})
-            
-            # Check stop loss if we have a position
-            if position > 0 and position_entry_price > 0:
-                profit_pct = (current_price - position_entry_price) / position_entry_price
-                if profit_pct <= -stop_loss:
-                    # Stop loss triggered
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    trades.append({
-                        'date': self._serialize_trade_date(i),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'rsi': row['rsi'],
-                        'reason': 'stop_loss'
-                    })
-                    cash = sell_value - fee
-                    position = 0
-                    position_entry_price = 0
-                    last_sell_time = i
-                    continue
-            
-            # Buy signal: RSI below oversold threshold and we have no position
-            can_buy = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_buy = (i - last_sell_time) >= cooldown_timedelta
-            
-            if can_buy and row['rsi'] < oversold and position == 0 and cash > 0:
-                # Buy with all available cash minus fees
-                fee = cash * fee_rate
-                buy_amount = cash - fee
-                position = buy_amount / current_price
-                position_entry_price = current_price
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'BUY',
-                    'price': current_price,
-                    'amount': position,
-                    'value': buy_amount,
-                    'fee': fee,
-                    'rsi': row['rsi']
-                })
-                cash = 0
-            
-            # Sell signal: RSI above overbought threshold and we have position
-            elif row['rsi'] > overbought and position > 0:
-                # Sell all position
-                sell_value = position * current_price
-                fee = sell_value * fee_rate
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'SELL',
-                    'price': current_price,
-                    'amount': position,
-                    'value': sell_value,
-                    'fee': fee,
-                    'rsi': row['rsi'],
-                    'reason': 'overbought'
-                })
-                cash = sell_value - fee
-                position = 0
-                position_entry_price = 0
-                last_sell_time = i
-        
-        # Final portfolio value
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-        
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
-
-    def backtest_ma_crossover_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
-        """Backtest Moving Average Crossover strategy"""
-        short_period = int(params['short_ma_period'])
-        long_period = int(params['long_ma_period'])
+        Raises:
+            ValueError: Unknown stop_fill
+        """
+        fill = params.get('stop_fill', 'close')
+        if fill not in self.STOP_FILLS:
+            raise ValueError(f"Invalid stop_fill '{fill}' (expected one of {', '.join(self.STOP_FILLS)})")
+        if fill == 'close' or not {'low_price', 'high_price'}.issubset(df.columns):
+            return {}
         
-        if len(df) < long_period + 1:
-            return self._empty_result("Insufficient data for MA calculation")
+        close = df['close_price'].to_numpy(dtype=np.float64)
+        lows = df['low_price'].to_numpy(dtype=np.float64, na_value=np.nan)
+        highs = df['high_price'].to_numpy(dtype=np.float64, na_value=np.nan)
+        return {
+            'lows': np.where(np.isnan(lows), close, lows),
+            'highs': np.where(np.isnan(highs), close, highs),
+            'fill': fill
+        }
+
+    def _execute_signals(self, df: pd.DataFrame, params: Dict, entries: np.ndarray,
+                         exits: Optional[np.ndarray], tradable: np.ndarray, **kernel_options) -> Dict:
+        """
+        Run the shared trade kernel over a strategy's signal arrays
         
-        df = df.copy()
-        df['short_ma'] = self.calculate_moving_average(df['close_price'], short_period)
-        df['long_ma'] = self.calculate_moving_average(df['close_price'], long_period)
-        df['ma_signal'] = (df['short_ma'] > df['long_ma']).astype(int).diff()
+        Every strategy reduces to entry/exit arrays plus a mask of tradable bars;
+        fees, cooldown, stop loss and position tracking live in
+        VectorizedBacktestEngine.execute_trades_vectorized.
+        """
+        if exits is None:
+            exits = np.zeros(len(df), dtype=bool)
+        return VectorizedBacktestEngine.execute_trades_vectorized(
+            df['close_price'].to_numpy(dtype=np.float64),
+            entries,
+            float(params['initial_investment']),
+            fee_rate=float(params['transaction_fee']) / 100,
+            exit_signals=exits,
+            tradable=tradable,
+            timestamps=df.index,
+            cooldown=self._cooldown_timedelta(params),
+            **self._stop_fill_options(params, df),
+            **kernel_options
+        )
+
+    def _base_trades(self, df: pd.DataFrame, kernel_trades: List[Dict]) -> List[Dict]:
+        """Convert kernel trades into trade records (strategies append their own fields)"""
+        if not kernel_trades:
+            return []
+        dates = self._date_strings(df.index[[trade['index'] for trade in kernel_trades]])
+        return [{
+            'date': date,
+            'action': trade['action'],
+            'price': trade['price'],
+            'amount': trade['amount'],
+            'value': trade['value'],
+            'fee': trade['fee']
+        } for trade, date in zip(kernel_trades, dates)]
+
+    def _date_strings(self, index: pd.DatetimeIndex) -> List[str]:
+        """
+        'YYYY-MM-DD' for each timestamp
+        
+        Labels come from a table of day strings shared by every backtest (all
+        coins cover the same calendar), so formatting is an array lookup instead
+        of DatetimeIndex.strftime.
+        """
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        days = index.values.astype('datetime64[D]').astype(np.int64)
+        if len(days) == 0:
+            return []
+        
+        origin, labels = CryptoBacktestService._day_labels
+        first, last = int(days.min()), int(days.max())
+        if labels is None or first < origin or last >= origin + len(labels):
+            if labels is not None:
+                first, last = min(first, origin), max(last, origin + len(labels) - 1)
+            labels = np.arange(first, last + 1).astype('datetime64[D]').astype(str).astype(object)
+            origin = first
+            CryptoBacktestService._day_labels = (origin, labels)
+        return labels[days - origin].tolist()
+
+    def _portfolio_series(self, df: pd.DataFrame, equity: np.ndarray, recorded: np.ndarray) -> pd.Series:
+        """Portfolio value on the bars a strategy records"""
+        return pd.Series(equity[recorded], index=df.index[recorded])
+
+    def _columnwise(self, close: np.ndarray, index, compute):
+        """
+        Apply a per-series computation to a price array or to each column of a panel
+        
+        For a panel, `index` is the list of per-column DatetimeIndexes (one per
+        asset, its length is the asset's number of bars); results are padded
+        with NaN/False past each asset's history.
+        """
+        if close.ndim == 1:
+            return compute(close, index)
+        
+        outputs = None
+        for j, column_index in enumerate(index):
+            n = len(column_index)
+            result = compute(close[:n, j], column_index)
+            parts = result if isinstance(result, tuple) else (result,)
+            if outputs is None:
+                outputs = [np.full(close.shape, np.nan) if part.dtype.kind == 'f'
+                           else np.zeros(close.shape, dtype=part.dtype) for part in parts]
+            for output, part in zip(outputs, parts):
+                output[:n, j] = part
+        if outputs is None:
+            return compute(close[:, :0].ravel(), pd.DatetimeIndex([]))
+        return tuple(outputs) if isinstance(result, tuple) else outputs[0]
+
+    def _backtest_signals(self, df: pd.DataFrame, params: Dict, build_signals, decorate_trade,
+                          indicator_cache: Optional[Dict] = None) -> Dict:
+        """
+        Single-coin backtest from a strategy's signal builder
+        
+        Signal builders are shape-agnostic: the same code produces a coin's
+        signal arrays here and a whole (bars x coins) panel in run_panel_backtest.
+        """
+        close = df['close_price'].to_numpy(dtype=np.float64)
+        signals = build_signals(close, df.index, params, indicator_cache)
+        if len(df) < signals['required_bars']:
+            return self._empty_result(signals['insufficient'])
+        
+        run = self._execute_signals(df, params, signals['entries'], signals['exits'], signals['tradable'],
+                                    **signals['options'])
+        return self._signals_result(df, params, run, signals, decorate_trade)
+
+    def _signals_result(self, df: pd.DataFrame, params: Dict, run: Dict, signals: Dict, decorate_trade) -> Dict:
+        """Turn a kernel run into the backtest result (trade records, portfolio values, metrics)"""
+        trades = self._decorated_trades(df, run, signals, decorate_trade)
+        portfolio_values = self._portfolio_series(df, run['equity'], signals['recorded'])
+        return self._calculate_results(float(params['initial_investment']), run['final_value'], trades, df,
+                                       portfolio_values, np.array([trade['index'] for trade in run['trades']]))
+
+    def _decorated_trades(self, df: pd.DataFrame, run: Dict, signals: Dict, decorate_trade) -> List[Dict]:
+        """Trade records of a kernel run with the strategy's annotations"""
+        trades = self._base_trades(df, run['trades'])
+        for record, trade in zip(trades, run['trades']):
+            decorate_trade(record, trade, signals)
+        return trades
+
+    def _run_signals_segment(self, df: pd.DataFrame, close: np.ndarray, params: Dict, build_signals,
+                             decorate_trade, start: int, stop: int, warmup: int, state: Optional[Dict]):
+        """
+        Signals and trades of bars [start, stop) continuing the kernel `state`
+        
+        Indicators are computed over the `warmup` bars before start as well
+        (the strategy's lookback, i.e. its indicator state); only the segment's
+        own bars are traded.
+        
+        Returns:
+            (signals, kernel run, decorated trade records, recorded mask of the
+            segment's bars); trade indexes are bar positions in df
+        """
+        first = max(0, start - warmup)
+        signals = build_signals(close[first:stop].astype(np.float64), df.index[first:stop], params)
+        
+        # Trade only the segment's own bars; the warm-up bars just feed the indicators
+        own = slice(start - first, None)
+        exits = signals['exits'] if signals['exits'] is not None else np.zeros(stop - first, dtype=bool)
+        options = {key: value[own] if isinstance(value, np.ndarray) else value
+                   for key, value in signals['options'].items()}
+        run = VectorizedBacktestEngine.execute_trades_vectorized(
+            close[start:stop].astype(np.float64), signals['entries'][own], float(params['initial_investment']),
+            fee_rate=float(params['transaction_fee']) / 100, exit_signals=exits[own],
+            tradable=signals['tradable'][own], timestamps=df.index[start:stop],
+            cooldown=self._cooldown_timedelta(params), initial_state=state,
+            **self._stop_fill_options(params, df.iloc[start:stop]), **options
+        )
+        
+        for trade in run['trades']:
+            trade['index'] += start
+        records = self._base_trades(df, run['trades'])
+        for record, trade in zip(records, run['trades']):
+            decorate_trade(record, {**trade, 'index': trade['index'] - first}, signals)
+        return signals, run, records, signals['recorded'][own]
+
+    def _backtest_signals_chunked(self, df: pd.DataFrame, params: Dict, build_signals, decorate_trade,
+                                  chunk_bars: int = None) -> Dict:
+        """
+        Bounded-memory backtest: signals and trades are computed chunk by chunk
         
+        Each chunk recomputes its indicators over the preceding warm-up bars
+        and the kernel continues the previous chunk's cash/position state
+        (see _run_signals_segment), so only one chunk of float64 working
+        arrays exists at a time. Prices are read as float32 views and the
+        equity curve is kept in float32.
+        """
+        chunk_bars = chunk_bars or int(os.getenv('BACKTEST_CHUNK_BARS', 8760))
+        close = df['close_price'].to_numpy()
+        n = len(close)
         initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
+        
+        equity = np.empty(n, dtype=np.float32)
+        recorded = np.zeros(n, dtype=bool)
+        trades, trade_bars = [], []
+        state, warmup, final_value = None, 0, initial_investment
+        for start in range(0, n, chunk_bars):
+            stop = min(n, start + chunk_bars)
+            signals, run, records, own_recorded = self._run_signals_segment(
+                df, close, params, build_signals, decorate_trade, start, stop, warmup, state)
+            if start == 0:
+                if n < signals['required_bars']:
+                    return self._empty_result(signals['insufficient'])
+                warmup = signals.get('warmup_bars', signals['required_bars'])
+            
+            state, final_value = run['state'], run['final_value']
+            equity[start:stop] = run['equity']
+            recorded[start:stop] = own_recorded
+            trades.extend(records)
+            trade_bars.extend(trade['index'] for trade in run['trades'])
+        
+        portfolio_values = pd.Series(equity[recorded].astype(np.float64), index=df.index[recorded])
+        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values,
+                                       np.array(trade_bars, dtype=np.int64))
+
+    def _backtest_signals_resumable(self, df: pd.DataFrame, params: Dict, build_signals, decorate_trade,
+                                    checkpoint: Optional[Dict] = None) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Backtest that also returns a checkpoint of its settled bars (all but the last)
+        
+        Without a matching checkpoint this is the plain backtest (one signal
+        pass, one kernel run); the checkpoint is derived from its trades. Given
+        the checkpoint of an earlier run whose settled bars df continues (see
+        backtest_checkpoint), indicators are computed over the strategy's
+        warm-up bars and the bars after the checkpoint only, the kernel trades
+        those bars from the checkpoint's state, and trades, equity and metrics
+        are those of a full run over df.
+        
+        Returns:
+            (result, checkpoint); the checkpoint is the given one when no bar
+            settled since, None when the data is insufficient
+        """
+        close = df['close_price'].to_numpy(dtype=np.float64)
+        n = len(close)
+        initial_investment = float(params['initial_investment'])
+        
+        if checkpoint and checkpoint_matches(checkpoint, df):
+            settled, warmup = checkpoint['bars'], checkpoint['warmup_bars']
+            signals, run, records, own_recorded = self._run_signals_segment(
+                df, close, params, build_signals, decorate_trade, settled, n, warmup, checkpoint['state'])
+            trades = list(checkpoint['trades']) + records
+            trade_bars = list(checkpoint['trade_bars']) + [trade['index'] for trade in run['trades']]
+            equity = np.concatenate((checkpoint_equity(checkpoint, close, initial_investment), run['equity']))
+            recorded = np.concatenate((checkpoint_recorded(checkpoint), own_recorded))
+            logger.info(f"⏩ Resumed backtest from checkpoint: {n - settled} new bar(s)")
+        else:
+            settled = 0
+            signals = build_signals(close, df.index, params)
+            if n < signals['required_bars']:
+                return self._empty_result(signals['insufficient']), None
+            run = self._execute_signals(df, params, signals['entries'], signals['exits'], signals['tradable'],
+                                        **signals['options'])
+            trades = self._decorated_trades(df, run, signals, decorate_trade)
+            trade_bars = [trade['index'] for trade in run['trades']]
+            equity, recorded = run['equity'], signals['recorded']
+            warmup = signals.get('warmup_bars', signals['required_bars'])
+        
+        if n - 1 > settled:
+            checkpoint = create_checkpoint(df, n - 1, initial_investment, warmup, recorded, trades, trade_bars)
+        portfolio_values = self._portfolio_series(df, equity, recorded)
+        result = self._calculate_results(initial_investment, run['final_value'], trades, df, portfolio_values,
+                                         np.array(trade_bars, dtype=np.int64))
+        return result, checkpoint
+
+    def backtest_resumable(self, strategy_name: str, df: pd.DataFrame, params: Dict,
+                           checkpoint: Optional[Dict] = None) -> Tuple[Dict, Optional[Dict]]:
+        """Backtest of any strategy that can be extended later (see _backtest_signals_resumable)"""
+        names = self.STRATEGY_SIGNALS.get(strategy_name)
+        if names is None:
+            return self._empty_result(f"Strategy '{strategy_name}' not implemented"), None
+        build_signals, decorate_trade = (getattr(self, name) for name in names)
+        return self._backtest_signals_resumable(df, params, build_signals, decorate_trade, checkpoint)
+
+    def backtest_low_memory(self, strategy_name: str, df: pd.DataFrame, params: Dict,
+                            chunk_bars: int = None) -> Dict:
+        """
+        Memory-bounded backtest of any strategy (see _backtest_signals_chunked)
+        
+        The result also reports 'memory': the float32 price array size and the
+        process's peak RSS after this backtest (for sizing containers).
+        """
+        names = self.STRATEGY_SIGNALS.get(strategy_name)
+        if names is None:
+            return self._empty_result(f"Strategy '{strategy_name}' not implemented")
+        build_signals, decorate_trade = (getattr(self, name) for name in names)
+        
+        result = self._backtest_signals_chunked(df, params, build_signals, decorate_trade, chunk_bars)
+        result['memory'] = {
+            'price_data_mb': round(df.memory_usage(index=True).sum() / 2**20, 2),
+            'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        }
+        return result
+
+    def backtest_rsi_strategy(self, df: pd.DataFrame, params: Dict,
+                              indicator_cache: Optional[Dict] = None) -> Dict:
+        """Backtest RSI buy/sell strategy"""
+        return self._backtest_signals(df, params, self._rsi_signals, self._decorate_rsi_trade, indicator_cache)
+
+    def _rsi_signals(self, close: np.ndarray, index, params: Dict, indicator_cache: Optional[Dict] = None) -> Dict:
+        rsi_period = int(params['rsi_period'])
+        rsi = self._cached_indicator(
+            indicator_cache, ('rsi', rsi_period),
+            lambda: VectorizedIndicators.calculate_rsi_vectorized(close, rsi_period)
+        )
+        
+        oversold = float(params['oversold_threshold'])
+        overbought = float(params['overbought_threshold'])
         stop_loss = float(params.get('stop_loss_threshold', 10)) / 100
         
-        # Cooldown period
-        cooldown_value = int(params.get('cooldown_value', 0))
-        cooldown_unit = params.get('cooldown_unit', 'hours')
-        cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+        # Buy below oversold, sell above overbought
+        valid = ~np.isnan(rsi)
+        return {
+            'required_bars': rsi_period + 1,
+            'insufficient': "Insufficient data for RSI calculation",
+            'entries': rsi < oversold,
+            'exits': rsi > overbought,
+            'tradable': valid,
+            'recorded': valid,
+            'options': {'stop_loss': stop_loss, 'exit_reason': 'overbought'},
+            'rsi': rsi
+        }
+
+    def _decorate_rsi_trade(self, record: Dict, trade: Dict, signals: Dict):
+        record['rsi'] = signals['rsi'][trade['index']]
+        if trade['action'] == 'SELL':
+            record['reason'] = trade['reason']
+
+    def backtest_ma_crossover_strategy(self, df: pd.DataFrame, params: Dict,
+                                       indicator_cache: Optional[Dict] = None) -> Dict:
+        """Backtest Moving Average Crossover strategy"""
+        return self._backtest_signals(df, params, self._ma_crossover_signals, self._decorate_ma_crossover_trade,
+                                      indicator_cache)
+
+    def _ma_crossover_signals(self, close: np.ndarray, index, params: Dict,
+                              indicator_cache: Optional[Dict] = None) -> Dict:
+        short_period = int(params['short_ma_period'])
+        long_period = int(params['long_ma_period'])
         
-        cash = initial_investment
-        position = 0
-        position_entry_price = 0
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
+        short_ma = self._cached_indicator(
+            indicator_cache, ('sma', short_period),
+            lambda: VectorizedIndicators.calculate_moving_average_vectorized(close, short_period)
+        )
+        long_ma = self._cached_indicator(
+            indicator_cache, ('sma', long_period),
+            lambda: VectorizedIndicators.calculate_moving_average_vectorized(close, long_period)
+        )
+        above = (short_ma > long_ma).astype(int)
+        ma_signal = np.full(close.shape, np.nan)
+        ma_signal[1:] = above[1:] - above[:-1]
         
-        for i, row in df.iterrows():
-            if pd.isna(row['ma_signal']):
-                continue
-                
-            current_price = row['close_price']
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': i, 'value': current_value})
-            
-            # Check stop loss if we have a position
-            if position > 0 and position_entry_price > 0:
-                profit_pct = (current_price - position_entry_price) / position_entry_price
-                if profit_pct <= -stop_loss:
-                    # Stop loss triggered
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    cash = sell_value - fee
-                    trades.append({
-                        'date': self._serialize_trade_date(i),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'short_ma': row['short_ma'],
-                        'long_ma': row['long_ma'],
-                        'reason': 'stop_loss'
-                    })
-                    position = 0
-                    position_entry_price = 0
-                    last_sell_time = i
-                    continue
-            
-            # Buy signal: short MA crosses above long MA
-            can_buy = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_buy = (i - last_sell_time) >= cooldown_timedelta
-            
-            if can_buy and row['ma_signal'] == 1 and position == 0 and cash > 0:
-                fee = cash * fee_rate
-                buy_amount = cash - fee
-                position = buy_amount / current_price
-                position_entry_price = current_price
-                cash = 0
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'BUY',
-                    'price': current_price,
-                    'amount': position,
-                    'value': buy_amount,
-                    'fee': fee,
-                    'short_ma': row['short_ma'],
-                    'long_ma': row['long_ma']
-                })
-            
-            # Sell signal: short MA crosses below long MA
-            elif row['ma_signal'] == -1 and position > 0:
-                sell_value = position * current_price
-                fee = sell_value * fee_rate
-                cash = sell_value - fee
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'SELL',
-                    'price': current_price,
-                    'amount': position,
-                    'value': sell_value,
-                    'fee': fee,
-                    'short_ma': row['short_ma'],
-                    'long_ma': row['long_ma'],
-                    'reason': 'ma_crossover'
-                })
-                position = 0
-                position_entry_price = 0
-                last_sell_time = i
-        
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-        
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
-
-    def backtest_momentum_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
+        stop_loss = float(params.get('stop_loss_threshold', 10)) / 100
+        
+        # Buy when short MA crosses above long MA, sell when it crosses below
+        valid = ~np.isnan(ma_signal)
+        return {
+            'required_bars': long_period + 1,
+            'insufficient': "Insufficient data for MA calculation",
+            'entries': ma_signal == 1,
+            'exits': ma_signal == -1,
+            'tradable': valid,
+            'recorded': valid,
+            'options': {'stop_loss': stop_loss, 'exit_reason': 'ma_crossover'},
+            'short_ma': short_ma,
+            'long_ma': long_ma
+        }
+
+    def _decorate_ma_crossover_trade(self, record: Dict, trade: Dict, signals: Dict):
+        record['short_ma'] = signals['short_ma'][trade['index']]
+        record['long_ma'] = signals['long_ma'][trade['index']]
+        if trade['action'] == 'SELL':
+            record['reason'] = trade['reason']
+
+    def backtest_momentum_strategy(self, df: pd.DataFrame, params: Dict,
+                                   indicator_cache: Optional[Dict] = None) -> Dict:
         """Backtest Price Momentum strategy"""
-        if len(df) < 5:
-            return self._empty_result("Insufficient data")
+        df = self._cached_indicator(indicator_cache, ('sorted',), df.sort_index)
+        return self._backtest_signals(df, params, self._momentum_signals, self._decorate_momentum_trade,
+                                      indicator_cache)
 
+    def _momentum_signals(self, close: np.ndarray, index, params: Dict,
+                          indicator_cache: Optional[Dict] = None) -> Dict:
         buy_threshold = float(params['buy_threshold']) / 100
         sell_profit = float(params['sell_profit_threshold']) / 100
         stop_loss = float(params['stop_loss_threshold']) / 100
-        initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
 
         # Momentum threshold window (hours)
         threshold_window_hours = params.get('buy_threshold_window_hours', 0)
@@ -601,304 +1013,204 @@ class CryptoBacktestService:
         threshold_window_hours = max(threshold_window_hours, 0)
         threshold_window = pd.Timedelta(hours=threshold_window_hours) if threshold_window_hours > 0 else None
 
-        # Cooldown period
-        cooldown_value = int(params.get('cooldown_value', 0))
-        cooldown_unit = params.get('cooldown_unit', 'hours')
-        cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+        momentum = self._cached_indicator(
+            indicator_cache, ('momentum', threshold_window_hours),
+            lambda: self._columnwise(close, index, lambda prices, prices_index: self._momentum_change(
+                pd.Series(prices, index=prices_index), threshold_window))
+        )
 
-        df = df.copy()
-        df.sort_index(inplace=True)
-        df['price_change'] = df['close_price'].pct_change()
+        # Buy when the change meets the threshold direction (positive = momentum, negative = dip);
+        # sell on profit target or stop loss. Every bar is recorded, only finite momentum is traded.
+        threshold_met = momentum >= buy_threshold if buy_threshold >= 0 else momentum <= buy_threshold
+        return {
+            'required_bars': 5,
+            'warmup_bars': threshold_window_hours + 2,
+            'insufficient': "Insufficient data",
+            'entries': threshold_met,
+            'exits': None,
+            'tradable': np.isfinite(momentum),
+            'recorded': np.ones(close.shape, dtype=bool),
+            'options': {'stop_loss': stop_loss, 'take_profit': sell_profit},
+            'momentum': momentum,
+            'buy_threshold': buy_threshold,
+            'threshold_window_hours': threshold_window_hours
+        }
 
-        if threshold_window is not None:
-            reference_prices = df['close_price'].reindex(df.index - threshold_window, method='ffill')
-            reference_prices.index = df.index
-            df['momentum_window_change'] = (df['close_price'] - reference_prices) / reference_prices
-            df.loc[reference_prices <= 0, 'momentum_window_change'] = np.nan
+    def _decorate_momentum_trade(self, record: Dict, trade: Dict, signals: Dict):
+        buy_threshold = signals['buy_threshold']
+        threshold_window_hours = signals['threshold_window_hours']
+        if trade['action'] == 'BUY':
+            momentum_change = signals['momentum'][trade['index']]
+            record['trigger'] = f'{momentum_change:.2%} {"momentum" if buy_threshold >= 0 else "dip"}' + (f' over {threshold_window_hours}h' if threshold_window_hours > 0 else '')
+            record['momentum_window_hours'] = threshold_window_hours if threshold_window_hours > 0 else None
         else:
-            df['momentum_window_change'] = df['price_change']
-
-        cash = initial_investment
-        position = 0
-        entry_price = 0
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
-
-        for i, row in df.iterrows():
-            current_price = row['close_price']
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': i, 'value': current_value})
-
-            momentum_change = row['momentum_window_change']
-            if pd.isna(momentum_change) or not np.isfinite(momentum_change):
-                continue
+            action_reason = 'profit target' if trade['reason'] == 'take_profit' else 'stop loss'
+            record['trigger'] = f"{trade['profit_pct']:.2%} {action_reason}"
+
+    def _momentum_change(self, close: pd.Series, threshold_window: Optional[pd.Timedelta]) -> np.ndarray:
+        """Price change over the threshold window (bar-to-bar change without a window)"""
+        if threshold_window is None:
+            return close.pct_change().to_numpy()
+        reference_prices = close.reindex(close.index - threshold_window, method='ffill')
+        reference_prices.index = close.index
+        momentum = ((close - reference_prices) / reference_prices).to_numpy()
+        momentum[(reference_prices <= 0).to_numpy()] = np.nan
+        return momentum
 
-            # Buy signal: momentum change meets threshold direction and we have no position
-            can_buy = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_buy = (i - last_sell_time) >= cooldown_timedelta
-
-            threshold_met = momentum_change >= buy_threshold if buy_threshold >= 0 else momentum_change <= buy_threshold
-
-            if can_buy and threshold_met and position == 0 and cash > 0:
-                fee = cash * fee_rate
-                buy_amount = cash - fee
-                position = buy_amount / current_price
-                entry_price = current_price
-                cash = 0
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'BUY',
-                    'price': current_price,
-                    'amount': position,
-                    'value': buy_amount,
-                    'fee': fee,
-                    'trigger': f'{momentum_change:.2%} {"momentum" if buy_threshold >= 0 else "dip"}' + (f' over {threshold_window_hours}h' if threshold_window_hours > 0 else ''),
-                    'momentum_window_hours': threshold_window_hours if threshold_window_hours > 0 else None
-                })
-
-            # Sell signals: profit target or stop loss
-            elif position > 0:
-                profit_pct = (current_price - entry_price) / entry_price
-
-                if profit_pct >= sell_profit or profit_pct <= -stop_loss:
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    cash = sell_value - fee
-
-                    action_reason = 'profit target' if profit_pct >= sell_profit else 'stop loss'
-                    trades.append({
-                        'date': self._serialize_trade_date(i),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'trigger': f'{profit_pct:.2%} {action_reason}'
-                    })
-                    position = 0
-                    entry_price = 0
-                    last_sell_time = i
-
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
-
-    def backtest_bollinger_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
+    def backtest_bollinger_strategy(self, df: pd.DataFrame, params: Dict,
+                                    indicator_cache: Optional[Dict] = None) -> Dict:
         """Backtest Bollinger Bands strategy"""
+        return self._backtest_signals(df, params, self._bollinger_signals, self._decorate_bollinger_trade,
+                                      indicator_cache)
+
+    def _bollinger_signals(self, close: np.ndarray, index, params: Dict,
+                           indicator_cache: Optional[Dict] = None) -> Dict:
         period = int(params['ma_period'])
         std_mult = float(params['std_multiplier'])
         
-        if len(df) < period + 1:
-            return self._empty_result("Insufficient data for Bollinger Bands")
-            
-        df = df.copy()
-        df['upper_band'], df['middle_band'], df['lower_band'] = self.calculate_bollinger_bands(
-            df['close_price'], period, std_mult
+        prices = pd.Series(close) if close.ndim == 1 else pd.DataFrame(close)
+        upper_band, lower_band = self._cached_indicator(
+            indicator_cache, ('bollinger', period, std_mult),
+            lambda: tuple(band.to_numpy() for band in
+                          self.calculate_bollinger_bands(prices, period, std_mult)[::2])
         )
         
-        initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
         stop_loss = float(params.get('stop_loss_threshold', 10)) / 100
         
-        # Cooldown period
-        cooldown_value = int(params.get('cooldown_value', 0))
-        cooldown_unit = params.get('cooldown_unit', 'hours')
-        cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
-        
-        cash = initial_investment
-        position = 0
-        position_entry_price = 0
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
-        
-        for i, row in df.iterrows():
-            if pd.isna(row['lower_band']) or pd.isna(row['upper_band']):
-                continue
-                
-            current_price = row['close_price']
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': i, 'value': current_value})
-            
-            # Check stop loss if we have a position
-            if position > 0 and position_entry_price > 0:
-                profit_pct = (current_price - position_entry_price) / position_entry_price
-                if profit_pct <= -stop_loss:
-                    # Stop loss triggered
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    cash = sell_value - fee
-                    trades.append({
-                        'date': self._serialize_trade_date(i),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'band_position': 'stop_loss',
-                        'reason': 'stop_loss'
-                    })
-                    position = 0
-                    position_entry_price = 0
-                    last_sell_time = i
-                    continue
-            
-            # Buy signal: price touches lower band
-            can_buy = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_buy = (i - last_sell_time) >= cooldown_timedelta
-            
-            if can_buy and current_price <= row['lower_band'] and position == 0 and cash > 0:
-                fee = cash * fee_rate
-                buy_amount = cash - fee
-                position = buy_amount / current_price
-                position_entry_price = current_price
-                cash = 0
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'BUY',
-                    'price': current_price,
-                    'amount': position,
-                    'value': buy_amount,
-                    'fee': fee,
-                    'band_position': 'lower_band'
-                })
-            
-            # Sell signal: price touches upper band
-            elif current_price >= row['upper_band'] and position > 0:
-                sell_value = position * current_price
-                fee = sell_value * fee_rate
-                cash = sell_value - fee
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'SELL',
-                    'price': current_price,
-                    'amount': position,
-                    'value': sell_value,
-                    'fee': fee,
-                    'band_position': 'upper_band',
-                    'reason': 'upper_band'
-                })
-                position = 0
-                position_entry_price = 0
-                last_sell_time = i
-        
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-        
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
-
-    def backtest_mean_reversion_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
+        # Buy when price touches the lower band, sell when it touches the upper band
+        valid = ~np.isnan(lower_band) & ~np.isnan(upper_band)
+        return {
+            'required_bars': period + 1,
+            'insufficient': "Insufficient data for Bollinger Bands",
+            'entries': close <= lower_band,
+            'exits': close >= upper_band,
+            'tradable': valid,
+            'recorded': valid,
+            'options': {'stop_loss': stop_loss, 'exit_reason': 'upper_band'}
+        }
+
+    def _decorate_bollinger_trade(self, record: Dict, trade: Dict, signals: Dict):
+        if trade['action'] == 'BUY':
+            record['band_position'] = 'lower_band'
+        else:
+            record['band_position'] = trade['reason']
+            record['reason'] = trade['reason']
+
+    def backtest_mean_reversion_strategy(self, df: pd.DataFrame, params: Dict,
+                                         indicator_cache: Optional[Dict] = None) -> Dict:
         """Backtest Mean Reversion strategy"""
+        return self._backtest_signals(df, params, self._mean_reversion_signals, self._decorate_mean_reversion_trade,
+                                      indicator_cache)
+
+    def _mean_reversion_signals(self, close: np.ndarray, index, params: Dict,
+                                indicator_cache: Optional[Dict] = None) -> Dict:
         period = int(params['ma_period'])
-        deviation = float(params['deviation_threshold']) / 100
+        deviation_threshold = float(params['deviation_threshold']) / 100
         
-        if len(df) < period + 1:
-            return self._empty_result("Insufficient data for mean reversion")
-            
-        df = df.copy()
-        df['ma'] = self.calculate_moving_average(df['close_price'], period)
-        df['deviation'] = (df['close_price'] - df['ma']) / df['ma']
+        ma = self._cached_indicator(
+            indicator_cache, ('sma', period),
+            lambda: VectorizedIndicators.calculate_moving_average_vectorized(close, period)
+        )
+        deviation = (close - ma) / ma
         
-        initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
         stop_loss = float(params.get('stop_loss_threshold', 10)) / 100
         
-        # Cooldown period
-        cooldown_value = int(params.get('cooldown_value', 0))
-        cooldown_unit = params.get('cooldown_unit', 'hours')
-        cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+        # Buy when price deviates below MA by threshold, sell when it returns to the MA
+        valid = ~np.isnan(deviation)
+        return {
+            'required_bars': period + 1,
+            'insufficient': "Insufficient data for mean reversion",
+            'entries': deviation <= -deviation_threshold,
+            'exits': deviation >= 0,
+            'tradable': valid,
+            'recorded': valid,
+            'options': {'stop_loss': stop_loss, 'exit_reason': 'mean_reversion'},
+            'deviation': deviation
+        }
+
+    def _decorate_mean_reversion_trade(self, record: Dict, trade: Dict, signals: Dict):
+        record['deviation'] = signals['deviation'][trade['index']]
+        if trade['action'] == 'SELL':
+            record['reason'] = trade['reason']
+
+    def _nearest_support_resistance(self, close: np.ndarray, lookback_period: int, min_touches: int,
+                                    tolerance: float = 0.02) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Nearest support and resistance level for every bar
         
-        cash = initial_investment
-        position = 0
-        position_entry_price = 0
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
+        Levels for bar i come from the lookback window close[i-lookback:i]:
+        5-bar local minima (support) and maxima (resistance) whose neighbours
+        lie inside the window, clustered in time order (a pivot joins the first
+        cluster of its type within `tolerance` of the cluster average) and kept
+        when the cluster has at least min_touches pivots.
         
-        for i, row in df.iterrows():
-            if pd.isna(row['deviation']):
-                continue
-                
-            current_price = row['close_price']
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': i, 'value': current_value})
-            
-            # Check stop loss if we have a position
-            if position > 0 and position_entry_price > 0:
-                profit_pct = (current_price - position_entry_price) / position_entry_price
-                if profit_pct <= -stop_loss:
-                    # Stop loss triggered
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    cash = sell_value - fee
-                    trades.append({
-                        'date': self._serialize_trade_date(i),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'deviation': row['deviation'],
-                        'reason': 'stop_loss'
-                    })
-                    position = 0
-                    position_entry_price = 0
-                    last_sell_time = i
-                    continue
+        Pivots are detected once for the whole series and the window slides
+        incrementally: each bar adds and expires at most one pivot, and the
+        clusters are updated in place (see _PivotClusters). The level lists are
+        only rebuilt on bars where the pivot window changed.
+        
+        Returns:
+            (has_levels, nearest_support, nearest_resistance); the nearest
+            levels are NaN where no level of that type exists
+        """
+        n = len(close)
+        has_levels = np.zeros(n, dtype=bool)
+        nearest_support = np.full(n, np.nan)
+        nearest_resistance = np.full(n, np.nan)
+        
+        # A window of fewer than 5 bars cannot contain a pivot
+        if lookback_period < 5 or n <= lookback_period:
+            return has_levels, nearest_support, nearest_resistance
+        
+        is_local_min, is_local_max = VectorizedIndicators.find_pivots_vectorized(close)
+        prices = close.tolist()
+        support = _PivotClusters(tolerance)
+        resistance = _PivotClusters(tolerance)
+        
+        # Pivots usable by bar i sit in [i - lookback + 2, i - 3]
+        for k in range(2, lookback_period - 2):
+            if is_local_min[k]:
+                support.add(prices[k])
+            elif is_local_max[k]:
+                resistance.add(prices[k])
+        
+        changed = True
+        support_levels = resistance_levels = []
+        for i in range(lookback_period, n):
+            if i > lookback_period:
+                expired, added = i - lookback_period + 1, i - 3
+                if is_local_min[expired]:
+                    support.expire_oldest()
+                    changed = True
+                elif is_local_max[expired]:
+                    resistance.expire_oldest()
+                    changed = True
+                if is_local_min[added]:
+                    support.add(prices[added])
+                    changed = True
+                elif is_local_max[added]:
+                    resistance.add(prices[added])
+                    changed = True
             
-            # Buy signal: price deviates below MA by threshold
-            can_buy = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_buy = (i - last_sell_time) >= cooldown_timedelta
+            if changed:
+                support_levels = support.levels(min_touches)
+                resistance_levels = resistance.levels(min_touches)
+                changed = False
             
-            if can_buy and row['deviation'] <= -deviation and position == 0 and cash > 0:
-                fee = cash * fee_rate
-                buy_amount = cash - fee
-                position = buy_amount / current_price
-                position_entry_price = current_price
-                cash = 0
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'BUY',
-                    'price': current_price,
-                    'amount': position,
-                    'value': buy_amount,
-                    'fee': fee,
-                    'deviation': row['deviation']
-                })
+            if not support_levels and not resistance_levels:
+                continue
             
-            # Sell signal: price returns to or above MA
-            elif row['deviation'] >= 0 and position > 0:
-                sell_value = position * current_price
-                fee = sell_value * fee_rate
-                cash = sell_value - fee
-                trades.append({
-                    'date': self._serialize_trade_date(i),
-                    'action': 'SELL',
-                    'price': current_price,
-                    'amount': position,
-                    'value': sell_value,
-                    'fee': fee,
-                    'deviation': row['deviation'],
-                    'reason': 'mean_reversion'
-                })
-                position = 0
-                position_entry_price = 0
-                last_sell_time = i
-        
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-        
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
-
-    def backtest_support_resistance_strategy(self, df: pd.DataFrame, params: Dict) -> Dict:
+            has_levels[i] = True
+            current_price = prices[i]
+            if support_levels:
+                nearest_support[i] = min(support_levels, key=lambda x: abs(x - current_price))
+            if resistance_levels:
+                nearest_resistance[i] = min(resistance_levels, key=lambda x: abs(x - current_price))
+        
+        return has_levels, nearest_support, nearest_resistance
+
+    def backtest_support_resistance_strategy(self, df: pd.DataFrame, params: Dict,
+                                             indicator_cache: Optional[Dict] = None) -> Dict:
         """Backtest Support/Resistance strategy
         
         Identifies support and resistance levels based on recent price action.
@@ -911,197 +1223,75 @@ class CryptoBacktestService:
         
         Sell signals:
         - Price breaks below support by break_threshold
+        - Price reaches resistance while the position is in profit
         - Stop loss threshold exceeded
         """
+        if len(df) < int(params['lookback_period']):
+            return self._empty_result(f"Insufficient data (need {int(params['lookback_period'])} periods)")
+        
+        df = self._cached_indicator(indicator_cache, ('sorted',), df.sort_index)
+        return self._backtest_signals(df, params, self._support_resistance_signals,
+                                      self._decorate_support_resistance_trade, indicator_cache)
+
+    def _support_resistance_signals(self, close: np.ndarray, index, params: Dict,
+                                    indicator_cache: Optional[Dict] = None) -> Dict:
         lookback_period = int(params['lookback_period'])
         min_touches = int(params['min_touches'])
         break_threshold = float(params['break_threshold']) / 100
         stop_loss = float(params['stop_loss_threshold']) / 100
-        initial_investment = float(params['initial_investment'])
-        fee_rate = float(params['transaction_fee']) / 100
         
-        # Cooldown period
-        cooldown_value = int(params.get('cooldown_value', 0))
-        cooldown_unit = params.get('cooldown_unit', 'hours')
-        cooldown_hours = cooldown_value * 24 if cooldown_unit == 'days' else cooldown_value
-        cooldown_timedelta = pd.Timedelta(hours=cooldown_hours) if cooldown_hours > 0 else None
+        has_levels, nearest_support, nearest_resistance = self._cached_indicator(
+            indicator_cache, ('support_resistance', lookback_period, min_touches),
+            lambda: self._columnwise(close, index, lambda prices, prices_index: self._nearest_support_resistance(
+                prices, lookback_period, min_touches))
+        )
         
-        if len(df) < lookback_period:
-            return self._empty_result(f"Insufficient data (need {lookback_period} periods)")
+        # Buy: breakout above resistance, else bounce off support (within 1%, rising)
+        previous_close = np.full(close.shape, np.nan)
+        previous_close[1:] = close[:-1]
+        breakout = close > nearest_resistance * (1 + break_threshold)
+        bounce = ~breakout & (np.abs(close - nearest_support) / nearest_support < 0.01) & (previous_close < close)
         
-        df = df.copy()
-        df.sort_index(inplace=True)
+        # Sell: breakdown below support, else resistance reached (within 1%) while in profit
+        breakdown = close < nearest_support * (1 - break_threshold)
+        near_resistance = ~breakdown & (np.abs(close - nearest_resistance) / nearest_resistance < 0.01)
         
-        # Calculate support and resistance levels
-        def find_support_resistance(price_series, tolerance=0.02):
-            """Find support and resistance levels using local minima/maxima"""
-            levels = []
-            
-            for i in range(2, len(price_series) - 2):
-                # Local minima (support)
-                if price_series.iloc[i] < price_series.iloc[i-1] and \
-                   price_series.iloc[i] < price_series.iloc[i+1] and \
-                   price_series.iloc[i] < price_series.iloc[i-2] and \
-                   price_series.iloc[i] < price_series.iloc[i+2]:
-                    levels.append(('support', price_series.iloc[i]))
-                
-                # Local maxima (resistance)
-                elif price_series.iloc[i] > price_series.iloc[i-1] and \
-                     price_series.iloc[i] > price_series.iloc[i+1] and \
-                     price_series.iloc[i] > price_series.iloc[i-2] and \
-                     price_series.iloc[i] > price_series.iloc[i+2]:
-                    levels.append(('resistance', price_series.iloc[i]))
-            
-            # Cluster similar levels
-            clustered = []
-            for level_type, price in levels:
-                found_cluster = False
-                for i, (existing_type, existing_price, count) in enumerate(clustered):
-                    if level_type == existing_type and abs(price - existing_price) / existing_price < tolerance:
-                        # Update cluster average and increment count
-                        new_avg = (existing_price * count + price) / (count + 1)
-                        clustered[i] = (existing_type, new_avg, count + 1)
-                        found_cluster = True
-                        break
-                
-                if not found_cluster:
-                    clustered.append((level_type, price, 1))
-            
-            # Filter by minimum touches
-            return [(level_type, price) for level_type, price, count in clustered if count >= min_touches]
-        
-        cash = initial_investment
-        position = 0
-        entry_price = 0
-        trades = []
-        portfolio_values = []
-        last_sell_time = None
-        
-        for i in range(lookback_period, len(df)):
-            current_idx = df.index[i]
-            current_price = df['close_price'].iloc[i]
-            current_value = cash + (position * current_price)
-            portfolio_values.append({'date': current_idx, 'value': current_value})
-            
-            # Get recent price window
-            lookback_window = df['close_price'].iloc[i-lookback_period:i]
-            
-            # Find support and resistance levels
-            sr_levels = find_support_resistance(lookback_window)
-            
-            if not sr_levels:
-                continue
-            
-            support_levels = [price for level_type, price in sr_levels if level_type == 'support']
-            resistance_levels = [price for level_type, price in sr_levels if level_type == 'resistance']
-            
-            # Check stop loss if we have a position
-            if position > 0 and entry_price > 0:
-                profit_pct = (current_price - entry_price) / entry_price
-                if profit_pct <= -stop_loss:
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    trades.append({
-                        'date': self._serialize_trade_date(current_idx),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'trigger': f'stop loss ({profit_pct:.2%})'
-                    })
-                    cash = sell_value - fee
-                    position = 0
-                    entry_price = 0
-                    last_sell_time = current_idx
-                    continue
-            
-            # Check cooldown
-            can_trade = True
-            if cooldown_timedelta is not None and last_sell_time is not None:
-                can_trade = (current_idx - last_sell_time) >= cooldown_timedelta
-            
-            # BUY SIGNALS
-            if can_trade and position == 0 and cash > 0:
-                buy_signal = False
-                trigger_reason = ""
-                
-                # Signal 1: Price breaks above resistance
-                if resistance_levels:
-                    nearest_resistance = min(resistance_levels, key=lambda x: abs(x - current_price))
-                    if current_price > nearest_resistance * (1 + break_threshold):
-                        buy_signal = True
-                        trigger_reason = f'breakout above resistance ${nearest_resistance:.2f}'
-                
-                # Signal 2: Price bounces off support
-                if not buy_signal and support_levels:
-                    nearest_support = min(support_levels, key=lambda x: abs(x - current_price))
-                    # Check if price is near support (within 1%)
-                    if abs(current_price - nearest_support) / nearest_support < 0.01:
-                        # Check if previous price was below current (bouncing up)
-                        if i > 0 and df['close_price'].iloc[i-1] < current_price:
-                            buy_signal = True
-                            trigger_reason = f'bounce off support ${nearest_support:.2f}'
-                
-                if buy_signal:
-                    fee = cash * fee_rate
-                    buy_amount = cash - fee
-                    position = buy_amount / current_price
-                    entry_price = current_price
-                    trades.append({
-                        'date': self._serialize_trade_date(current_idx),
-                        'action': 'BUY',
-                        'price': current_price,
-                        'amount': position,
-                        'value': buy_amount,
-                        'fee': fee,
-                        'trigger': trigger_reason
-                    })
-                    cash = 0
-            
-            # SELL SIGNALS
-            elif position > 0:
-                sell_signal = False
-                trigger_reason = ""
-                
-                # Signal 1: Price breaks below support
-                if support_levels:
-                    nearest_support = min(support_levels, key=lambda x: abs(x - current_price))
-                    if current_price < nearest_support * (1 - break_threshold):
-                        sell_signal = True
-                        trigger_reason = f'breakdown below support ${nearest_support:.2f}'
-                
-                # Signal 2: Price reaches resistance (take profit)
-                if not sell_signal and resistance_levels:
-                    nearest_resistance = min(resistance_levels, key=lambda x: abs(x - current_price))
-                    # Check if price is near resistance (within 1%)
-                    if abs(current_price - nearest_resistance) / nearest_resistance < 0.01:
-                        profit_pct = (current_price - entry_price) / entry_price
-                        if profit_pct > 0:  # Only sell if profitable
-                            sell_signal = True
-                            trigger_reason = f'resistance reached ${nearest_resistance:.2f} ({profit_pct:.2%} profit)'
-                
-                if sell_signal:
-                    sell_value = position * current_price
-                    fee = sell_value * fee_rate
-                    trades.append({
-                        'date': self._serialize_trade_date(current_idx),
-                        'action': 'SELL',
-                        'price': current_price,
-                        'amount': position,
-                        'value': sell_value,
-                        'fee': fee,
-                        'trigger': trigger_reason
-                    })
-                    cash = sell_value - fee
-                    position = 0
-                    entry_price = 0
-                    last_sell_time = current_idx
-        
-        final_price = df['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
-        
-        return self._calculate_results(initial_investment, final_value, trades, df, portfolio_values)
+        recorded = np.zeros(close.shape, dtype=bool)
+        recorded[lookback_period:] = True
+        return {
+            'required_bars': lookback_period,
+            'insufficient': f"Insufficient data (need {lookback_period} periods)",
+            'entries': breakout | bounce,
+            'exits': breakdown,
+            'tradable': has_levels,
+            'recorded': recorded,
+            'options': {'stop_loss': stop_loss, 'profit_exit_signals': near_resistance,
+                        'exit_reason': 'breakdown'},
+            'breakout': breakout,
+            'nearest_support': nearest_support,
+            'nearest_resistance': nearest_resistance
+        }
+
+    def _decorate_support_resistance_trade(self, record: Dict, trade: Dict, signals: Dict):
+        i = trade['index']
+        nearest_support = signals['nearest_support']
+        nearest_resistance = signals['nearest_resistance']
+        if trade['action'] == 'BUY':
+            if signals['breakout'][i]:
+                record['trigger'] = f'breakout above resistance ${nearest_resistance[i]:.2f}'
+            else:
+                record['trigger'] = f'bounce off support ${nearest_support[i]:.2f}'
+        elif trade['reason'] == 'stop_loss':
+            record['trigger'] = f"stop loss ({trade['profit_pct']:.2%})"
+        elif trade['reason'] == 'breakdown':
+            record['trigger'] = f'breakdown below support ${nearest_support[i]:.2f}'
+        else:
+            record['trigger'] = f"resistance reached ${nearest_resistance[i]:.2f} ({trade['profit_pct']:.2%} profit)"
+
+    def _get_strategy_function(self, strategy_name: str):
+        """Return the backtest method for a strategy name, or None if not implemented"""
+        method_name = self.STRATEGY_FUNCTIONS.get(strategy_name)
+        return getattr(self, method_name) if method_name else None
 
     def _empty_result(self, reason: str) -> Dict:
         """Return empty result for failed backtests"""
@@ -1125,8 +1315,9 @@ class CryptoBacktestService:
             return str(timestamp.date())
         return str(timestamp)
 
-    def _calculate_results(self, initial_investment: float, final_value: float, trades: List, df: pd.DataFrame, portfolio_values: List) -> Dict:
-        """Calculate backtest results and metrics"""
+    def _calculate_results(self, initial_investment: float, final_value: float, trades: List, df: pd.DataFrame,
+                           portfolio_values: pd.Series, trade_bars: np.ndarray) -> Dict:
+        """Calculate backtest results and metrics (trade_bars: bar index of each trade in df)"""
         if not trades:
             return self._empty_result("No trades executed")
             
@@ -1135,35 +1326,24 @@ class CryptoBacktestService:
         total_trades = len(trades)
         total_fees = sum(trade['fee'] for trade in trades)
         
-        # Count profitable vs losing trades
-        profitable_trades = 0
-        losing_trades = 0
-        buy_trades = [t for t in trades if t['action'] == 'BUY']
-        sell_trades = [t for t in trades if t['action'] == 'SELL']
-        
-        for i in range(min(len(buy_trades), len(sell_trades))):
-            if sell_trades[i]['value'] > buy_trades[i]['value']:
-                profitable_trades += 1
-            else:
-                losing_trades += 1
-        
         # Buy and hold return
-        start_price = df['close_price'].iloc[0]
-        end_price = df['close_price'].iloc[-1]
+        start_price = float(df['close_price'].iloc[0])
+        end_price = float(df['close_price'].iloc[-1])
         buy_hold_return = (end_price - start_price) / start_price
         
         # Strategy vs buy-and-hold
         strategy_vs_hold = total_return - buy_hold_return
         
-        # Calculate maximum drawdown
-        max_drawdown = 0
-        peak_value = initial_investment
-        
-        for pv in portfolio_values:
-            if pv['value'] > peak_value:
-                peak_value = pv['value']
-            drawdown = (peak_value - pv['value']) / peak_value
-            max_drawdown = max(max_drawdown, drawdown)
+        # Drawdown, win/loss and risk-adjusted metrics in one vectorized pass
+        metrics = calculate_backtest_metrics(
+            initial_investment, final_value,
+            portfolio_values.to_numpy(dtype=np.float64), portfolio_values.index.asi8,
+            np.array([trade['action'] for trade in trades]),
+            np.array([trade['value'] for trade in trades], dtype=np.float64),
+            trade_bars, df.index.asi8
+        )
+        scaled = lambda name, scale=1, digits=2: (round(metrics[name] * scale, digits)
+                                                  if metrics[name] is not None else None)
         
         # Serialize trade dates for JSON compatibility
         serialized_trades = []
@@ -1182,21 +1362,140 @@ class CryptoBacktestService:
             'final_value': round(final_value, 2),
             'total_return': round(total_return * 100, 2),
             'total_trades': total_trades,
-            'profitable_trades': profitable_trades,
-            'losing_trades': losing_trades,
+            'profitable_trades': metrics['profitable_trades'],
+            'losing_trades': metrics['losing_trades'],
             'buy_hold_return': round(buy_hold_return * 100, 2),
             'strategy_vs_hold': round(strategy_vs_hold * 100, 2),
-            'max_drawdown': round(max_drawdown * 100, 2),
+            'max_drawdown': round(metrics['max_drawdown'] * 100, 2),
             'total_fees': round(total_fees, 2),
+            'win_rate': scaled('win_rate', 100),
+            'win_loss_ratio': scaled('win_loss_ratio'),
+            'sharpe_ratio': scaled('sharpe_ratio'),
+            'sortino_ratio': scaled('sortino_ratio'),
+            'annualized_return': scaled('annualized_return', 100),
+            'calmar_ratio': scaled('calmar_ratio'),
+            'exposure_time': scaled('exposure_time', 100),
+            'average_holding_period_hours': scaled('average_holding_period_hours', digits=1),
             'trades': serialized_trades,
             'portfolio_values': portfolio_values,
             'start_date': str(df.index[0].date()) if not df.empty else None,
             'end_date': str(df.index[-1].date()) if not df.empty else None
         }
 
+    def get_strategy(self, strategy_id: int) -> Optional[Dict]:
+        """Get a strategy row (id, name) or None if it does not exist"""
+        with self.get_connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute("SELECT id, name FROM crypto_strategies WHERE id = %s", (strategy_id,))
+                return cur.fetchone()
+
+    def get_parameter_schemas(self) -> Dict[int, Dict]:
+        """
+        Parameter schemas of all strategies from crypto_strategy_parameters
+        
+        Loaded once per process and refreshed after PARAMETER_SCHEMA_TTL seconds.
+        A failed load is not cached: the last loaded schemas (empty before the
+        first load, parameters are then used as sent) are returned and the next
+        call tries again.
+        
+        Returns:
+            strategy_id -> {parameter name -> schema entry (see strategy_parameters)}
+        """
+        loaded_at, schemas = CryptoBacktestService._parameter_schemas
+        if loaded_at is not None and time.monotonic() - loaded_at < self.PARAMETER_SCHEMA_TTL:
+            return schemas
+        
+        schemas = {}
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT strategy_id, parameter_name, parameter_type, default_value, min_value, max_value
+                        FROM crypto_strategy_parameters
+                        ORDER BY strategy_id, display_order, id
+                    """)
+                    for strategy_id, name, parameter_type, default_value, min_value, max_value in cur.fetchall():
+                        schemas.setdefault(strategy_id, {})[name] = schema_entry(
+                            parameter_type, default_value, min_value, max_value)
+        except Exception as e:
+            logger.warning(f"⚠️ Strategy parameter schemas unavailable: {e}")
+            return CryptoBacktestService._parameter_schemas[1]
+        CryptoBacktestService._parameter_schemas = (time.monotonic(), schemas)
+        return schemas
+
+    def canonical_parameters(self, strategy_id: int, parameters: Dict) -> Dict:
+        """
+        Parameters in canonical form for hashing and running
+        
+        Validated, type-coerced, defaults filled and unknown keys dropped against
+        the strategy's schema, so equivalent payloads share cache entries.
+        Parameters of strategies without a schema are returned unchanged.
+        
+        Raises:
+            ValueError: A parameter is invalid or out of range
+        """
+        schema = self.get_parameter_schemas().get(strategy_id)
+        if not schema:
+            return dict(parameters)
+        return normalize_parameters(parameters, schema)
+
+    def _record_cache_lookups(self, strategy_id: int, redis_hits: int = 0, store_hits: int = 0, misses: int = 0):
+        """
+        Count result lookups per strategy and tier
+        
+        Counted in process (no round trip on the lookup path) and added to the
+        Redis counters shared by all processes every LOOKUP_FLUSH_SECONDS.
+        """
+        with self._lookup_lock:
+            counts = self._lookup_counts.setdefault(strategy_id, {})
+            for field, count in (('redis_hits', redis_hits), ('store_hits', store_hits), ('misses', misses)):
+                if count:
+                    counts[field] = counts.get(field, 0) + count
+            due = time.monotonic() - self._lookups_flushed_at >= self.LOOKUP_FLUSH_SECONDS
+        if due:
+            self.flush_cache_lookups()
+
+    def flush_cache_lookups(self):
+        """Add the lookups counted in this process to the shared Redis counters (one pipeline per strategy)"""
+        with self._lookup_lock:
+            pending, self._lookup_counts = self._lookup_counts, {}
+            self._lookups_flushed_at = time.monotonic()
+        if self.cache and self.cache.enabled:
+            for strategy_id, counts in pending.items():
+                self.cache.increment_counters(f'stats:backtest_cache:{strategy_id}', counts)
+
+    def get_cache_hit_rates(self) -> List[Dict]:
+        """
+        Result cache hit rate per strategy
+        
+        Returns:
+            One entry per strategy with lookups, redis_hits, store_hits, misses
+            and hit_rate (% of lookups served by Redis or the result store)
+        """
+        if not (self.cache and self.cache.enabled):
+            return []
+        self.flush_cache_lookups()
+        rates = []
+        for key, counts in sorted(self.cache.get_counters('stats:backtest_cache:*').items()):
+            hits = counts.get('redis_hits', 0) + counts.get('store_hits', 0)
+            lookups = hits + counts.get('misses', 0)
+            rates.append({
+                'strategy_id': int(key.rsplit(':', 1)[1]),
+                'lookups': lookups,
+                'redis_hits': counts.get('redis_hits', 0),
+                'store_hits': counts.get('store_hits', 0),
+                'misses': counts.get('misses', 0),
+                'hit_rate': round(hits / lookups * 100, 2) if lookups else None
+            })
+        return rates
+
     def run_backtest(self, strategy_id: int, crypto_id: int, parameters: Dict, 
                      start_date: str = None, end_date: str = None, interval: str = '1d',
-                     use_daily_sampling: bool = True, force_refresh: bool = False) -> Dict:
+                     use_daily_sampling: bool = True, force_refresh: bool = False,
+                     price_data: Optional[pd.DataFrame] = None,
+                     strategy: Optional[Dict] = None, result_format: str = 'rows',
+                     max_points: Optional[int] = None, low_memory: bool = False,
+                     bulk: bool = False) -> Dict:
         """
         Run backtest for a specific strategy and cryptocurrency with optional date range
         
@@ -1209,120 +1508,620 @@ class CryptoBacktestService:
             interval: Data interval ('1d' or '1h')
             use_daily_sampling: Use daily aggregation
             force_refresh: Skip cache and recompute
+            price_data: Optional preloaded price frame (e.g. from get_price_data_batch);
+                        skips the price query
+            strategy: Optional resolved strategy row from get_strategy(); skips the
+                      strategy lookup
+            result_format: 'rows' (lists of dicts), 'columnar' or 'columnar32'
+                           (parallel arrays, see backtest_result_format)
+            max_points: Downsample price_history to about this many points for
+                        charting, keeping every trade (None: full resolution;
+                        the cache always holds full resolution)
+            low_memory: Bounded-memory mode: hourly prices are streamed into
+                        float32 arrays and the backtest runs in chunks
+                        (see backtest_low_memory); results carry 'memory'
+            bulk: One coin of a bulk run whose caller already looked every coin
+                  up (get_cached_backtests) and writes the computed results to
+                  the result store in one query (store_backtests): the Redis and
+                  store lookups and the store write are skipped here
         
         Returns:
             Backtest results dictionary
         
+        Raises:
+            ValueError: Invalid parameters (see canonical_parameters)
+        
         Performance:
             - First run: 0.5s (compute + cache)
             - Cached run: 0.01s (50x faster!)
+            - Same start and parameters, later end date: only the new bars are
+              computed, from the checkpoint of the previous run (see
+              backtest_checkpoint; not for low_memory runs)
+            - Identical concurrent calls: one computes, the others wait for its
+              cached result (CacheService.acquire_lock / wait_for)
         """
         start_time = datetime.now()
+        parameters = self.canonical_parameters(strategy_id, parameters)
         
         # Generate cache key
-        cache_key = None
-        if self.cache and self.cache.enabled:
-            cache_key = self.cache.generate_cache_key(
-                'backtest',
-                strategy_id=strategy_id,
-                crypto_id=crypto_id,
-                parameters=parameters,
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                use_daily_sampling=use_daily_sampling
-            )
-            
-            # Try to get from cache (unless force refresh)
-            if not force_refresh:
-                cached_result = self.cache.get(cache_key)
-                if cached_result:
-                    # Add cache hit indicator
-                    cached_result['from_cache'] = True
-                    cached_result['cache_key'] = cache_key
-                    logger.info(f"🎯 Cache HIT: {cache_key} (instant result!)")
-                    return cached_result
+        cache_key = self._backtest_cache_key(strategy_id, crypto_id, parameters, start_date, end_date,
+                                             interval, use_daily_sampling, low_memory)
+        
+        # Try to get from cache, then from the result store (unless force refresh or already looked up)
+        if cache_key and not (force_refresh or bulk):
+            cached_result = self._get_cached_backtest(cache_key, result_format)
+            if cached_result:
+                self._record_cache_lookups(strategy_id, redis_hits=1)
+                return downsample_result(cached_result, max_points)
+        store_key = self._result_store_key(start_date, end_date, interval, use_daily_sampling, low_memory)
+        if not (force_refresh or bulk):
+            stored_result = self._get_stored_backtests(strategy_id, [crypto_id], parameters, store_key,
+                                                       {crypto_id: cache_key}, result_format).get(crypto_id)
+            if stored_result:
+                self._record_cache_lookups(strategy_id, store_hits=1)
+                return downsample_result(stored_result, max_points)
+            self._record_cache_lookups(strategy_id, misses=1)
+        
+        # Single flight: an identical backtest already running elsewhere is waited for, not repeated
+        lock_token = None
+        if cache_key and not force_refresh:
+            lock_token = self.cache.acquire_lock(cache_key)
+            if lock_token is None:
+                cached_result = self.cache.wait_for(cache_key)
+                if cached_result is not None:
+                    logger.info(f"🎯 Cache HIT: {cache_key} (computed by a concurrent request)")
+                    return downsample_result(self._cached_backtest_result(cached_result, cache_key, result_format),
+                                             max_points)
+                # Holder failed, timed out or cached nothing (failed result): compute here
+                lock_token = self.cache.acquire_lock(cache_key)
+        
+        # Checkpoint of an earlier run with the same start: only bars after it are computed
+        checkpoint_key = None
+        if cache_key and not low_memory:
+            checkpoint_key = self._checkpoint_key(strategy_id, crypto_id, parameters, start_date, interval,
+                                                  use_daily_sampling)
         
         # Cache miss or force refresh - compute result
         try:
-            # Get price data with optional date filtering and interval
-            df = self.get_price_data(crypto_id, start_date=start_date, end_date=end_date,
-                                    interval=interval, use_daily_sampling=use_daily_sampling)
+            # Get price data with optional date filtering and interval (unless preloaded)
+            if price_data is not None:
+                df = price_data
+            elif low_memory and interval == '1h':
+                df = self.get_price_arrays(crypto_id, start_date=start_date, end_date=end_date,
+                                           with_high_low=parameters.get('stop_fill', 'close') != 'close')
+            else:
+                df = self.get_price_data(crypto_id, start_date=start_date, end_date=end_date,
+                                        interval=interval, use_daily_sampling=use_daily_sampling)
             if df.empty:
                 return self._empty_result("No price data available")
             
-            # Get strategy info
-            with self.get_connection() as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute("SELECT name FROM crypto_strategies WHERE id = %s", (strategy_id,))
-                    strategy = cur.fetchone()
-                    if not strategy:
-                        return self._empty_result("Strategy not found")
+            # Get strategy info (unless already resolved by the caller)
+            if strategy is None:
+                strategy = self.get_strategy(strategy_id)
+            if not strategy:
+                return self._empty_result("Strategy not found")
             
             # Run appropriate backtest based on strategy
             strategy_name = strategy['name']
-            if strategy_name == 'RSI Buy/Sell':
-                result = self.backtest_rsi_strategy(df, parameters)
-            elif strategy_name == 'Moving Average Crossover':
-                result = self.backtest_ma_crossover_strategy(df, parameters)
-            elif strategy_name == 'Price Momentum':
-                result = self.backtest_momentum_strategy(df, parameters)
-            elif strategy_name == 'Support/Resistance':
-                result = self.backtest_support_resistance_strategy(df, parameters)
-            elif strategy_name == 'Bollinger Bands':
-                result = self.backtest_bollinger_strategy(df, parameters)
-            elif strategy_name == 'Mean Reversion':
-                result = self.backtest_mean_reversion_strategy(df, parameters)
-            else:
+            backtest_func = self._get_strategy_function(strategy_name)
+            if backtest_func is None:
                 return self._empty_result(f"Strategy '{strategy_name}' not implemented")
+            if low_memory:
+                result = self.backtest_low_memory(strategy_name, df, parameters)
+            elif checkpoint_key and strategy_name in self.STRATEGY_SIGNALS:
+                checkpoint = None if force_refresh else self.cache.get(checkpoint_key)
+                result, new_checkpoint = self.backtest_resumable(strategy_name, df, parameters, checkpoint)
+                if new_checkpoint is not None and new_checkpoint is not checkpoint:
+                    self.cache.set(checkpoint_key, new_checkpoint, ttl=self.CHECKPOINT_TTL,
+                                   tags=[strategy_tag(strategy_id)])
+            else:
+                result = backtest_func(df, parameters)
             
             # Add full price history for charting (only for successful results)
-            if result.get('success', False) and not df.empty:
-                # Create a map of portfolio values by date for quick lookup
-                portfolio_map = {}
-                if 'portfolio_values' in result:
-                    for pv in result['portfolio_values']:
-                        date_str = pv['date'].strftime('%Y-%m-%d') if hasattr(pv['date'], 'strftime') else str(pv['date'])
-                        portfolio_map[date_str] = pv['value']
-                
-                price_history = []
-                for idx, row in df.iterrows():
-                    date_str = idx.strftime('%Y-%m-%d')
-                    price_history.append({
-                        'date': date_str,
-                        'price': float(row['close_price']),
-                        'portfolio_value': portfolio_map.get(date_str, None)
-                    })
-                result['price_history'] = price_history
-                
-                # Remove raw portfolio_values from result (already in price_history)
-                if 'portfolio_values' in result:
-                    del result['portfolio_values']
+            self._add_price_history(result, df)
             
             # Add calculation time
             calculation_time = (datetime.now() - start_time).total_seconds() * 1000
             result['calculation_time_ms'] = int(calculation_time)
             result['from_cache'] = False
             
-            # Cache the result
+            # Cache the result (lossless columnar layout, several times smaller than rows)
             if cache_key and self.cache and self.cache.enabled:
-                self.cache.set(cache_key, result, ttl=86400)  # 24 hour TTL
+                self.cache.set(cache_key, convert_result(result, 'columnar'), ttl=86400,  # 24 hour TTL
+                               tags=self._backtest_tags(strategy_id, crypto_id))
                 logger.info(f"💾 Cached result: {cache_key}")
+            if self.store and not bulk:
+                self.store.put(strategy_id, crypto_id, result, parameters, **store_key)
             
-            return result
+            return downsample_result(convert_result(result, result_format), max_points)
             
         except Exception as e:
             logger.error(f"Error running backtest: {e}")
             return self._empty_result(f"Calculation error: {str(e)}")
+        finally:
+            if lock_token:
+                self.cache.release_lock(cache_key, lock_token)
+
+    def _backtest_cache_key(self, strategy_id: int, crypto_id: int, parameters: Dict, start_date: str = None,
+                            end_date: str = None, interval: str = '1d',
+                            use_daily_sampling: bool = True, low_memory: bool = False) -> Optional[str]:
+        """Cache key of a single backtest result (None when caching is disabled)"""
+        if not (self.cache and self.cache.enabled):
+            return None
+        # Low-memory (float32) results are kept apart; default keys are unchanged
+        precision = {'precision': 'float32'} if low_memory else {}
+        return self.cache.generate_cache_key(
+            'backtest',
+            strategy_id=strategy_id,
+            crypto_id=crypto_id,
+            parameters=parameters,
+            start_date=start_date,
+            end_date=end_date,
+            interval=interval,
+            use_daily_sampling=use_daily_sampling,
+            **precision
+        )
+
+    @staticmethod
+    def _result_store_key(start_date: str = None, end_date: str = None, interval: str = '1d',
+                          use_daily_sampling: bool = True, low_memory: bool = False) -> Dict:
+        """Result store key of a backtest (see BacktestResultStore.get_many), for every read and write"""
+        return dict(start_date=start_date, end_date=end_date, interval=interval,
+                    use_daily_sampling=use_daily_sampling, precision='float32' if low_memory else 'float64')
+
+    @staticmethod
+    def _backtest_tags(strategy_id: int, crypto_id: int) -> List[str]:
+        """
+        Cache tags of a backtest result
+        
+        The coin's tag is invalidated when new prices are stored for it
+        (CryptoDataService.store_crypto_data). Checkpoints carry only the
+        strategy tag: they stay valid when bars are appended.
+        """
+        return [crypto_tag(crypto_id), strategy_tag(strategy_id)]
+
+    def _checkpoint_key(self, strategy_id: int, crypto_id: int, parameters: Dict, start_date: str = None,
+                        interval: str = '1d', use_daily_sampling: bool = True) -> str:
+        """Cache key of a backtest checkpoint (a result key without the end date)"""
+        return self.cache.generate_cache_key(
+            'backtest_checkpoint',
+            strategy_id=strategy_id,
+            crypto_id=crypto_id,
+            parameters=parameters,
+            start_date=start_date,
+            interval=interval,
+            use_daily_sampling=use_daily_sampling
+        )
+
+    def _get_cached_backtest(self, cache_key: str, result_format: str = 'rows') -> Optional[Dict]:
+        """Cached backtest result in the requested format, or None on a miss"""
+        cached_result = self.cache.get(cache_key)
+        if not cached_result:
+            return None
+        logger.info(f"🎯 Cache HIT: {cache_key} (instant result!)")
+        return self._cached_backtest_result(cached_result, cache_key, result_format)
+
+    @staticmethod
+    def _cached_backtest_result(cached_result: Dict, cache_key: str, result_format: str = 'rows') -> Dict:
+        """A cached result in the requested format, marked as a cache hit"""
+        # Copy: the cache may hand out its in-process (L1) object
+        cached_result = dict(convert_result(cached_result, result_format))
+        
+        # Add cache hit indicator
+        cached_result['from_cache'] = True
+        cached_result['cache_key'] = cache_key
+        return cached_result
+
+    def _get_cached_backtests(self, strategy_id: int, cryptos: List[Dict], parameters: Dict,
+                              start_date: str = None, end_date: str = None, interval: str = '1d',
+                              use_daily_sampling: bool = True, result_format: str = 'rows',
+                              low_memory: bool = False):
+        """
+        Cached results of many coins: one Redis MGET, then one result store query for the rest
+        
+        Returns:
+            (crypto_id -> result for the hits, crypto_id -> cache key). Hits and
+            misses are counted in the lookup statistics; the caller computes the
+            misses with run_backtest(bulk=True)
+        """
+        cache_keys = {crypto['id']: self._backtest_cache_key(strategy_id, crypto['id'], parameters, start_date,
+                                                             end_date, interval, use_daily_sampling, low_memory)
+                      for crypto in cryptos}
+        cached = self.cache.get_many([key for key in cache_keys.values() if key]) if self.cache else {}
+        results = {crypto_id: self._cached_backtest_result(cached[cache_key], cache_key, result_format)
+                   for crypto_id, cache_key in cache_keys.items() if cache_key in cached}
+        redis_hits = len(results)
+        
+        store_key = self._result_store_key(start_date, end_date, interval, use_daily_sampling, low_memory)
+        missing = [crypto['id'] for crypto in cryptos if crypto['id'] not in results]
+        if missing:
+            results.update(self._get_stored_backtests(strategy_id, missing, parameters, store_key, cache_keys,
+                                                      result_format))
+        if results:
+            logger.info(f"🎯 Cache HIT: {redis_hits} from Redis, {len(results) - redis_hits} from the result "
+                        f"store, {len(cryptos) - len(results)} to compute")
+        self._record_cache_lookups(strategy_id, redis_hits=redis_hits, store_hits=len(results) - redis_hits,
+                                   misses=len(cryptos) - len(results))
+        return results, cache_keys
+
+    def get_cached_backtests(self, strategy_id: int, crypto_ids: List[int], parameters: Dict,
+                             start_date: str = None, end_date: str = None, interval: str = '1d',
+                             use_daily_sampling: bool = True, result_format: str = 'rows',
+                             low_memory: bool = False) -> Dict[int, Dict]:
+        """
+        Cached results of many coins for a bulk caller (one Redis MGET, one store query)
+        
+        Args:
+            parameters: Canonical parameters (see canonical_parameters)
+        
+        Returns:
+            crypto_id -> result for the coins with a cached or stored result;
+            compute the others with run_backtest(bulk=True) and pass them to
+            store_backtests
+        """
+        cached, _ = self._get_cached_backtests(strategy_id, [{'id': crypto_id} for crypto_id in crypto_ids],
+                                               parameters, start_date, end_date, interval, use_daily_sampling,
+                                               result_format, low_memory)
+        return cached
+
+    def store_backtests(self, strategy_id: int, results: Dict[int, Dict], parameters: Dict,
+                        start_date: str = None, end_date: str = None, interval: str = '1d',
+                        use_daily_sampling: bool = True, low_memory: bool = False) -> int:
+        """
+        Write the results a bulk caller computed with run_backtest(bulk=True) to
+        the result store in one query
+        
+        Results must be full resolution and lossless (rows or columnar). Results
+        that failed or came from the cache are skipped; coin metadata added by
+        _format_backtest_result is not stored.
+        
+        Returns:
+            Number of results stored
+        """
+        computed = {crypto_id: {key: value for key, value in result.items() if key not in RESULT_CRYPTO_FIELDS}
+                    for crypto_id, result in results.items()
+                    if result.get('success', False) and not result.get('from_cache', False)}
+        if not (self.store and computed):
+            return 0
+        return self.store.put_many(strategy_id, computed, parameters,
+                                   **self._result_store_key(start_date, end_date, interval, use_daily_sampling,
+                                                            low_memory))
+
+    def _get_stored_backtests(self, strategy_id: int, crypto_ids: List[int], parameters: Dict, store_key: Dict,
+                              cache_keys: Dict[int, Optional[str]], result_format: str = 'rows') -> Dict[int, Dict]:
+        """
+        Current results from the durable store, in the requested format
+        
+        Store hits are written back to Redis, so the next request is a Redis hit.
+        """
+        if not self.store:
+            return {}
+        stored = self.store.get_many(strategy_id, crypto_ids, parameters, **store_key)
+        results = {}
+        for crypto_id, result in stored.items():
+            cache_key = cache_keys.get(crypto_id)
+            if cache_key:
+                self.cache.set(cache_key, result, ttl=86400,  # 24 hour TTL
+                               tags=self._backtest_tags(strategy_id, crypto_id))
+            result = dict(convert_result(result, result_format))
+            result['from_cache'] = True
+            result['cache_tier'] = 'store'
+            results[crypto_id] = result
+        if stored:
+            logger.info(f"🗄️ Result store HIT: {len(stored)}/{len(crypto_ids)} backtest(s) for strategy {strategy_id}")
+        return results
+
+    def _add_price_history(self, result: Dict, df: pd.DataFrame) -> Dict:
+        """Replace a successful result's portfolio series with the daily price history used for charting"""
+        if not result.get('success', False) or df.empty:
+            return result
+        
+        # Map portfolio values by date for quick lookup (last value of the day wins)
+        portfolio_map = {}
+        portfolio_values = result.pop('portfolio_values', None)
+        if portfolio_values is not None:
+            portfolio_map = dict(zip(self._date_strings(portfolio_values.index), portfolio_values.tolist()))
+        
+        dates = self._date_strings(df.index)
+        prices = df['close_price'].to_numpy(dtype=np.float64).tolist()
+        result['price_history'] = [
+            {'date': date_str, 'price': price, 'portfolio_value': portfolio_map.get(date_str, None)}
+            for date_str, price in zip(dates, prices)
+        ]
+        return result
+
+    def _panel_stop_fill_options(self, params: Dict, panel: Dict) -> Dict:
+        """_stop_fill_options for a price panel ((bars x coins) lows/highs, NaN-padded)"""
+        frames = [panel['frames'][crypto_id] for crypto_id in panel['asset_ids']]
+        options = [self._stop_fill_options(params, df) for df in frames]
+        if not options or not all(options):
+            # Intra-bar mode needs every coin's low/high (and is off for stop_fill='close')
+            return {}
+        
+        lows = np.full(panel['prices'].shape, np.nan)
+        highs = np.full(panel['prices'].shape, np.nan)
+        for j, (df, coin) in enumerate(zip(frames, options)):
+            lows[:len(df), j] = coin['lows']
+            highs[:len(df), j] = coin['highs']
+        return {'lows': lows, 'highs': highs, 'fill': options[0]['fill']}
+
+    def run_panel_backtest(self, strategy: Dict, parameters: Dict,
+                           price_data: Dict[int, pd.DataFrame]) -> Dict[int, Dict]:
+        """
+        Backtest one strategy over many coins at once on a (bars x coins) price panel
+        
+        Every coin's closes are stacked into one NaN-padded matrix
+        (PanelBacktestEngine.build_panel); the strategy's signal builder computes
+        indicators and signals for all coins in one vectorized pass and
+        PanelBacktestEngine.execute_trades_panel steps all positions together.
+        Each coin's bars start at row 0 of its column, so windowed indicators see
+        exactly the series run_backtest sees and results are identical.
+        
+        Args:
+            strategy: Strategy row (id, name) from get_strategy()
+            parameters: Strategy parameters
+            price_data: crypto_id -> price frame (e.g. from get_price_data_batch)
+        
+        Returns:
+            crypto_id -> result as computed by run_backtest (with price_history,
+            before caching and format conversion)
+        
+        Raises:
+            ValueError: The strategy has no signal builder
+        
+        Performance:
+            - Daily data, 200+ coins: well under a second, no process pool
+        """
+        names = self.STRATEGY_SIGNALS.get(strategy['name'])
+        if names is None:
+            raise ValueError(f"Strategy '{strategy['name']}' not implemented")
+        build_signals, decorate_trade = (getattr(self, name) for name in names)
+        
+        start_time = datetime.now()
+        results = {crypto_id: self._empty_result("No price data available")
+                   for crypto_id, df in price_data.items() if df is None or df.empty}
+        panel = PanelBacktestEngine.build_panel(price_data)
+        asset_ids = panel['asset_ids']
+        if not asset_ids:
+            return results
+        
+        try:
+            signals = build_signals(panel['prices'], [panel['frames'][crypto_id].index for crypto_id in asset_ids],
+                                    parameters)
+            exits = signals['exits'] if signals['exits'] is not None else np.zeros(panel['prices'].shape, dtype=bool)
+            runs = PanelBacktestEngine.execute_trades_panel(
+                panel['prices'], signals['entries'], exits, signals['tradable'], panel['lengths'],
+                float(parameters['initial_investment']),
+                fee_rate=float(parameters['transaction_fee']) / 100,
+                timestamps=panel['timestamps'],
+                cooldown=self._cooldown_timedelta(parameters),
+                **self._panel_stop_fill_options(parameters, panel),
+                **signals['options']
+            )
+        except Exception as e:
+            logger.error(f"Error running panel backtest: {e}")
+            results.update({crypto_id: self._empty_result(f"Calculation error: {str(e)}") for crypto_id in asset_ids})
+            return results
+        
+        computed = []
+        for j, crypto_id in enumerate(asset_ids):
+            df = panel['frames'][crypto_id]
+            if len(df) < signals['required_bars']:
+                results[crypto_id] = self._empty_result(signals['insufficient'])
+            else:
+                coin_signals = {key: value[:len(df), j] if isinstance(value, np.ndarray) and value.ndim == 2 else value
+                                for key, value in signals.items()}
+                try:
+                    result = self._signals_result(df, parameters, runs[j], coin_signals, decorate_trade)
+                except Exception as e:
+                    logger.error(f"Error running panel backtest for crypto {crypto_id}: {e}")
+                    results[crypto_id] = self._empty_result(f"Calculation error: {str(e)}")
+                    continue
+                results[crypto_id] = self._add_price_history(result, df)
+            computed.append(results[crypto_id])
+        
+        # The panel is one computation; each coin reports its share of the time
+        calculation_time = (datetime.now() - start_time).total_seconds() * 1000
+        for result in computed:
+            result['calculation_time_ms'] = int(calculation_time / len(asset_ids))
+            result['from_cache'] = False
+        
+        logger.info(f"📊 Panel backtest: {len(asset_ids)} coins x {panel['prices'].shape[0]} bars "
+                    f"in {calculation_time:.0f}ms")
+        return results
+
+    def _expand_parameter_values(self, name: str, spec) -> List:
+        """
+        Expand one parameter's sweep values
+        
+        Accepts a list of values, a single value, or a range
+        {"min": 10, "max": 20, "step": 2} (max inclusive).
+        """
+        if isinstance(spec, dict):
+            if 'step' not in spec or float(spec['step']) <= 0:
+                raise ValueError(f"Parameter range for '{name}' needs a positive 'step'")
+            start, stop, step = float(spec['min']), float(spec['max']), float(spec['step'])
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            values = [round(start + k * step, 10) for k in range(max(count, 0))]
+            if all(float(v).is_integer() for v in (spec['min'], spec['step'])):
+                values = [int(v) for v in values]
+            return values
+        if isinstance(spec, (list, tuple)):
+            return list(spec)
+        return [spec]
+
+    def run_parameter_sweep(self, strategy_id: int, parameter_grid: Dict, base_parameters: Dict = None,
+                            crypto_ids: List[int] = None, start_date: str = None, end_date: str = None,
+                            interval: str = '1d', use_daily_sampling: bool = True,
+                            rank_by: str = 'average_return', top_n: int = 50,
+                            grid_axes: List[str] = None, max_combinations: int = 20000) -> Dict:
+        """
+        Grid-search strategy parameters over one or more cryptocurrencies
+        
+        Prices are loaded once for all coins (single batch query) and every
+        distinct indicator configuration is computed once per coin; all
+        threshold/fee/stop-loss combinations reuse the cached indicator arrays.
+        
+        Args:
+            strategy_id: Strategy to tune
+            parameter_grid: Parameter name -> list of values or {"min", "max", "step"}
+            base_parameters: Fixed parameters (initial_investment, transaction_fee, ...)
+            crypto_ids: Coins to evaluate (default: all coins with data)
+            start_date: Optional start date (YYYY-MM-DD)
+            end_date: Optional end date (YYYY-MM-DD)
+            interval: Data interval ('1d' or '1h')
+            use_daily_sampling: Use daily aggregation
+            rank_by: Ranking metric (average_return, median_return, average_vs_hold,
+                     average_max_drawdown, win_rate, positive_coins)
+            top_n: Number of ranked combinations to return
+            grid_axes: Two parameter names for the sensitivity grid
+                       (default: the first two swept parameters)
+            max_combinations: Safety limit on the number of combinations
+        
+        Returns:
+            Ranked table of parameter combinations plus a 2-D sensitivity grid
+            of the ranking metric (averaged over the remaining parameters)
+        
+        Coins where a combination makes no trades count as a 0% return.
+        
+        Raises:
+            ValueError: Invalid grid, unknown strategy or too many combinations
+        """
+        start_time = datetime.now()
+        rank_metrics = ('average_return', 'median_return', 'average_vs_hold',
+                        'average_max_drawdown', 'win_rate', 'positive_coins')
+        if rank_by not in rank_metrics:
+            raise ValueError(f"rank_by must be one of: {', '.join(rank_metrics)}")
+        if not parameter_grid:
+            raise ValueError("parameter_grid must contain at least one parameter")
+        
+        names = list(parameter_grid.keys())
+        value_lists = [self._expand_parameter_values(name, parameter_grid[name]) for name in names]
+        if any(len(values) == 0 for values in value_lists):
+            raise ValueError("Every swept parameter needs at least one value")
+        total_combinations = int(np.prod([len(values) for values in value_lists]))
+        if total_combinations > max_combinations:
+            raise ValueError(f"{total_combinations} combinations exceeds the limit of {max_combinations}")
+        
+        strategy = self.get_strategy(strategy_id)
+        if not strategy:
+            raise ValueError(f"Strategy {strategy_id} not found")
+        backtest_func = self._get_strategy_function(strategy['name'])
+        if backtest_func is None:
+            raise ValueError(f"Strategy '{strategy['name']}' not implemented")
+        
+        if crypto_ids is None:
+            crypto_ids = [crypto['id'] for crypto in self.get_cryptocurrencies_with_data()]
+        price_data = self.get_price_data_batch(crypto_ids, start_date=start_date, end_date=end_date,
+                                               interval=interval, use_daily_sampling=use_daily_sampling)
+        fetch_time = (datetime.now() - start_time).total_seconds()
+        if not price_data:
+            raise ValueError("No price data available for the requested cryptocurrencies")
+        
+        coin_ids = list(price_data.keys())
+        combinations = list(itertools.product(*value_lists))
+        returns = np.zeros((len(combinations), len(coin_ids)))
+        vs_hold = np.zeros_like(returns)
+        drawdowns = np.zeros_like(returns)
+        trade_counts = np.zeros_like(returns)
+        wins = np.zeros_like(returns)
+        closed = np.zeros_like(returns)
+        
+        # One indicator cache per coin, shared by every combination
+        compute_start = datetime.now()
+        base_parameters = base_parameters or {}
+        for col, crypto_id in enumerate(coin_ids):
+            df = price_data[crypto_id]
+            indicator_cache = {}
+            for row, values in enumerate(combinations):
+                params = {**base_parameters, **dict(zip(names, values))}
+                try:
+                    result = backtest_func(df, params, indicator_cache=indicator_cache)
+                except Exception as e:
+                    raise ValueError(f"Invalid parameters {dict(zip(names, values))}: {e}")
+                returns[row, col] = result['total_return']
+                vs_hold[row, col] = result['strategy_vs_hold']
+                drawdowns[row, col] = result['max_drawdown']
+                trade_counts[row, col] = result['total_trades']
+                wins[row, col] = result['profitable_trades']
+                closed[row, col] = result['profitable_trades'] + result['losing_trades']
+        compute_time = (datetime.now() - compute_start).total_seconds()
+        
+        # Aggregate each combination across coins
+        total_closed = closed.sum(axis=1)
+        metrics = {
+            'average_return': returns.mean(axis=1),
+            'median_return': np.median(returns, axis=1),
+            'average_vs_hold': vs_hold.mean(axis=1),
+            'average_max_drawdown': drawdowns.mean(axis=1),
+            'win_rate': np.divide(wins.sum(axis=1) * 100, total_closed,
+                                  out=np.zeros(len(combinations)), where=total_closed > 0),
+            'positive_coins': (returns > 0).sum(axis=1).astype(float),
+        }
+        # Lower drawdown is better; everything else ranks descending
+        order_key = -metrics[rank_by] if rank_by != 'average_max_drawdown' else metrics[rank_by]
+        order = np.argsort(order_key, kind='stable')[:top_n]
+        
+        ranking = []
+        for rank, row in enumerate(order, start=1):
+            ranking.append({
+                'rank': rank,
+                'parameters': dict(zip(names, combinations[row])),
+                'average_return': round(float(metrics['average_return'][row]), 2),
+                'median_return': round(float(metrics['median_return'][row]), 2),
+                'average_vs_hold': round(float(metrics['average_vs_hold'][row]), 2),
+                'average_max_drawdown': round(float(metrics['average_max_drawdown'][row]), 2),
+                'win_rate': round(float(metrics['win_rate'][row]), 2),
+                'positive_coins': int(metrics['positive_coins'][row]),
+                'average_trades': round(float(trade_counts[row].mean()), 2),
+            })
+        
+        # 2-D sensitivity grid: mean ranking metric per (x, y), averaged over the other parameters
+        sensitivity_grid = None
+        axes = grid_axes or names[:2]
+        if len(axes) == 2 and all(axis in names for axis in axes) and axes[0] != axes[1]:
+            x_pos, y_pos = names.index(axes[0]), names.index(axes[1])
+            shape = [len(values) for values in value_lists]
+            cube = metrics[rank_by].reshape(shape)
+            other_axes = tuple(k for k in range(len(names)) if k not in (x_pos, y_pos))
+            grid = cube.mean(axis=other_axes) if other_axes else cube
+            if x_pos > y_pos:
+                grid = grid.T  # rows follow x, columns follow y
+            sensitivity_grid = {
+                'metric': rank_by,
+                'x_parameter': axes[0],
+                'y_parameter': axes[1],
+                'x_values': value_lists[x_pos],
+                'y_values': value_lists[y_pos],
+                'values': np.round(grid, 2).tolist()
+            }
+        
+        evaluations = len(combinations) * len(coin_ids)
+        return {
+            'success': True,
+            'strategy': strategy['name'],
+            'parameters_swept': names,
+            'total_combinations': len(combinations),
+            'cryptocurrencies': len(coin_ids),
+            'evaluations': evaluations,
+            'rank_by': rank_by,
+            'ranking': ranking,
+            'sensitivity_grid': sensitivity_grid,
+            'fetch_time_ms': int(fetch_time * 1000),
+            'compute_time_ms': int(compute_time * 1000),
+            'evaluations_per_second': round(evaluations / compute_time, 1) if compute_time > 0 else None
+        }
 
     def generate_parameter_hash(self, parameters: Dict) -> str:
-        """Generate hash for parameters to enable caching"""
-        param_string = json.dumps(parameters, sort_keys=True)
-        return hashlib.md5(param_string.encode()).hexdigest()
+        """Generate hash for parameters to enable caching (the result store's key)"""
+        return parameter_hash(parameters)
 
     def run_strategy_against_all_cryptos(self, strategy_id: int, parameters: Dict, use_parallel: bool = True,
                                          start_date: str = None, end_date: str = None, interval: str = '1d',
-                                         use_daily_sampling: bool = True, force_refresh: bool = False) -> List[Dict]:
+                                         use_daily_sampling: bool = True, force_refresh: bool = False,
+                                         use_shared_memory: bool = True, worker_pool=None,
+                                         result_format: str = 'rows', use_panel: bool = False,
+                                         low_memory: bool = False) -> List[Dict]:
         """
         Run strategy against all available cryptocurrencies with optional date range
         
@@ -1335,27 +2134,80 @@ class CryptoBacktestService:
             interval: Data interval ('1d' for daily, '1h' for hourly)
             use_daily_sampling: If True, aggregate hourly data to daily for performance
             force_refresh: Skip cache and recompute all results
+            use_shared_memory: With use_parallel, load all prices in one query into a
+                               shared-memory panel that workers read zero-copy
+            worker_pool: Optional persistent BacktestWorkerPool; with use_parallel the
+                         backtests run on its warm workers instead of a new Pool
+            result_format: Format of each result (see run_backtest)
+            use_panel: Backtest all coins in one vectorized pass over a price panel
+                       (see run_panel_backtest) instead of one backtest per coin;
+                       takes precedence over use_parallel
+            low_memory: Bounded-memory mode (see run_backtest); every worker streams
+                        its own coin's prices, so the panel and shared-memory
+                        paths (which load all coins at once) are not used
         
         Performance:
+            - Panel: sub-second for 211 cryptocurrencies on daily data (no cache)
             - Sequential: ~1.5 minutes for 211 cryptocurrencies (no cache)
             - Parallel: ~10-20 seconds for 211 cryptocurrencies (no cache)
-            - Cached: ~0.5-1 second for 211 cryptocurrencies (50-100x faster!)
+            - Cached: one Redis MGET for all cryptocurrencies; only uncached coins are
+              dispatched, and a fully cached run-all starts no processes
+        
+        Raises:
+            ValueError: Invalid parameters (see canonical_parameters)
         """
+        parameters = self.canonical_parameters(strategy_id, parameters)
         cryptos = self.get_cryptocurrencies_with_data()
         
         cache_hits = 0
         cache_misses = 0
         
-        logger.info(f"Running strategy against {len(cryptos)} cryptocurrencies (parallel={use_parallel}, interval={interval}, cache={'disabled' if force_refresh else 'enabled'})")
-        
-        if use_parallel and len(cryptos) > 1:
-            # Use parallel processing for significant speedup
-            results = self._run_parallel_backtests(strategy_id, parameters, cryptos, start_date, end_date, 
-                                                   interval, use_daily_sampling)
+        if low_memory:
+            use_panel = use_shared_memory = False
+        
+        logger.info(f"Running strategy against {len(cryptos)} cryptocurrencies (parallel={use_parallel}, panel={use_panel}, low_memory={low_memory}, interval={interval}, cache={'disabled' if force_refresh else 'enabled'})")
+        
+        # Look up every coin's result at once; only the misses are dispatched below
+        # (a fully cached run-all never loads prices or starts processes)
+        cached = {}
+        if not force_refresh:
+            cached, _ = self._get_cached_backtests(strategy_id, cryptos, parameters, start_date, end_date,
+                                                   interval, use_daily_sampling, result_format, low_memory)
+        all_cryptos = cryptos
+        cryptos = [crypto for crypto in cryptos if crypto['id'] not in cached]
+        
+        # Per-coin paths compute a storable format; their results are stored in one query below
+        compute_format = lossless_format(result_format)
+        if not cryptos:
+            results = []
+        elif use_panel:
+            # One vectorized pass over all coins (no processes)
+            results = self._run_panel_backtests(strategy_id, parameters, cryptos, start_date, end_date,
+                                                interval, use_daily_sampling, force_refresh,
+                                                result_format=result_format)
         else:
-            # Fallback to sequential processing
-            results = self._run_sequential_backtests(strategy_id, parameters, cryptos, start_date, end_date,
-                                                     interval, use_daily_sampling)
+            if use_parallel and worker_pool is not None:
+                # Warm persistent workers (no process spawn per request)
+                results = self._run_pooled_backtests(worker_pool, strategy_id, parameters, cryptos, start_date,
+                                                     end_date, interval, use_daily_sampling, force_refresh,
+                                                     use_shared_memory=use_shared_memory,
+                                                     result_format=compute_format, low_memory=low_memory)
+            elif use_parallel and len(cryptos) > 1:
+                # Use parallel processing for significant speedup
+                results = self._run_parallel_backtests(strategy_id, parameters, cryptos, start_date, end_date,
+                                                       interval, use_daily_sampling, force_refresh,
+                                                       use_shared_memory=use_shared_memory,
+                                                       result_format=compute_format, low_memory=low_memory)
+            else:
+                # Fallback to sequential processing
+                results = self._run_sequential_backtests(strategy_id, parameters, cryptos, start_date, end_date,
+                                                         interval, use_daily_sampling, force_refresh,
+                                                         result_format=compute_format, low_memory=low_memory)
+            self.store_backtests(strategy_id, {result['crypto_id']: result for result in results}, parameters,
+                                 start_date, end_date, interval, use_daily_sampling, low_memory)
+            results = [convert_result(result, result_format) for result in results]
+        results += [self._format_backtest_result(crypto, cached[crypto['id']])
+                    for crypto in all_cryptos if crypto['id'] in cached]
         
         # Sort by total return descending
         results.sort(key=lambda x: x.get('total_return', -999999), reverse=True)
@@ -1372,31 +2224,79 @@ class CryptoBacktestService:
         
         return results
 
+    def _run_panel_backtests(self, strategy_id: int, parameters: Dict, cryptos: List[Dict],
+                             start_date: str = None, end_date: str = None, interval: str = '1d',
+                             use_daily_sampling: bool = True, force_refresh: bool = False,
+                             result_format: str = 'rows') -> List[Dict]:
+        """
+        Run-all on a price panel: the coins (the cache misses of the bulk lookup
+        in run_strategy_against_all_cryptos) are loaded with one batch query,
+        backtested in one pass and written to the cache and the result store
+        """
+        strategy = self.get_strategy(strategy_id)
+        if not strategy:
+            return [self._format_backtest_result(crypto, self._empty_result("Strategy not found"))
+                    for crypto in cryptos]
+        if strategy['name'] not in self.STRATEGY_SIGNALS:
+            return [self._format_backtest_result(crypto, self._empty_result(
+                f"Strategy '{strategy['name']}' not implemented")) for crypto in cryptos]
+        
+        crypto_ids = [crypto['id'] for crypto in cryptos]
+        price_data = self.get_price_data_batch(crypto_ids, start_date=start_date, end_date=end_date,
+                                               interval=interval, use_daily_sampling=use_daily_sampling)
+        computed = self.run_panel_backtest(strategy, parameters,
+                                           {crypto_id: price_data.get(crypto_id) for crypto_id in crypto_ids})
+        results = {}
+        for crypto_id, result in computed.items():
+            cache_key = self._backtest_cache_key(strategy_id, crypto_id, parameters, start_date, end_date,
+                                                 interval, use_daily_sampling)
+            if cache_key and result.get('success', False):
+                self.cache.set(cache_key, convert_result(result, 'columnar'), ttl=86400,  # 24 hour TTL
+                               tags=self._backtest_tags(strategy_id, crypto_id))
+            results[crypto_id] = convert_result(result, result_format)
+        if self.store:
+            self.store.put_many(strategy_id, computed, parameters,
+                                **self._result_store_key(start_date, end_date, interval, use_daily_sampling))
+        
+        return [self._format_backtest_result(crypto, results[crypto['id']]) for crypto in cryptos]
+
     def _run_sequential_backtests(self, strategy_id: int, parameters: Dict, cryptos: List[Dict],
                                    start_date: str = None, end_date: str = None, interval: str = '1d',
-                                   use_daily_sampling: bool = True, force_refresh: bool = False) -> List[Dict]:
-        """Run backtests sequentially (original method) with optional date range and caching"""
+                                   use_daily_sampling: bool = True, force_refresh: bool = False,
+                                   result_format: str = 'rows', low_memory: bool = False) -> List[Dict]:
+        """Run backtests sequentially (original method) with optional date range (bulk: see run_backtest)"""
         results = []
         
         for i, crypto in enumerate(cryptos):
             logger.info(f"Processing {crypto['symbol']} ({i+1}/{len(cryptos)})")
             
             result = self.run_backtest(strategy_id, crypto['id'], parameters, start_date, end_date,
-                                      interval, use_daily_sampling, force_refresh)
+                                      interval, use_daily_sampling, force_refresh,
+                                      result_format=result_format, low_memory=low_memory, bulk=True)
             results.append(self._format_backtest_result(crypto, result))
         
         return results
 
     def _run_parallel_backtests(self, strategy_id: int, parameters: Dict, cryptos: List[Dict],
                                 start_date: str = None, end_date: str = None, interval: str = '1d',
-                                use_daily_sampling: bool = True, force_refresh: bool = False) -> List[Dict]:
+                                use_daily_sampling: bool = True, force_refresh: bool = False,
+                                use_shared_memory: bool = True, result_format: str = 'rows',
+                                low_memory: bool = False) -> List[Dict]:
         """
         Run backtests in parallel using multiprocessing with optional date range and caching
         
         Uses all available CPU cores to process multiple cryptocurrencies simultaneously.
         This provides 4-8x speedup for batch operations.
         Caching provides additional 50-100x speedup for repeated queries.
+        
+        With use_shared_memory, prices are loaded once into a SharedPricePanel and
+        the workers never query them; otherwise each worker fetches its own prices.
         """
+        if use_shared_memory:
+            return self._run_parallel_backtests_shared(strategy_id, parameters, cryptos, start_date, end_date,
+                                                       interval, use_daily_sampling, force_refresh,
+                                                       result_format=result_format)
+        
         # Determine optimal number of processes
         num_processes = min(cpu_count(), len(cryptos), 8)  # Cap at 8 to avoid overwhelming DB
         
@@ -1412,7 +2312,9 @@ class CryptoBacktestService:
             end_date=end_date,
             interval=interval,
             use_daily_sampling=use_daily_sampling,
-            force_refresh=force_refresh
+            force_refresh=force_refresh,
+            result_format=result_format,
+            low_memory=low_memory
         )
         
         # Run backtests in parallel
@@ -1424,7 +2326,8 @@ class CryptoBacktestService:
     @staticmethod
     def _run_single_backtest_worker(crypto: Dict, strategy_id: int, parameters: Dict, db_config: Dict,
                                     start_date: str = None, end_date: str = None, interval: str = '1d',
-                                    use_daily_sampling: bool = True, force_refresh: bool = False) -> Dict:
+                                    use_daily_sampling: bool = True, force_refresh: bool = False,
+                                    result_format: str = 'rows', low_memory: bool = False) -> Dict:
         """
         Worker function for parallel backtest execution with optional date range and caching
         
@@ -1437,11 +2340,176 @@ class CryptoBacktestService:
         
         try:
             result = service.run_backtest(strategy_id, crypto['id'], parameters, start_date, end_date,
-                                         interval, use_daily_sampling, force_refresh)
+                                         interval, use_daily_sampling, force_refresh,
+                                         result_format=result_format, low_memory=low_memory, bulk=True)
             return service._format_backtest_result(crypto, result)
         except Exception as e:
             logger.error(f"Error processing {crypto['symbol']}: {e}")
             return service._format_backtest_result(crypto, service._empty_result(str(e)))
+        finally:
+            # Per-request pools are terminated without exit handlers: one counter write per task
+            service.flush_cache_lookups()
+
+    def _run_parallel_backtests_shared(self, strategy_id: int, parameters: Dict, cryptos: List[Dict],
+                                       start_date: str = None, end_date: str = None, interval: str = '1d',
+                                       use_daily_sampling: bool = True, force_refresh: bool = False,
+                                       result_format: str = 'rows') -> List[Dict]:
+        """
+        Run backtests in parallel against a shared-memory price panel
+        
+        The parent resolves the strategy and loads every coin's prices with one
+        batch query, packs them into a SharedPricePanel and hands workers only
+        the panel descriptor. Workers attach once (in the pool initializer) and
+        build a single service each, so no price query or DataFrame pickling
+        happens per coin. Without database load per worker, parallelism is
+        capped by BACKTEST_MAX_PROCESSES (default: all cores) instead of 8.
+        """
+        strategy = self.get_strategy(strategy_id)
+        if not strategy:
+            return [self._format_backtest_result(crypto, self._empty_result("Strategy not found"))
+                    for crypto in cryptos]
+        
+        price_data = self.get_price_data_batch([crypto['id'] for crypto in cryptos], start_date=start_date,
+                                               end_date=end_date, interval=interval,
+                                               use_daily_sampling=use_daily_sampling)
+        panel = SharedPricePanel.create(price_data)
+        del price_data
+        
+        max_processes = int(os.getenv('BACKTEST_MAX_PROCESSES', cpu_count()))
+        num_processes = max(1, min(cpu_count(), len(cryptos), max_processes))
+        logger.info(f"Using {num_processes} parallel processes (shared-memory price panel)")
+        
+        backtest_func = partial(
+            self._run_worker_backtest,
+            strategy_id=strategy_id,
+            parameters=parameters,
+            strategy=strategy,
+            start_date=start_date,
+            end_date=end_date,
+            interval=interval,
+            use_daily_sampling=use_daily_sampling,
+            force_refresh=force_refresh,
+            panel_descriptor=panel.descriptor,
+            result_format=result_format,
+            bulk=True
+        )
+        
+        try:
+            with Pool(processes=num_processes, initializer=CryptoBacktestService._init_panel_worker,
+                      initargs=(panel.descriptor, self.db_config, self.cache is not None)) as pool:
+                results = pool.map(backtest_func, cryptos)
+        finally:
+            panel.close()
+        
+        return results
+
+    def _run_pooled_backtests(self, worker_pool, strategy_id: int, parameters: Dict, cryptos: List[Dict],
+                              start_date: str = None, end_date: str = None, interval: str = '1d',
+                              use_daily_sampling: bool = True, force_refresh: bool = False,
+                              use_shared_memory: bool = True, result_format: str = 'rows',
+                              low_memory: bool = False) -> List[Dict]:
+        """
+        Run backtests on a persistent BacktestWorkerPool
+        
+        Same task split as _run_parallel_backtests_shared (strategy resolved and,
+        with use_shared_memory, prices loaded once in this process), but the
+        tasks go to long-lived workers that already hold a service. Results
+        keep the order of `cryptos`.
+        """
+        strategy = self.get_strategy(strategy_id)
+        if not strategy:
+            return [self._format_backtest_result(crypto, self._empty_result("Strategy not found"))
+                    for crypto in cryptos]
+        
+        panel = None
+        if use_shared_memory:
+            price_data = self.get_price_data_batch([crypto['id'] for crypto in cryptos], start_date=start_date,
+                                                   end_date=end_date, interval=interval,
+                                                   use_daily_sampling=use_daily_sampling)
+            panel = SharedPricePanel.create(price_data)
+            del price_data
+        
+        try:
+            results_by_id = {}
+            for crypto, result in worker_pool.imap_unordered(
+                self._run_worker_backtest, cryptos,
+                strategy_id=strategy_id,
+                parameters=parameters,
+                strategy=strategy,
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                use_daily_sampling=use_daily_sampling,
+                force_refresh=force_refresh,
+                panel_descriptor=panel.descriptor if panel else None,
+                result_format=result_format,
+                low_memory=low_memory,
+                bulk=True,
+                on_worker_crash=self._worker_crash_result
+            ):
+                results_by_id[crypto['id']] = result
+        finally:
+            if panel:
+                panel.close()
+        
+        return [results_by_id[crypto['id']] for crypto in cryptos]
+
+    @staticmethod
+    def _init_pool_worker(db_config: Dict, enable_cache: bool = True):
+        """Pool initializer: build the service this worker process reuses for every task"""
+        _worker_state['service'] = CryptoBacktestService(db_config=db_config, enable_cache=enable_cache)
+        _worker_state['panels'] = {}
+
+    @staticmethod
+    def _init_panel_worker(descriptor: Dict, db_config: Dict, enable_cache: bool = True):
+        """Pool initializer: build the worker's service and attach the shared price panel"""
+        CryptoBacktestService._init_pool_worker(db_config, enable_cache)
+        CryptoBacktestService._attach_worker_panel(descriptor)
+
+    @staticmethod
+    def _attach_worker_panel(descriptor: Dict) -> SharedPricePanel:
+        """Attach to a shared price panel once per worker process (most recent panels stay attached)"""
+        panels = _worker_state['panels']
+        panel = panels.get(descriptor['name'])
+        if panel is None:
+            # Persistent workers see a new panel per request; let go of older ones
+            while len(panels) >= 4:
+                panels.pop(next(iter(panels))).close()
+            panel = panels[descriptor['name']] = SharedPricePanel.attach(descriptor)
+        return panel
+
+    @staticmethod
+    def _run_worker_backtest(crypto: Dict, strategy_id: int, parameters: Dict, strategy: Dict = None,
+                             start_date: str = None, end_date: str = None, interval: str = '1d',
+                             use_daily_sampling: bool = True, force_refresh: bool = False,
+                             panel_descriptor: Dict = None, result_format: str = 'rows',
+                             low_memory: bool = False, bulk: bool = False) -> Dict:
+        """
+        Worker function for pool backtests (per-request Pool or BacktestWorkerPool)
+        
+        Uses the worker's long-lived service; prices come from the shared panel
+        when panel_descriptor is given, otherwise the worker queries them. With
+        bulk the caller has looked the coin up and stores the result (see
+        run_backtest).
+        """
+        service = _worker_state['service']
+        
+        try:
+            price_data = None
+            if panel_descriptor is not None:
+                price_data = CryptoBacktestService._attach_worker_panel(panel_descriptor).frame(crypto['id'])
+            result = service.run_backtest(strategy_id, crypto['id'], parameters, start_date, end_date,
+                                          interval, use_daily_sampling, force_refresh,
+                                          price_data=price_data, strategy=strategy,
+                                          result_format=result_format, low_memory=low_memory, bulk=bulk)
+            return service._format_backtest_result(crypto, result)
+        except Exception as e:
+            logger.error(f"Error processing {crypto['symbol']}: {e}")
+            return service._format_backtest_result(crypto, service._empty_result(str(e)))
+
+    def _worker_crash_result(self, crypto: Dict, error: Exception) -> Dict:
+        """Failed result of a coin whose pool worker process died (see BacktestWorkerPool.imap_unordered)"""
+        return self._format_backtest_result(crypto, self._empty_result(f"Worker process died: {error}"))
 
     def _format_backtest_result(self, crypto: Dict, result: Dict) -> Dict:
         """Format backtest result with crypto metadata"""
@@ -27,6 +27,8 @@ from typing import List, Dict, Optional, Tuple
 import psycopg
 from psycopg.rows import dict_row
 import os
+from price_data_cache import invalidate_price_data
+from cache_service import invalidate_crypto_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -409,7 +411,12 @@ class CryptoDataService:
                     
                     conn.commit()
                     logger.info(f"Stored {records_stored} price records for crypto ID {crypto_id}")
-                    return records_stored
+            
+            # Cached price frames and backtest results of this coin no longer cover its newest bars
+            if records_stored:
+                invalidate_price_data(crypto_id)
+                invalidate_crypto_cache(crypto_id)
+            return records_stored
                     
         except Exception as e:
             logger.error(f"Error storing crypto data: {e}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Price Data Cache
+Price frames loaded by the backtest service (get_price_data and
+get_price_data_batch) kept in Redis as compact binary arrays, keyed by
+(crypto_id, interval, range), so a strategy or parameter set that is not
+cached yet still skips the database (and the ARRAY_AGG daily aggregation) when
+another backtest already loaded the same coin and range.
+
+Entries are invalidated per coin: every key carries the coin's data version,
+and CryptoDataService.store_crypto_data replaces the version when it writes
+bars (invalidate_price_data). Old entries are never read again and expire
+with their TTL, so invalidation is one SET instead of a key scan.
+
+Entry layout: NumPy .npz with the int64 index (UTC nanoseconds), one float64
+array per column, the column names and the index time zone.
+"""
+
+import io
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """Binary .npz encoding of a datetime-indexed numeric price frame"""
+    buffer = io.BytesIO()
+    columns = {f'column_{k}': df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+               for k, name in enumerate(df.columns)}
+    np.savez(buffer, index=df.index.asi8, columns=np.array(list(df.columns), dtype=str),
+             tz=np.array(str(df.index.tz) if df.index.tz is not None else ''), **columns)
+    return buffer.getvalue()
+
+
+def decode_frame(payload: bytes) -> pd.DataFrame:
+    """Price frame from encode_frame"""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as arrays:
+        index = pd.DatetimeIndex(arrays['index'].view('datetime64[ns]'), name='datetime')
+        tz = str(arrays['tz'])
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        names = arrays['columns'].tolist()
+        return pd.DataFrame({name: arrays[f'column_{k}'] for k, name in enumerate(names)},
+                            index=index, columns=names)
+
+
+class PriceDataCache:
+    """Redis cache of price frames, invalidated per coin when new bars are stored"""
+
+    def __init__(self, host=None, port=None, db=0, ttl=None, max_entry_bytes=None):
+        """
+        Initialize the price cache connection
+
+        Args:
+            host: Redis host (default: from REDIS_HOST env or 'redis')
+            port: Redis port (default: from REDIS_PORT env or 6379)
+            db: Redis database number (default: 0)
+            ttl: Entry time-to-live in seconds (default: PRICE_CACHE_TTL env or 12 hours)
+            max_entry_bytes: Frames larger than this are not cached
+                             (default: PRICE_CACHE_MAX_MB env or 8 MB)
+        """
+        self.host = host or os.getenv('REDIS_HOST', 'redis')
+        self.port = int(port or os.getenv('REDIS_PORT', 6379))
+        self.ttl = ttl or int(os.getenv('PRICE_CACHE_TTL', 43200))
+        self.max_entry_bytes = max_entry_bytes or int(float(os.getenv('PRICE_CACHE_MAX_MB', 8)) * 2**20)
+        self.enabled = True
+
+        try:
+            # Binary values: this client must not decode responses
+            self.redis_client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                db=db,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True
+            )
+            self.redis_client.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Price data cache unavailable: {e}")
+            self.enabled = False
+            self.redis_client = None
+
+    @staticmethod
+    def _version_key(crypto_id: int) -> str:
+        return f'prices:version:{crypto_id}'
+
+    @staticmethod
+    def _entry_key(crypto_id: int, version: str, interval: str, start_date: str = None,
+                   end_date: str = None) -> str:
+        return f'prices:{crypto_id}:{version}:{interval}:{start_date or ""}:{end_date or ""}'
+
+    def get_many(self, crypto_ids: List[int], interval: str = '1d', start_date: str = None,
+                 end_date: str = None) -> Tuple[Dict[int, pd.DataFrame], Dict[int, str]]:
+        """
+        Cached frames of several coins in two round trips
+
+        Returns:
+            (crypto_id -> frame for the hits, crypto_id -> data version); pass
+            the versions to put_many for the misses, so bars stored while they
+            were being queried do not end up in the cache under the new version
+        """
+        if not self.enabled or not crypto_ids:
+            return {}, {}
+
+        try:
+            versions = {}
+            for crypto_id, version in zip(crypto_ids, self.redis_client.mget(
+                    [self._version_key(crypto_id) for crypto_id in crypto_ids])):
+                if version is None:
+                    # No version yet (or evicted): start a new one, never reusing an old value
+                    version = str(time.time_ns()).encode()
+                    if not self.redis_client.set(self._version_key(crypto_id), version, nx=True):
+                        version = self.redis_client.get(self._version_key(crypto_id)) or version
+                versions[crypto_id] = version.decode()
+
+            keys = [self._entry_key(crypto_id, versions[crypto_id], interval, start_date, end_date)
+                    for crypto_id in crypto_ids]
+            frames = {crypto_id: decode_frame(payload)
+                      for crypto_id, payload in zip(crypto_ids, self.redis_client.mget(keys))
+                      if payload is not None}
+            if frames:
+                logger.info(f"📦 Price cache HIT: {len(frames)}/{len(crypto_ids)} coin(s) ({interval})")
+            return frames, versions
+        except Exception as e:
+            logger.warning(f"Price cache get error: {e}")
+            return {}, {}
+
+    def put_many(self, frames: Dict[int, pd.DataFrame], versions: Dict[int, str], interval: str = '1d',
+                 start_date: str = None, end_date: str = None) -> int:
+        """
+        Cache freshly queried frames under the versions returned by get_many
+
+        Returns:
+            Number of frames cached (empty and oversized frames are skipped)
+        """
+        if not self.enabled:
+            return 0
+
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            stored = 0
+            for crypto_id, df in frames.items():
+                if crypto_id not in versions or df is None or df.empty:
+                    continue
+                payload = encode_frame(df)
+                if len(payload) > self.max_entry_bytes:
+                    continue
+                key = self._entry_key(crypto_id, versions[crypto_id], interval, start_date, end_date)
+                pipeline.setex(key, self.ttl, payload)
+                stored += 1
+            if stored:
+                pipeline.execute()
+            return stored
+        except Exception as e:
+            logger.warning(f"Price cache set error: {e}")
+            return 0
+
+    def invalidate(self, crypto_id: int) -> bool:
+        """Replace the coin's data version, so none of its cached frames are served again"""
+        if not self.enabled:
+            return False
+
+        try:
+            self.redis_client.set(self._version_key(crypto_id), str(time.time_ns()))
+            return True
+        except Exception as e:
+            logger.warning(f"Price cache invalidate error: {e}")
+            return False
+
+
+# Global price cache instance (singleton)
+_price_cache_instance = None
+
+
+def get_price_cache() -> PriceDataCache:
+    """Get global price cache instance (singleton pattern)"""
+    global _price_cache_instance
+    if _price_cache_instance is None:
+        _price_cache_instance = PriceDataCache()
+    return _price_cache_instance
+
+
+def invalidate_price_data(crypto_id: int) -> bool:
+    """Drop a coin's cached price frames (called when new bars are stored)"""
+    return get_price_cache().invalidate(crypto_id)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Price Panel
+Packs OHLCV data for many cryptocurrencies into one contiguous shared-memory
+block so multiprocessing workers can read it zero-copy instead of querying
+the database (and unpickling DataFrames) themselves.
+
+Layout of the block (all coins concatenated row-wise):
+    [ timestamps: int64[total_rows] | values: float64[total_rows, len(COLUMNS)] ]
+
+A small picklable descriptor (block name, row count, per-coin offset index)
+is all that has to be sent to the workers.
+"""
+
+import logging
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class SharedPricePanel:
+    """Read-only view of price frames stored in a shared-memory block"""
+
+    COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+    def __init__(self, shm: shared_memory.SharedMemory, total_rows: int,
+                 index: Dict[int, Tuple[int, int]], owner: bool = False):
+        self.shm = shm
+        self.total_rows = total_rows
+        self.index = index
+        self.owner = owner
+
+        timestamp_bytes = total_rows * 8
+        self.timestamps = np.ndarray((total_rows,), dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray((total_rows, len(self.COLUMNS)), dtype=np.float64,
+                                 buffer=shm.buf, offset=timestamp_bytes)
+        if not owner:
+            self.timestamps.flags.writeable = False
+            self.values.flags.writeable = False
+
+    @classmethod
+    def create(cls, price_data: Dict[int, pd.DataFrame]) -> 'SharedPricePanel':
+        """
+        Copy price frames (e.g. from get_price_data_batch) into a new shared block
+
+        Args:
+            price_data: Dictionary mapping crypto_id to a datetime-indexed OHLCV frame
+
+        Returns:
+            Owning panel; call close() when the workers are done
+        """
+        index = {}
+        total_rows = 0
+        for crypto_id, df in price_data.items():
+            if df is None or df.empty:
+                continue
+            index[int(crypto_id)] = (total_rows, len(df))
+            total_rows += len(df)
+
+        # SharedMemory rejects zero-sized blocks
+        size = max(total_rows * 8 * (1 + len(cls.COLUMNS)), 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        panel = cls(shm, total_rows, index, owner=True)
+
+        for crypto_id, (offset, length) in index.items():
+            df = price_data[crypto_id]
+            panel.timestamps[offset:offset + length] = pd.DatetimeIndex(df.index).asi8
+            for column, name in enumerate(cls.COLUMNS):
+                if name in df.columns:
+                    panel.values[offset:offset + length, column] = df[name].to_numpy(dtype=np.float64)
+                else:
+                    panel.values[offset:offset + length, column] = np.nan
+
+        logger.info(f"📦 Shared price panel: {len(index)} cryptos, {total_rows:,} rows, "
+                    f"{size / 1024 / 1024:.1f} MB")
+        return panel
+
+    @property
+    def descriptor(self) -> Dict:
+        """Picklable description used by workers to attach()"""
+        return {'name': self.shm.name, 'total_rows': self.total_rows, 'index': self.index}
+
+    @classmethod
+    def attach(cls, descriptor: Dict) -> 'SharedPricePanel':
+        """Attach to a panel created by another process (read-only, zero-copy)"""
+        shm = shared_memory.SharedMemory(name=descriptor['name'])
+        return cls(shm, descriptor['total_rows'], descriptor['index'])
+
+    def frame(self, crypto_id: int) -> pd.DataFrame:
+        """
+        Price frame for one cryptocurrency backed by the shared block
+
+        Returns an empty frame when the panel holds no data for crypto_id.
+        """
+        location: Optional[Tuple[int, int]] = self.index.get(int(crypto_id))
+        if location is None:
+            return pd.DataFrame(columns=list(self.COLUMNS))
+
+        offset, length = location
+        index = pd.DatetimeIndex(self.timestamps[offset:offset + length].view('datetime64[ns]'),
+                                 name='datetime')
+        return pd.DataFrame(self.values[offset:offset + length], index=index,
+                            columns=list(self.COLUMNS), copy=False)
+
+    def close(self):
+        """Detach from the block; the owning process also frees it"""
+        # Drop the views first, the buffer cannot be released while they exist
+        self.timestamps = None
+        self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Strategy Parameter Normalization
+Canonical form of backtest parameters, derived from the per-strategy schemas in
+crypto_strategy_parameters: values are validated against min/max and coerced
+to the parameter's type, missing parameters get their default and unknown keys
+(UI-only fields, typos) are dropped. A missing parameter the strategy code
+reads with a fallback gets that fallback rather than the schema default, so
+omitting it keeps the result it had before normalization.
+
+Equivalent payloads such as {"rsi_period": "14"} and {"rsi_period": 14}, or
+one that spells out a default, then hash to the same cache key.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+# Parameters read by the backtest engine for every strategy but not (yet) part
+# of every strategy's schema in crypto_strategy_parameters
+ENGINE_PARAMETERS = {
+    'stop_fill': {'type': 'text', 'default': 'close', 'choices': ('close', 'stop', 'worst')},
+}
+
+# Fallbacks of the strategy code for omitted parameters (params.get(name, default))
+# where the schema default differs, e.g. the momentum window and S/R cooldown
+# rows default to 24h but an omitted value has always meant none
+CODE_DEFAULTS = {
+    'buy_threshold_window_hours': 0,
+    'cooldown_value': 0,
+    'cooldown_unit': 'hours',
+}
+
+_TRUE = ('true', '1', 'yes', 'on')
+_FALSE = ('false', '0', 'no', 'off')
+
+
+def schema_entry(parameter_type: str, default_value: Optional[str], min_value=None, max_value=None) -> Dict:
+    """Schema entry of one crypto_strategy_parameters row (default coerced to the type)"""
+    spec = {
+        'type': parameter_type,
+        'min': float(min_value) if min_value is not None else None,
+        'max': float(max_value) if max_value is not None else None,
+        'default': None
+    }
+    if default_value is not None:
+        spec['default'] = coerce_parameter('default', default_value, {**spec, 'min': None, 'max': None})
+    return spec
+
+
+def coerce_parameter(name: str, value: Any, spec: Dict) -> Any:
+    """
+    Value converted to the parameter's type and checked against its range
+
+    Types: 'integer' (int), 'number'/'percentage' (float), 'boolean', anything
+    else is text.
+
+    Raises:
+        ValueError: The value does not convert or is out of range
+    """
+    parameter_type = spec.get('type')
+    try:
+        if parameter_type == 'boolean':
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in _TRUE or text in _FALSE:
+                return text in _TRUE
+            raise ValueError
+        if parameter_type in ('integer', 'number', 'percentage'):
+            if isinstance(value, bool):
+                raise ValueError
+            number = float(value)
+            if not math.isfinite(number) or (parameter_type == 'integer' and not number.is_integer()):
+                raise ValueError
+            value = int(number) if parameter_type == 'integer' else number
+        else:
+            value = str(value).strip()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}': {value!r} (expected {parameter_type})")
+
+    if spec.get('min') is not None and value < spec['min']:
+        raise ValueError(f"'{name}' must be at least {spec['min']:g} (got {value})")
+    if spec.get('max') is not None and value > spec['max']:
+        raise ValueError(f"'{name}' must be at most {spec['max']:g} (got {value})")
+    if spec.get('choices') and value not in spec['choices']:
+        raise ValueError(f"'{name}' must be one of {', '.join(spec['choices'])} (got {value!r})")
+    return value
+
+
+def normalize_parameters(parameters: Dict, schema: Dict[str, Dict]) -> Dict:
+    """
+    Canonical parameters of one strategy
+
+    Args:
+        parameters: Parameters as sent by the client
+        schema: Parameter name -> schema entry (see schema_entry); the engine
+                parameters are added automatically
+
+    Returns:
+        New dict with every schema parameter (given or default, CODE_DEFAULTS
+        before the schema default), coerced; unknown keys are dropped.
+        Parameters without a value and without a default stay absent.
+
+    Raises:
+        ValueError: A value is invalid or out of range
+    """
+    normalized = {}
+    for name, spec in {**ENGINE_PARAMETERS, **schema}.items():
+        value = parameters.get(name)
+        if value is None or value == '':
+            default = CODE_DEFAULTS.get(name, spec.get('default'))
+            if default is not None:
+                normalized[name] = default
+            continue
+        normalized[name] = coerce_parameter(name, value, spec)
+    return normalized
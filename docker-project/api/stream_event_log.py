@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Stream Event Log
+Numbered events of backtest streams (/crypto/backtest/stream) kept in a Redis
+Stream per run, so a client whose connection dropped can reconnect with
+Last-Event-ID, get the events it missed replayed and continue live, without
+the coins that already finished being recomputed.
+
+Keys (expire STREAM_REPLAY_TTL seconds after the run's last event):
+    sse:<run>:request  JSON of the stream request (a resume must repeat it)
+    sse:<run>:events   Redis Stream; entry 0-<seq> holds the event and its crypto_id
+    sse:<run>:owner    Token of the connection producing the run's events
+
+Event IDs sent to the client are '<run>:<seq>'.
+"""
+
+import json
+import logging
+import os
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Extend or delete the owner key only while it still holds the caller's token
+REFRESH_OWNER_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_OWNER_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class StreamEventLog:
+    """Replay buffer of SSE backtest stream events in Redis"""
+
+    def __init__(self, host=None, port=None, db=0, ttl=None, owner_ttl=30):
+        """
+        Args:
+            host: Redis host (default: from REDIS_HOST env or 'redis')
+            port: Redis port (default: from REDIS_PORT env or 6379)
+            db: Redis database number (default: 0)
+            ttl: Seconds a run stays resumable after its last event
+                 (default: STREAM_REPLAY_TTL env or 1800)
+            owner_ttl: Seconds the producing connection's claim lasts without
+                       being refreshed (a crashed producer frees the run after this)
+        """
+        self.host = host or os.getenv('REDIS_HOST', 'redis')
+        self.port = int(port or os.getenv('REDIS_PORT', 6379))
+        self.ttl = ttl or int(os.getenv('STREAM_REPLAY_TTL', 1800))
+        self.owner_ttl = owner_ttl
+        self.enabled = True
+
+        try:
+            self.redis_client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                db=db,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=15,  # above the blocking reads of follow()
+                retry_on_timeout=True
+            )
+            self._refresh_owner = self.redis_client.register_script(REFRESH_OWNER_SCRIPT)
+            self._release_owner = self.redis_client.register_script(RELEASE_OWNER_SCRIPT)
+            self.redis_client.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Stream event log unavailable, streams are not resumable: {e}")
+            self.enabled = False
+            self.redis_client = None
+
+    @staticmethod
+    def _key(run_id: str, name: str) -> str:
+        return f'sse:{run_id}:{name}'
+
+    @staticmethod
+    def _request_json(request: Dict) -> str:
+        return json.dumps(request, sort_keys=True, default=str)
+
+    def create(self, request: Dict) -> Optional[str]:
+        """Start a run for a stream request; None when runs cannot be buffered"""
+        if not self.enabled:
+            return None
+        run_id = uuid.uuid4().hex[:16]
+        try:
+            self.redis_client.set(self._key(run_id, 'request'), self._request_json(request), ex=self.ttl)
+            return run_id
+        except Exception as e:
+            logger.warning(f"Stream event log create error: {e}")
+            return None
+
+    def find(self, last_event_id: str, request: Dict) -> Optional[Tuple[str, int]]:
+        """
+        Run and sequence number of a Last-Event-ID
+
+        Returns:
+            (run_id, seq), or None when the ID is malformed, the run expired or
+            was started with a different request
+        """
+        if not self.enabled or not last_event_id:
+            return None
+        run_id, _, seq = str(last_event_id).strip().rpartition(':')
+        if not run_id or not seq.isdigit():
+            return None
+        try:
+            stored = self.redis_client.get(self._key(run_id, 'request'))
+        except Exception as e:
+            logger.warning(f"Stream event log find error: {e}")
+            return None
+        if stored != self._request_json(request):
+            return None
+        return run_id, int(seq)
+
+    def append(self, run_id: str, seq: int, event: Dict, crypto_id: int = None):
+        """Store event number seq of a run"""
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.xadd(self._key(run_id, 'events'),
+                          {'event': json.dumps(event), 'crypto_id': '' if crypto_id is None else str(crypto_id)},
+                          id=f'0-{seq}')
+            pipeline.expire(self._key(run_id, 'events'), self.ttl)
+            pipeline.expire(self._key(run_id, 'request'), self.ttl)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Stream event log append error: {e}")
+
+    def read(self, run_id: str, after_seq: int = 0) -> List[Tuple[int, Dict, Optional[int]]]:
+        """Events after number after_seq as (seq, event, crypto_id)"""
+        try:
+            entries = self.redis_client.xrange(self._key(run_id, 'events'), min=f'(0-{after_seq}', max='+')
+            return self._parse(entries)
+        except Exception as e:
+            logger.warning(f"Stream event log read error: {e}")
+            return []
+
+    def follow(self, run_id: str, after_seq: int, timeout: float) -> List[Tuple[int, Dict, Optional[int]]]:
+        """Events after number after_seq, waiting up to timeout seconds for the first one"""
+        try:
+            streams = self.redis_client.xread({self._key(run_id, 'events'): f'0-{after_seq}'},
+                                              block=max(1, int(timeout * 1000)))
+            return self._parse(streams[0][1]) if streams else []
+        except Exception as e:
+            logger.warning(f"Stream event log follow error: {e}")
+            return []
+
+    def acquire(self, run_id: str) -> Optional[str]:
+        """
+        Claim a run for producing its events
+
+        Returns:
+            Token for refresh/release; None while another connection produces
+            the run; '' when Redis is unavailable (produce without a claim)
+        """
+        token = uuid.uuid4().hex
+        try:
+            if self.redis_client.set(self._key(run_id, 'owner'), token, nx=True, ex=self.owner_ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"Stream event log claim error: {e}")
+            return ''
+
+    def refresh(self, run_id: str, token: str):
+        """Keep a claim alive (called for every event and heartbeat)"""
+        if not token:
+            return
+        try:
+            self._refresh_owner(keys=[self._key(run_id, 'owner')], args=[token, self.owner_ttl])
+        except Exception as e:
+            logger.warning(f"Stream event log claim error: {e}")
+
+    def release(self, run_id: str, token: str):
+        """Give up a claim, so a reconnecting client can take the run over at once"""
+        if not token:
+            return
+        try:
+            self._release_owner(keys=[self._key(run_id, 'owner')], args=[token])
+        except Exception as e:
+            logger.warning(f"Stream event log claim error: {e}")
+
+    @staticmethod
+    def _parse(entries) -> List[Tuple[int, Dict, Optional[int]]]:
+        return [(int(entry_id.split('-', 1)[1]), json.loads(fields['event']),
+                 int(fields['crypto_id']) if fields.get('crypto_id') else None)
+                for entry_id, fields in entries]
@@ -4,175 +4,222 @@ Yields results as they complete for real-time UI updates
 """
 
 import json
+import os
+from contextlib import closing
 from crypto_backtest_service import CryptoBacktestService
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from backtest_metrics import summarize_results
+from backtest_worker_pool import HEARTBEAT
+from chart_downsampling import downsample_result
+from stream_event_log import StreamEventLog
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import time
 
 class StreamingBacktestService:
     """Service for streaming backtest results progressively"""
     
-    def __init__(self, db_config):
+    # Seconds without a finished backtest before a keep-alive comment is sent;
+    # writing it is how a closed client connection is noticed
+    HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT_SECONDS', 5))
+    
+    def __init__(self, db_config, worker_pool=None, event_log=None):
+        """
+        Args:
+            db_config: Database configuration dict
+            worker_pool: Optional persistent BacktestWorkerPool; when set, backtests
+                         run on its warm worker processes instead of a process pool
+                         started for the stream
+            event_log: StreamEventLog buffering events for resumed streams
+                       (default: a new one on Redis)
+        """
         self.backtest_service = CryptoBacktestService(db_config)
+        self.worker_pool = worker_pool
+        self.event_log = event_log or StreamEventLog()
     
     def stream_strategy_against_all_cryptos(self, strategy_id, parameters, 
                                            start_date=None, end_date=None, 
                                            interval='1d', use_daily_sampling=True,
-                                           max_workers=4):
+                                           max_workers=4, result_format='rows', max_points=None,
+                                           last_event_id=None):
         """
         Stream backtest results as they complete
         
+        Args:
+            result_format: Format of each result event's data (see run_backtest)
+            max_points: Chart point budget of each result's price_history (None: full resolution)
+            last_event_id: Last-Event-ID of a dropped stream of the same request;
+                           the events after it are replayed and the run continues
+                           with the coins it has not finished (a new run starts
+                           when the run expired or the request differs)
+        
         Yields:
             dict: Progress updates and completed results in SSE format
+        
+        Events carry an ID ('<run>:<seq>') while the event log is available.
+        Closing the generator (the client disconnected) cancels the backtests
+        that have not started yet.
         """
+        request = {
+            'strategy_id': strategy_id, 'parameters': parameters, 'start_date': start_date,
+            'end_date': end_date, 'interval': interval, 'result_format': result_format,
+            'max_points': max_points
+        }
+        resumed = self.event_log.find(last_event_id, request) if last_event_id else None
+        run = _StreamRun(self.event_log, resumed[0] if resumed else self.event_log.create(request))
+        
         try:
+            if resumed:
+                # Replay what the client missed; earlier events only restore the progress
+                for seq, event, crypto_id in self.event_log.read(run.run_id):
+                    run.absorb(seq, event, crypto_id)
+                    if seq > resumed[1]:
+                        yield self._format_sse(event, run.event_id(seq))
+                
+                # The dropped connection may still be producing until it notices: follow it
+                run.token = self.event_log.acquire(run.run_id)
+                while run.token is None and not run.finished:
+                    events = self.event_log.follow(run.run_id, run.seq, self.HEARTBEAT_SECONDS)
+                    for seq, event, crypto_id in events:
+                        run.absorb(seq, event, crypto_id)
+                        yield self._format_sse(event, run.event_id(seq))
+                    if not events:
+                        yield ': keep-alive\n\n'
+                    run.token = self.event_log.acquire(run.run_id)
+                for seq, event, crypto_id in self.event_log.read(run.run_id, run.seq):
+                    run.absorb(seq, event, crypto_id)
+                    yield self._format_sse(event, run.event_id(seq))
+                if run.finished:
+                    return
+            elif run.run_id:
+                run.token = self.event_log.acquire(run.run_id)
+            
             # Get all cryptocurrencies with data
             cryptos = self.backtest_service.get_cryptocurrencies_with_data()
-            total_cryptos = len(cryptos)
             
-            if total_cryptos == 0:
-                yield self._format_sse({
+            if not cryptos:
+                yield run.emit({
                     'type': 'error',
                     'message': 'No cryptocurrencies with data found'
                 })
                 return
             
             # Send initial status
-            yield self._format_sse({
-                'type': 'start',
-                'total': total_cryptos,
-                'message': f'Starting backtest for {total_cryptos} cryptocurrencies...'
-            })
-            
-            completed = 0
-            successful = 0
-            failed = 0
-            results = []
-            start_time = time.time()
+            if run.total is None:
+                yield run.emit({
+                    'type': 'start',
+                    'total': len(cryptos),
+                    'started_at': time.time(),
+                    'message': f'Starting backtest for {len(cryptos)} cryptocurrencies...'
+                })
+            remaining = [crypto for crypto in cryptos if crypto['id'] not in run.done]
             
-            # Use thread pool for parallel execution
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_crypto = {
-                    executor.submit(
-                        self._run_single_backtest_safe,
-                        strategy_id,
-                        crypto,
-                        parameters,
-                        start_date,
-                        end_date,
-                        interval,
-                        use_daily_sampling
-                    ): crypto
-                    for crypto in cryptos
-                }
-                
-                # Process results as they complete
-                for future in as_completed(future_to_crypto):
-                    crypto = future_to_crypto[future]
-                    completed += 1
+            # Process results as they complete
+            with closing(self._completed_backtests(
+                strategy_id, remaining, parameters, start_date, end_date,
+                interval, use_daily_sampling, max_workers, result_format
+            )) as backtests:
+                for crypto, result, error in backtests:
+                    if crypto is HEARTBEAT:
+                        self.event_log.refresh(run.run_id, run.token)
+                        yield ': keep-alive\n\n'
+                        continue
                     
-                    try:
-                        result = future.result()
-                        
-                        if result.get('success', False):
-                            successful += 1
-                            results.append(result)
-                            
-                            # Send successful result
-                            yield self._format_sse({
-                                'type': 'result',
-                                'data': result,
-                                'progress': {
-                                    'completed': completed,
-                                    'total': total_cryptos,
-                                    'successful': successful,
-                                    'failed': failed,
-                                    'percent': round((completed / total_cryptos) * 100, 1)
-                                }
-                            })
-                        else:
-                            failed += 1
-                            
-                            # Send failure notification
-                            yield self._format_sse({
-                                'type': 'progress',
-                                'message': f'Failed: {crypto["symbol"]}',
-                                'progress': {
-                                    'completed': completed,
-                                    'total': total_cryptos,
-                                    'successful': successful,
-                                    'failed': failed,
-                                    'percent': round((completed / total_cryptos) * 100, 1)
-                                }
-                            })
-                    
-                    except Exception as e:
-                        failed += 1
-                        yield self._format_sse({
+                    if error is not None:
+                        yield run.emit({
                             'type': 'error',
-                            'message': f'Error processing {crypto["symbol"]}: {str(e)}',
-                            'progress': {
-                                'completed': completed,
-                                'total': total_cryptos,
-                                'successful': successful,
-                                'failed': failed,
-                                'percent': round((completed / total_cryptos) * 100, 1)
-                            }
-                        })
+                            'message': f'Error processing {crypto["symbol"]}: {str(error)}'
+                        }, crypto['id'])
+                    elif result.get('success', False):
+                        # Send successful result
+                        yield run.emit({
+                            'type': 'result',
+                            'data': downsample_result(result, max_points)
+                        }, crypto['id'])
+                    else:
+                        # Send failure notification
+                        yield run.emit({
+                            'type': 'progress',
+                            'message': f'Failed: {crypto["symbol"]}'
+                        }, crypto['id'])
             
-            # Calculate final summary
-            elapsed_time = time.time() - start_time
-            summary = self._calculate_summary(results, total_cryptos, successful, failed)
+            # Calculate final summary (elapsed since the run started, across reconnects)
+            elapsed_time = time.time() - run.started_at
+            summary = self._calculate_summary(run.results, run.total, run.successful, run.failed)
             
             # Send completion event
-            yield self._format_sse({
+            yield run.emit({
                 'type': 'complete',
                 'summary': summary,
                 'elapsed_time': round(elapsed_time, 2),
-                'message': f'Completed {total_cryptos} backtests in {elapsed_time:.1f}s'
+                'message': f'Completed {run.total} backtests in {elapsed_time:.1f}s'
             })
             
         except Exception as e:
-            yield self._format_sse({
+            yield run.emit({
                 'type': 'error',
                 'message': f'Fatal error: {str(e)}'
             })
+        finally:
+            if run.run_id:
+                self.event_log.release(run.run_id, run.token)
     
-    def _run_single_backtest_safe(self, strategy_id, crypto, parameters,
-                                  start_date, end_date, interval, use_daily_sampling):
+    def _completed_backtests(self, strategy_id, cryptos, parameters, start_date, end_date,
+                             interval, use_daily_sampling, max_workers, result_format='rows'):
         """
-        Safely run a single backtest with error handling
+        Run the backtests and yield (crypto, result, error) as each one finishes
         
-        Returns:
-            dict: Backtest result with success flag
+        Uses the persistent worker pool when available (max_workers is then
+        governed by the pool), otherwise a process pool of max_workers
+        processes (at most one per core). (HEARTBEAT, None, None) is yielded
+        when nothing finished for HEARTBEAT_SECONDS. Closing the generator
+        cancels the backtests that have not started.
         """
+        strategy = self.backtest_service.get_strategy(strategy_id)
+        task = dict(
+            strategy_id=strategy_id,
+            parameters=parameters,
+            strategy=strategy,
+            start_date=start_date,
+            end_date=end_date,
+            interval=interval,
+            use_daily_sampling=use_daily_sampling,
+            result_format=result_format
+        )
+        
+        if self.worker_pool is not None:
+            for crypto, result in self.worker_pool.imap_unordered(
+                CryptoBacktestService._run_worker_backtest, cryptos,
+                heartbeat=self.HEARTBEAT_SECONDS, on_worker_crash=self.backtest_service._worker_crash_result, **task
+            ):
+                yield crypto, result, None
+            return
+        
+        # CPU-bound pandas work: processes, not threads (the GIL would cap threads at one core)
+        executor = ProcessPoolExecutor(
+            max_workers=max(1, min(int(max_workers), len(cryptos), os.cpu_count() or 1)),
+            initializer=CryptoBacktestService._init_pool_worker,
+            initargs=(self.backtest_service.db_config, self.backtest_service.cache is not None)
+        )
         try:
-            result = self.backtest_service.run_backtest(
-                strategy_id=strategy_id,
-                crypto_id=crypto['id'],
-                parameters=parameters,
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                use_daily_sampling=use_daily_sampling
-            )
-            
-            # Add crypto metadata
-            result['crypto_id'] = crypto['id']
-            result['symbol'] = crypto['symbol']
-            result['name'] = crypto['name']
-            result['success'] = True
-            
-            return result
-            
-        except Exception as e:
-            return {
-                'crypto_id': crypto['id'],
-                'symbol': crypto['symbol'],
-                'name': crypto['name'],
-                'success': False,
-                'error': str(e)
+            future_to_crypto = {
+                executor.submit(CryptoBacktestService._run_worker_backtest, crypto, **task): crypto
+                for crypto in cryptos
             }
+            pending = set(future_to_crypto)
+            while pending:
+                done, pending = wait(pending, timeout=self.HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield HEARTBEAT, None, None
+                for future in done:
+                    crypto = future_to_crypto[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        yield crypto, None, e
+                        continue
+                    yield crypto, result, None
+        finally:
+            # Finished or client gone: drop queued backtests without waiting for running ones
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def _calculate_summary(self, results, total, successful, failed):
         """Calculate summary statistics from results"""
@@ -187,23 +234,24 @@ class StreamingBacktestService:
                 'worst_performing': None
             }
         
-        avg_return = sum(r['total_return'] for r in results) / len(results)
-        best_crypto = max(results, key=lambda x: x['total_return'])
-        worst_crypto = min(results, key=lambda x: x['total_return'])
-        positive_returns = len([r for r in results if r['total_return'] > 0])
-        
-        # Calculate total winning and losing trades across all results
-        total_winning_trades = sum(r.get('profitable_trades', 0) for r in results)
-        total_losing_trades = sum(r.get('losing_trades', 0) for r in results)
+        stats = summarize_results(results)
+        best_crypto = stats['best']
+        worst_crypto = stats['worst']
+        optional_round = lambda value: round(value, 2) if value is not None else None
         
         return {
             'total_cryptocurrencies': total,
             'successful_backtests': successful,
             'failed_backtests': failed,
-            'average_return': round(avg_return, 2),
-            'positive_returns_count': positive_returns,
-            'total_winning_trades': total_winning_trades,
-            'total_losing_trades': total_losing_trades,
+            'average_return': round(stats['average_return'], 2),
+            'median_return': round(stats['median_return'], 2),
+            'positive_returns_count': stats['positive_returns_count'],
+            'total_winning_trades': stats['total_winning_trades'],
+            'total_losing_trades': stats['total_losing_trades'],
+            'average_max_drawdown': round(stats['average_max_drawdown'], 2),
+            'average_sharpe_ratio': optional_round(stats['average_sharpe_ratio']),
+            'average_sortino_ratio': optional_round(stats['average_sortino_ratio']),
+            'average_exposure_time': optional_round(stats['average_exposure_time']),
             'best_performing': {
                 'symbol': best_crypto['symbol'],
                 'name': best_crypto['name'],
@@ -216,14 +264,78 @@ class StreamingBacktestService:
             }
         }
     
-    def _format_sse(self, data):
+    def _format_sse(self, data, event_id=None):
         """
         Format data as Server-Sent Event
         
         Args:
             data: Dictionary to send
+            event_id: Optional event ID (sent back as Last-Event-ID on reconnect)
             
         Returns:
             str: Formatted SSE message
         """
-        return f"data: {json.dumps(data)}\n\n"
+        return format_sse(data, event_id)
+
+
+def format_sse(data, event_id=None):
+    """Format a dictionary as a Server-Sent Event, with an id line when event_id is given"""
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+class _StreamRun:
+    """Progress of one stream run; rebuilt from the event log when a client resumes"""
+    
+    def __init__(self, event_log, run_id):
+        self.event_log = event_log
+        self.run_id = run_id  # None: the event log is unavailable, events are not numbered
+        self.token = None  # claim on producing the run's events
+        self.seq = 0
+        self.total = None
+        self.started_at = time.time()
+        self.done = set()  # ids of coins with a result, failure or error event
+        self.successful = 0
+        self.failed = 0
+        self.results = []
+        self.finished = False
+    
+    def event_id(self, seq):
+        return f"{self.run_id}:{seq}" if self.run_id else None
+    
+    def absorb(self, seq, event, crypto_id=None):
+        """Account for event number seq (a new one or one read from the log)"""
+        self.seq = max(self.seq, seq)
+        kind = event.get('type')
+        if kind == 'start':
+            self.total = event['total']
+            self.started_at = event.get('started_at', self.started_at)
+        elif kind == 'complete':
+            self.finished = True
+        elif crypto_id is not None and crypto_id not in self.done:
+            self.done.add(crypto_id)
+            if kind == 'result':
+                self.successful += 1
+                self.results.append(event['data'])
+            else:
+                self.failed += 1
+    
+    def emit(self, event, crypto_id=None):
+        """
+        Number, log and format a new event; events of a coin get the progress
+        after it
+        """
+        self.absorb(self.seq + 1, event, crypto_id)
+        if crypto_id is not None:
+            completed = len(self.done)
+            event['progress'] = {
+                'completed': completed,
+                'total': self.total,
+                'successful': self.successful,
+                'failed': self.failed,
+                'percent': round((completed / self.total) * 100, 1) if self.total else 0
+            }
+        if self.run_id:
+            self.event_log.append(self.run_id, self.seq, event, crypto_id)
+            self.event_log.refresh(self.run_id, self.token)
+        return format_sse(event, self.event_id(self.seq))
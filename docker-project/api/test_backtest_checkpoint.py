@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test Incremental Backtest Extension
+Runs every strategy up to an earlier end date, then resumes from its checkpoint
+over the later bars and compares with a full run (synthetic prices, no
+database required)
+"""
+
+import json
+from crypto_backtest_service import CryptoBacktestService
+from backtest_checkpoint import checkpoint_matches
+from test_panel_backtest import STRATEGIES
+from test_result_format import make_hourly_frame
+
+
+def comparable(result):
+    """A result as JSON without its timing, for exact comparison"""
+    result = {key: value for key, value in result.items() if key not in ('calculation_time_ms', 'from_cache', 'cache_key')}
+    return json.dumps(result, sort_keys=True, default=lambda value: value.tolist() if hasattr(value, 'tolist') else str(value))
+
+
+def test_resumed_backtest_matches_full_run():
+    """Resuming from a (JSON round-tripped) checkpoint must give the full run's result"""
+
+    print("=" * 80)
+    print("⏩ INCREMENTAL BACKTEST TEST")
+    print("=" * 80)
+
+    df = make_hourly_frame()
+    earlier = df.iloc[:-3000]
+    service = CryptoBacktestService(enable_cache=False)
+
+    for strategy_id, (name, params) in enumerate(STRATEGIES.items(), start=1):
+        params = {**params, 'initial_investment': 10000, 'transaction_fee': 0.1}
+        expected = service.run_backtest(strategy_id, 1, params, interval='1h', price_data=df,
+                                        strategy={'id': strategy_id, 'name': name})
+
+        # A run without a checkpoint is the plain backtest
+        result, checkpoint = service.backtest_resumable(name, earlier, params)
+        full = getattr(service, service.STRATEGY_FUNCTIONS[name])(earlier, params)
+        assert comparable(result) == comparable(full), name
+        assert checkpoint['bars'] == len(earlier) - 1, name
+        # No prices or equity: the warm state is a few hundred bytes next to the settled trades
+        warm_state = {key: value for key, value in checkpoint.items() if key not in ('trades', 'trade_bars')}
+        assert len(json.dumps(warm_state)) < 1024, name
+        size = len(json.dumps(checkpoint))
+        checkpoint = json.loads(json.dumps(checkpoint))  # as stored in Redis
+
+        # Only the warm-up bars and the bars after the checkpoint reach the signal builder
+        builder = service.STRATEGIES[name][1]
+        bars_built = []
+        build_signals = getattr(service, builder)
+        setattr(service, builder, lambda close, *args: bars_built.append(len(close)) or build_signals(close, *args))
+        try:
+            result, extended = service.backtest_resumable(name, df, params, checkpoint)
+        finally:
+            delattr(service, builder)
+        assert bars_built == [checkpoint['warmup_bars'] + len(df) - checkpoint['bars']], name
+        assert extended['bars'] == len(df) - 1, name
+
+        if not expected['success']:
+            assert result['error'] == expected['error'], name
+            continue
+        # Bit for bit: trades with their indicator annotations, equity and metrics
+        full = getattr(service, service.STRATEGY_FUNCTIONS[name])(df, params)
+        assert comparable(result) == comparable(full), name
+        assert comparable({'trades': result['trades']}) == comparable({'trades': expected['trades']}), name
+        assert result['final_value'] == expected['final_value'], name
+        print(f"   {name:26s} {result['total_trades']:4d} trades, resumed over {len(df) - checkpoint['bars']} bars, "
+              f"checkpoint {size / 1024:.1f} KB (JSON)")
+
+    print("   ✅ Resumed backtests match full runs")
+    print()
+
+
+def test_checkpoint_rejects_changed_history():
+    """A checkpoint is not resumed when a settled bar changed or the range moved"""
+
+    df = make_hourly_frame(years=1)
+    service = CryptoBacktestService(enable_cache=False)
+    params = {**STRATEGIES['RSI Buy/Sell'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+    _, checkpoint = service.backtest_resumable('RSI Buy/Sell', df.iloc[:-100], params)
+
+    revised = df.copy()
+    revised.iloc[checkpoint['bars'] // 2, revised.columns.get_loc('close_price')] *= 1.01
+    assert not checkpoint_matches(checkpoint, revised)
+    assert not checkpoint_matches(checkpoint, df.iloc[:checkpoint['bars']])
+    assert not checkpoint_matches(checkpoint, df.iloc[1:])
+    assert checkpoint_matches(checkpoint, df)
+
+    # A changed history is recomputed in full
+    result, recomputed = service.backtest_resumable('RSI Buy/Sell', revised, params, checkpoint)
+    assert comparable(result) == comparable(service.backtest_rsi_strategy(revised, params))
+    assert recomputed['bars'] == len(df) - 1 and recomputed['digest'] != checkpoint['digest']
+
+
+if __name__ == '__main__':
+    test_resumed_backtest_matches_full_run()
+    test_checkpoint_rejects_changed_history()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test Backtest Job Queue
+Submits batch and run-all jobs against a stand-in service and worker pool and checks
+status, paginated results and cancellation (requires Redis, no database)
+"""
+
+import time
+
+from backtest_job_queue import BacktestJobQueue
+
+
+class JobService:
+    """Two coins with data, one strategy and the result cache (what the job runner reads)"""
+
+    def __init__(self):
+        self.cached = {}
+        self.stored = []
+
+    def get_cryptocurrencies_with_data(self):
+        return [{'id': 1, 'symbol': 'BTC'}, {'id': 2, 'symbol': 'ETH'}]
+
+    def get_strategy(self, strategy_id):
+        return {'id': strategy_id}
+
+    def _worker_crash_result(self, crypto, error):
+        return {'crypto_id': crypto['id'], 'symbol': crypto['symbol'], 'success': False, 'error': str(error)}
+
+    def _format_backtest_result(self, crypto, result):
+        return {'crypto_id': crypto['id'], 'symbol': crypto['symbol'], **result}
+
+    def get_cached_backtests(self, strategy_id, crypto_ids, parameters, **kwargs):
+        return {crypto_id: self.cached[crypto_id] for crypto_id in crypto_ids if crypto_id in self.cached}
+
+    def store_backtests(self, strategy_id, results, parameters, **kwargs):
+        self.stored.append(dict(results))
+        return len(results)
+
+
+class SlowPool:
+    """Worker pool stand-in: one coin result every delay seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.tasks = []
+
+    def imap_unordered(self, fn, items, heartbeat=None, **kwargs):
+        self.tasks.append(kwargs)
+        for crypto in items:
+            time.sleep(self.delay)
+            yield crypto, {'crypto_id': crypto['id'], 'symbol': crypto['symbol'], 'success': True,
+                           'total_return': 10.0 * crypto['id']}
+
+
+def wait_for_state(queue, job_id, states, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['state'] in states:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not reach {states}")
+
+
+def test_job_queue():
+    """Batch and run-all jobs run in the background; results page; a cancel stops a running job"""
+
+    print("=" * 80)
+    print("🧾 BACKTEST JOB QUEUE TEST")
+    print("=" * 80)
+
+    service = JobService()
+    queue = BacktestJobQueue(service, SlowPool(0.1), runners=1, ttl=60)
+    if not queue.enabled:
+        print("❌ Redis not available")
+        return
+
+    request = {'strategy_id': 1, 'parameters': {}, 'crypto_ids': [1, 2, 999], 'max_points': None}
+    job = queue.submit('batch', request)
+    assert job['state'] in ('queued', 'running')
+
+    job = wait_for_state(queue, job['job_id'], ('succeeded', 'failed'))
+    assert job['state'] == 'succeeded', job
+    assert job['progress'] == {'completed': 3, 'total': 3, 'successful': 2, 'failed': 1, 'percent': 100.0}
+    assert job['summary']['best_performing']['symbol'] == 'ETH'
+
+    first = queue.get_results(job['job_id'], offset=0, limit=2)
+    second = queue.get_results(job['job_id'], offset=first['next_offset'], limit=2)
+    assert len(first['results']) == 2 and not first['complete']
+    assert len(second['results']) == 1 and second['complete']
+    assert queue.get('missing-job') is None
+
+    # Run-all jobs look every coin up at once and run only the misses on the pool, in bulk mode
+    service.cached = {1: {'success': True, 'total_return': 10.0, 'from_cache': True}}
+    job = queue.submit('run-all', dict(request, crypto_ids=None, result_format='columnar32'))
+    job = wait_for_state(queue, job['job_id'], ('succeeded', 'failed'))
+    assert job['state'] == 'succeeded', job
+    assert job['progress']['completed'] == job['progress']['total'] == 2
+    results = queue.get_results(job['job_id'])['results']
+    assert [result['crypto_id'] for result in results] == [1, 2] and results[0]['from_cache']
+    task = queue.worker_pool.tasks[-1]
+    assert task['bulk'] and task['result_format'] == 'columnar'
+    assert list(service.stored[-1]) == [2]
+
+    # Cancel while the first coin runs: the second never starts, the finished one is stored
+    service.cached = {}
+    queue.worker_pool = SlowPool(1.0)
+    job = queue.submit('run-all', dict(request, crypto_ids=None))
+    wait_for_state(queue, job['job_id'], ('running',))
+    queue.cancel(job['job_id'])
+    job = wait_for_state(queue, job['job_id'], ('cancelled',))
+    assert job['progress']['completed'] == 1
+    assert list(service.stored[-1]) == [1]
+
+    queue.stop()
+    print("   ✅ Jobs run in the background, page their results and cancel")
+    print()
+
+
+if __name__ == '__main__':
+    test_job_queue()
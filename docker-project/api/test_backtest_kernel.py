@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the Unified Backtest Kernel
+Compares VectorizedBacktestEngine.execute_trades_vectorized against a
+bar-by-bar reference loop (the way the strategies used to iterate)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from vectorized_indicators import VectorizedIndicators, VectorizedBacktestEngine
+
+
+def reference_loop(prices, entries, exits, tradable, timestamps, initial_capital, fee_rate,
+                   cooldown=None, stop_loss=None, take_profit=None):
+    """Bar-by-bar state machine with the same semantics as the kernel"""
+    cash = initial_capital
+    position = 0
+    entry_price = 0
+    last_sell_time = None
+    trades = []
+    equity = []
+
+    for i in range(len(prices)):
+        price = prices[i]
+        equity.append(cash + position * price)
+        if not tradable[i]:
+            continue
+
+        if position > 0:
+            profit_pct = (price - entry_price) / entry_price
+            reason = None
+            if take_profit is not None and profit_pct >= take_profit:
+                reason = 'take_profit'
+            elif stop_loss is not None and profit_pct <= -stop_loss:
+                reason = 'stop_loss'
+            elif exits[i]:
+                reason = 'signal'
+            if reason:
+                sell_value = position * price
+                fee = sell_value * fee_rate
+                trades.append((i, 'SELL', sell_value, fee, reason))
+                cash = sell_value - fee
+                position = 0
+                last_sell_time = timestamps[i]
+            continue
+
+        can_buy = cooldown is None or last_sell_time is None or (timestamps[i] - last_sell_time) >= cooldown
+        if can_buy and entries[i] and cash > 0:
+            fee = cash * fee_rate
+            buy_amount = cash - fee
+            position = buy_amount / price
+            entry_price = price
+            cash = 0
+            trades.append((i, 'BUY', buy_amount, fee, None))
+
+    return trades, np.array(equity), cash + position * prices[-1]
+
+
+def test_kernel_matches_reference():
+    """Kernel trades, equity and final value must match the reference loop exactly"""
+
+    print("=" * 80)
+    print("🧪 BACKTEST KERNEL EQUIVALENCE TEST")
+    print("=" * 80)
+
+    rng = np.random.default_rng(42)
+    cases = 0
+
+    for seed in range(20):
+        n = 2000
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        timestamps = pd.date_range('2024-01-01', periods=n, freq='h')
+        rsi = VectorizedIndicators.calculate_rsi_vectorized(prices, 14)
+        tradable = ~np.isnan(rsi)
+        entries = rsi < 30
+        exits = rsi > 70
+
+        for cooldown in (None, pd.Timedelta(hours=12)):
+            for stop_loss, take_profit in ((None, None), (0.03, None), (0.05, 0.04)):
+                expected_trades, expected_equity, expected_final = reference_loop(
+                    prices, entries, exits, tradable, timestamps, 10000.0, 0.001,
+                    cooldown, stop_loss, take_profit
+                )
+                run = VectorizedBacktestEngine.execute_trades_vectorized(
+                    prices, entries, 10000.0, fee_rate=0.001,
+                    exit_signals=exits, tradable=tradable, timestamps=timestamps,
+                    cooldown=cooldown, stop_loss=stop_loss, take_profit=take_profit
+                )
+                actual_trades = [(t['index'], t['action'], t['value'], t['fee'], t.get('reason'))
+                                 for t in run['trades']]
+
+                assert actual_trades == expected_trades, f"Trade mismatch (seed={seed})"
+                assert np.array_equal(run['equity'], expected_equity), f"Equity mismatch (seed={seed})"
+                assert run['final_value'] == expected_final, f"Final value mismatch (seed={seed})"
+                cases += 1
+
+    print(f"   ✅ {cases} configurations match the reference loop exactly")
+    print()
+
+
+def test_kernel_performance():
+    """Compare kernel speed against the reference loop on 5 years of hourly data"""
+
+    print("-" * 80)
+    print("⏱️  KERNEL PERFORMANCE (5 years hourly)")
+    print("-" * 80)
+
+    rng = np.random.default_rng(7)
+    n = 5 * 8760
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    timestamps = pd.date_range('2020-01-01', periods=n, freq='h')
+    rsi = VectorizedIndicators.calculate_rsi_vectorized(prices, 14)
+    tradable = ~np.isnan(rsi)
+
+    start = time.time()
+    reference_loop(prices, rsi < 30, rsi > 70, tradable, timestamps, 10000.0, 0.001,
+                   pd.Timedelta(hours=24), 0.1)
+    time_loop = time.time() - start
+
+    start = time.time()
+    run = VectorizedBacktestEngine.execute_trades_vectorized(
+        prices, rsi < 30, 10000.0, fee_rate=0.001, exit_signals=rsi > 70, tradable=tradable,
+        timestamps=timestamps, cooldown=pd.Timedelta(hours=24), stop_loss=0.1
+    )
+    time_kernel = time.time() - start
+
+    print(f"   Bars: {n:,}  Trades: {len(run['trades'])}")
+    print(f"   Reference loop: {time_loop*1000:.1f}ms")
+    print(f"   Kernel:         {time_kernel*1000:.1f}ms")
+    print(f"   🚀 Speedup: {time_loop/time_kernel:.1f}x faster")
+    print()
+
+
+if __name__ == '__main__':
+    test_kernel_matches_reference()
+    test_kernel_performance()
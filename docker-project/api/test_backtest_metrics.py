@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test Vectorized Backtest Metrics
+Compares the metrics module with straightforward loop/pandas reference
+implementations and checks that backtests and summaries report them
+(synthetic prices, no database required)
+"""
+
+import numpy as np
+import pandas as pd
+from backtest_metrics import calculate_backtest_metrics, summarize_results
+from crypto_backtest_service import CryptoBacktestService
+from test_shared_price_panel import make_price_data
+
+
+def test_metrics_match_reference():
+    """Drawdown, win/loss, Sharpe/Sortino and exposure against loop references"""
+
+    print("=" * 80)
+    print("📈 BACKTEST METRICS TEST")
+    print("=" * 80)
+
+    rng = np.random.default_rng(11)
+    index = pd.date_range('2023-01-01', periods=500, freq='D')
+    equity = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    actions = np.array(['BUY', 'SELL', 'BUY', 'SELL', 'BUY'])
+    values = np.array([10000.0, 10500.0, 10400.0, 9800.0, 9700.0])
+    bars = np.array([10, 40, 100, 130, 450])
+
+    metrics = calculate_backtest_metrics(10000, equity[-1], equity, index.asi8, actions, values, bars, index.asi8)
+
+    # Loop reference: running peak starting at the initial investment
+    peak, max_drawdown = 10000, 0
+    for value in equity:
+        peak = max(peak, value)
+        max_drawdown = max(max_drawdown, (peak - value) / peak)
+    assert np.isclose(metrics['max_drawdown'], max_drawdown)
+
+    returns = pd.Series(equity).pct_change().dropna()
+    sharpe = returns.mean() / returns.std() * np.sqrt(365.25)
+    sortino = returns.mean() / np.sqrt((returns.clip(upper=0) ** 2).mean()) * np.sqrt(365.25)
+    assert np.isclose(metrics['sharpe_ratio'], sharpe) and np.isclose(metrics['sortino_ratio'], sortino)
+
+    assert (metrics['profitable_trades'], metrics['losing_trades']) == (1, 1)
+    assert np.isclose(metrics['win_loss_ratio'], 0.05 / (1 - 9800 / 10400))
+    assert np.isclose(metrics['average_holding_period_hours'], 30 * 24)
+    assert np.isclose(metrics['exposure_time'], (30 + 30 + 49) / 499)
+    assert np.isclose(metrics['calmar_ratio'], metrics['annualized_return'] / max_drawdown)
+    print(f"   Metrics: { {k: round(v, 4) for k, v in metrics.items()} }")
+    print("   ✅ Metrics match reference implementations")
+
+
+def test_backtest_and_summary_metrics():
+    """Every successful backtest reports the metric set; summaries aggregate it"""
+    service = CryptoBacktestService(enable_cache=False)
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    parameters = {'rsi_period': 14, 'oversold_threshold': 30, 'overbought_threshold': 70,
+                  'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    results = []
+    for crypto_id, df in make_price_data().items():
+        result = service.run_backtest(1, crypto_id, parameters, price_data=df, strategy=strategy)
+        assert result['success']
+        assert result['win_rate'] == round(result['profitable_trades'] * 100 /
+                                           (result['profitable_trades'] + result['losing_trades']), 2)
+        assert 0 < result['exposure_time'] <= 100 and result['sharpe_ratio'] is not None
+        results.append({**result, 'symbol': f'C{crypto_id}', 'name': f'Coin {crypto_id}'})
+
+    summary = summarize_results(results)
+    assert summary['best']['total_return'] == max(r['total_return'] for r in results)
+    assert np.isclose(summary['average_sharpe_ratio'], np.mean([r['sharpe_ratio'] for r in results]))
+    print(f"   Summary: average Sharpe {summary['average_sharpe_ratio']:.2f}, "
+          f"average exposure {summary['average_exposure_time']:.1f}%")
+    print("   ✅ Backtests and summaries report risk metrics")
+    print()
+
+
+if __name__ == '__main__':
+    test_metrics_match_reference()
+    test_backtest_and_summary_metrics()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test the Durable Backtest Result Store
+Checks the compressed result encoding and the second cache tier in
+run_backtest and panel run-all, with an in-memory stand-in for the
+crypto_backtest_results table (synthetic prices, no database required)
+"""
+
+import json
+from backtest_result_format import convert_result
+from backtest_result_store import encode_result, decode_result, parameter_hash
+from crypto_backtest_service import CryptoBacktestService
+from test_panel_backtest import STRATEGIES
+from test_result_format import make_hourly_frame
+from test_shared_price_panel import make_price_data
+
+
+class MemoryStore:
+    """BacktestResultStore with a dict instead of the table"""
+
+    def __init__(self):
+        self.rows = {}
+        self.lookups = 0
+        self.writes = 0
+
+    def _key(self, strategy_id, crypto_id, parameters, **key):
+        return (strategy_id, crypto_id, parameter_hash(parameters), tuple(sorted(key.items())))
+
+    def get_many(self, strategy_id, crypto_ids, parameters, **key):
+        self.lookups += 1
+        rows = {crypto_id: self.rows.get(self._key(strategy_id, crypto_id, parameters, **key))
+                for crypto_id in crypto_ids}
+        return {crypto_id: decode_result(blob) for crypto_id, blob in rows.items() if blob is not None}
+
+    def put_many(self, strategy_id, results, parameters, **key):
+        self.writes += 1
+        stored = {crypto_id: result for crypto_id, result in results.items() if result.get('success')}
+        for crypto_id, result in stored.items():
+            self.rows[self._key(strategy_id, crypto_id, parameters, **key)] = encode_result(result)
+        return len(stored)
+
+    def put(self, strategy_id, crypto_id, result, parameters, **key):
+        return self.put_many(strategy_id, {crypto_id: result}, parameters, **key) > 0
+
+
+def strip(result):
+    return {k: v for k, v in result.items() if k not in ('calculation_time_ms', 'from_cache', 'cache_tier')}
+
+
+def test_encoded_result_round_trip():
+    """The stored blob rebuilds the exact result and is much smaller than row JSON"""
+
+    print("=" * 80)
+    print("🗄️  BACKTEST RESULT STORE TEST")
+    print("=" * 80)
+
+    service = CryptoBacktestService(enable_cache=False)
+    params = {**STRATEGIES['RSI Buy/Sell'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+    result = service.run_backtest(1, 1, params, interval='1h', price_data=make_hourly_frame(),
+                                  strategy={'id': 1, 'name': 'RSI Buy/Sell'})
+
+    blob = encode_result(result)
+    assert convert_result(decode_result(blob), 'rows') == result
+    print(f"   Hourly result: {len(json.dumps(result)) / 1024:.0f} KB rows JSON -> "
+          f"{len(blob) / 1024:.0f} KB stored blob")
+    print("   ✅ Stored results round-trip exactly")
+
+
+def test_store_is_second_cache_tier():
+    """run_backtest serves stored results, recomputes on force_refresh and stores new ones"""
+    price_data = make_price_data()
+    service = CryptoBacktestService(enable_cache=False)
+    service.store = MemoryStore()
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    params = {**STRATEGIES['RSI Buy/Sell'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+    run = lambda **kwargs: service.run_backtest(1, 1, params, price_data=price_data[1], strategy=strategy, **kwargs)
+
+    computed = run()
+    assert not computed['from_cache'] and len(service.store.rows) == 1
+    stored = run()
+    assert stored['from_cache'] and stored['cache_tier'] == 'store'
+    assert strip(stored) == strip(computed)
+    assert 'cache_tier' not in run(force_refresh=True)
+
+    # Different range or precision is a different stored result
+    assert not service.run_backtest(1, 1, params, start_date='2022-06-01', price_data=price_data[1],
+                                    strategy=strategy)['from_cache']
+    print("   ✅ run_backtest uses the store behind Redis")
+
+
+def test_panel_run_all_uses_store():
+    """Panel run-all serves stored coins with one lookup and stores the computed ones"""
+    price_data = make_price_data(n_coins=10)
+    cryptos = [{'id': crypto_id, 'symbol': f'C{crypto_id}', 'name': f'Coin {crypto_id}',
+                'total_records': len(df), 'days_of_data': len(df)}
+               for crypto_id, df in price_data.items()]
+
+    service = CryptoBacktestService(enable_cache=False)
+    service.store = MemoryStore()
+    service.get_strategy = lambda strategy_id: {'id': 1, 'name': 'RSI Buy/Sell'}
+    service.get_cryptocurrencies_with_data = lambda: cryptos
+    batches = []
+    service.get_price_data_batch = lambda crypto_ids, **kwargs: batches.append(crypto_ids) or \
+        {i: price_data[i] for i in crypto_ids}
+    parameters = {**STRATEGIES['RSI Buy/Sell'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    first = service.run_strategy_against_all_cryptos(1, parameters, use_panel=True)
+    second = service.run_strategy_against_all_cryptos(1, parameters, use_panel=True)
+    assert len(batches) == 1 and service.store.lookups == 2
+    assert [strip(r) for r in first] == [strip(r) for r in second]
+    assert all(r['from_cache'] for r in second)
+    print(f"   ✅ Panel run-all: {len(cryptos)} coins computed once, then served from the store")
+    print()
+
+
+def test_per_coin_run_all_stores_in_one_query():
+    """Per-coin run-all: one store lookup and one write for all coins, lossless even for columnar32"""
+    price_data = make_price_data(n_coins=6)
+    cryptos = [{'id': crypto_id, 'symbol': f'C{crypto_id}', 'name': f'Coin {crypto_id}',
+                'total_records': len(df), 'days_of_data': len(df)}
+               for crypto_id, df in price_data.items()]
+
+    service = CryptoBacktestService(enable_cache=False)
+    service.store = MemoryStore()
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    service.get_strategy = lambda strategy_id: strategy
+    service.get_cryptocurrencies_with_data = lambda: cryptos
+    service.get_price_data = lambda crypto_id, **kwargs: price_data[crypto_id]
+    parameters = {**STRATEGIES['RSI Buy/Sell'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    first = service.run_strategy_against_all_cryptos(1, parameters, use_parallel=False, use_panel=False,
+                                                     result_format='columnar32')
+    assert service.store.lookups == 1 and service.store.writes == 1
+    assert len(service.store.rows) == len(cryptos)
+    assert not any('symbol' in decode_result(blob) for blob in service.store.rows.values())
+    assert all(r['result_format'] == 'columnar32' for r in first)
+
+    second = service.run_strategy_against_all_cryptos(1, parameters, use_parallel=False, use_panel=False)
+    assert service.store.lookups == 2 and service.store.writes == 1
+    assert all(r['from_cache'] and 'symbol' in r for r in second)
+    for result in second:
+        direct = service.run_backtest(1, result['crypto_id'], parameters, price_data=price_data[result['crypto_id']],
+                                      strategy=strategy, bulk=True)
+        assert strip({k: v for k, v in result.items() if k not in ('crypto_id', 'symbol', 'name', 'total_records',
+                                                                   'days_of_data', 'cache_key')}) == strip(direct)
+    print(f"   ✅ Per-coin run-all: {len(cryptos)} coins stored with one write")
+    print()
+
+
+if __name__ == '__main__':
+    test_encoded_result_round_trip()
+    test_store_is_second_cache_tier()
+    test_panel_run_all_uses_store()
+    test_per_coin_run_all_stores_in_one_query()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test Persistent Backtest Worker Pool
+Runs run-all style backtests twice on the same warm pool and compares them
+with direct backtests (synthetic prices via the shared price panel, no
+database required)
+"""
+
+import os
+import pathlib
+import tempfile
+import time
+from backtest_worker_pool import BacktestWorkerPool, HEARTBEAT
+from crypto_backtest_service import CryptoBacktestService
+from test_shared_price_panel import make_price_data
+
+
+def test_worker_pool_run_all():
+    """Pooled results must match direct backtests on every run of the warm pool"""
+
+    print("=" * 80)
+    print("🔥 PERSISTENT WORKER POOL TEST")
+    print("=" * 80)
+
+    price_data = make_price_data(n_coins=15)
+    cryptos = [{'id': crypto_id, 'symbol': f'C{crypto_id}', 'name': f'Coin {crypto_id}',
+                'total_records': len(df), 'days_of_data': len(df)}
+               for crypto_id, df in price_data.items()]
+
+    service = CryptoBacktestService(enable_cache=False)
+    strategy = {'id': 2, 'name': 'Moving Average Crossover'}
+    service.get_strategy = lambda strategy_id: strategy
+    service.get_price_data_batch = lambda crypto_ids, **kwargs: {i: price_data[i] for i in crypto_ids}
+    parameters = {'short_ma_period': 10, 'long_ma_period': 30, 'initial_investment': 10000,
+                  'transaction_fee': 0.1}
+
+    # Tiny queue so the bounded submission path is exercised
+    pool = BacktestWorkerPool({}, max_workers=2, max_queue_size=2, enable_cache=False)
+    try:
+        start = time.time()
+        pool.start()
+        print(f"   Warm-up: {time.time() - start:.2f}s")
+
+        for run in range(2):
+            start = time.time()
+            results = service._run_pooled_backtests(pool, 2, parameters, cryptos)
+            print(f"   Run {run + 1}: {len(results)} backtests in {time.time() - start:.2f}s")
+
+            assert [r['crypto_id'] for r in results] == [c['id'] for c in cryptos]
+            for crypto, result in zip(cryptos, results):
+                expected = service.run_backtest(2, crypto['id'], parameters, price_data=price_data[crypto['id']],
+                                                strategy=strategy)
+                assert result['total_return'] == expected['total_return'], crypto['symbol']
+                assert result['trades'] == expected['trades'], crypto['symbol']
+
+        stats = pool.get_stats()
+        print(f"   Stats: {stats}")
+        assert stats['tasks_completed'] == 2 * len(cryptos)
+        assert stats['queue_depth'] == 0 and stats['busy_workers'] == 0
+    finally:
+        pool.shutdown()
+
+    print("   ✅ Pooled results match direct backtests")
+    print()
+
+
+def _gated_task(gate, timeout=60):
+    """Finish once the gate file exists (lets the test decide when a worker task ends)"""
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(gate) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return gate
+
+
+def _poll(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.02)
+
+
+def test_worker_pool_heartbeat_and_cancel(tmp_path):
+    """Heartbeats while tasks run; closing the iterator (client gone) cancels tasks not yet started"""
+
+    gates = [str(tmp_path / f'gate{n}') for n in range(12)]
+    open_gate = lambda gate: open(gate, 'w').close()
+    pool = BacktestWorkerPool({}, max_workers=1, max_queue_size=16, enable_cache=False)
+    try:
+        pool.start()
+        stream = pool.imap_unordered(_gated_task, gates, heartbeat=0.05)
+
+        # Nothing can finish while every gate is closed
+        item, result = next(stream)
+        assert item is HEARTBEAT
+        open_gate(gates[0])
+        while item is HEARTBEAT:
+            item, result = next(stream)
+        assert result == gates[0]
+
+        # One task runs and at most two sit in the executor's call queue; the rest never start
+        stream.close()
+        stats = pool.get_stats()
+        print(f"   After disconnect: {stats['tasks_completed']} completed, {stats['tasks_cancelled']} cancelled")
+        assert stats['tasks_cancelled'] >= len(gates) - 4
+
+        for gate in gates:
+            open_gate(gate)
+        _poll(lambda: pool.get_stats()['busy_workers'] == 0)
+        stats = pool.get_stats()
+        assert stats['tasks_completed'] + stats['tasks_cancelled'] == len(gates)
+        assert stats['tasks_completed'] < len(gates)
+    finally:
+        for gate in gates:  # never leave a worker blocked on a closed gate
+            open_gate(gate)
+        pool.shutdown()
+
+    print("   ✅ Heartbeats sent while waiting; pending tasks cancelled on close")
+    print()
+
+
+def _exit_task(value):
+    """Kill the worker process (like the OOM killer) when asked to, else return the value"""
+    if value == 'crash':
+        os._exit(1)
+    return value
+
+
+def test_worker_pool_survives_dead_worker():
+    """A dead worker fails only the tasks in flight; the pool is replaced and keeps serving"""
+
+    pool = BacktestWorkerPool({}, max_workers=1, max_queue_size=4, enable_cache=False)
+    try:
+        pool.start()
+        results = dict(pool.imap_unordered(_exit_task, ['crash', 'a', 'b'],
+                                           on_worker_crash=lambda item, error: 'failed'))
+        assert results['crash'] == 'failed'
+        assert set(results) == {'crash', 'a', 'b'} and set(results.values()) <= {'failed', 'a', 'b'}
+
+        # Later work runs on the replacement executor
+        assert dict(pool.imap_unordered(_exit_task, ['c', 'd'])) == {'c': 'c', 'd': 'd'}
+        assert pool.submit(_exit_task, 'e').result(timeout=30) == 'e'
+        _poll(lambda: pool.get_stats()['busy_workers'] == 0)
+        stats = pool.get_stats()
+        print(f"   After a dead worker: {stats['worker_restarts']} restart(s), {stats['tasks_failed']} failed")
+        assert stats['worker_restarts'] == 1
+    finally:
+        pool.shutdown()
+
+    print("   ✅ Dead worker replaced; only its in-flight tasks failed")
+    print()
+
+
+if __name__ == '__main__':
+    test_worker_pool_run_all()
+    with tempfile.TemporaryDirectory() as directory:
+        test_worker_pool_heartbeat_and_cancel(pathlib.Path(directory))
+    test_worker_pool_survives_dead_worker()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test Cache Value Codecs
+Round-trips a backtest-sized result through every codec, reads a legacy plain
+JSON entry and compares payload sizes (no Redis required)
+"""
+
+import json
+import random
+import time
+from cache_codec import CODECS, encode_value, decode_value
+
+
+def make_result(days=3000):
+    """Columnar-style backtest result with a price history and trade list"""
+    rng = random.Random(7)
+    prices = [30000.0]
+    for _ in range(days - 1):
+        prices.append(prices[-1] * (1 + rng.gauss(0, 0.03)))
+    return {
+        'success': True,
+        'final_value': 12345.678901234,
+        'result_format': 'columnar',
+        'price_history': {'date_offsets': list(range(days)), 'price': prices,
+                          'portfolio_value': [price * 0.37 for price in prices]},
+        'trades': [{'date': f'2020-01-{day % 28 + 1:02d}', 'action': 'buy' if day % 2 else 'sell',
+                    'price': prices[day], 'value': prices[day] * 0.37} for day in range(0, days, 25)]
+    }
+
+
+def test_codec_round_trip():
+    """Every codec must return the value unchanged; legacy JSON entries stay readable"""
+
+    print("=" * 80)
+    print("🗜️ CACHE CODEC TEST")
+    print("=" * 80)
+
+    result = make_result()
+    legacy = json.dumps(result).encode()
+    assert decode_value(legacy)[0] == result
+
+    for name, codec in CODECS.items():
+        start = time.perf_counter()
+        payload, json_size = encode_value(result, codec)
+        encoded = time.perf_counter()
+        value, decoded_size = decode_value(payload)
+        elapsed = time.perf_counter()
+
+        assert value == result, name
+        assert decoded_size == json_size, name
+        print(f"   {name:5s} {len(payload) / 1024:7.1f} KB ({len(legacy) / len(payload):.1f}x smaller than "
+              f"legacy JSON), encode {(encoded - start) * 1000:.1f}ms, decode {(elapsed - encoded) * 1000:.1f}ms")
+
+    payload, _ = encode_value(result, CODECS['zlib'])
+    try:
+        decode_value(payload[:1] + b'\x09' + payload[2:])
+        raise AssertionError("unknown format version must be rejected")
+    except ValueError:
+        pass
+
+    print("   ✅ Cache values round-trip through every codec")
+    print()
+
+
+if __name__ == '__main__':
+    test_codec_round_trip()
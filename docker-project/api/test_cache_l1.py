@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test In-Process Cache (L1)
+Checks the LRU's size, entry and TTL limits and its pattern invalidation
+(no Redis required)
+"""
+
+import time
+from cache_service import LocalCache
+
+
+def test_local_cache_limits():
+    """Entries are evicted least recently used first and expire with their TTL"""
+
+    print("=" * 80)
+    print("⚡ L1 CACHE TEST")
+    print("=" * 80)
+
+    cache = LocalCache(max_bytes=1000, max_entries=3, ttl=60)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, {'key': key}, 100)
+    assert cache.get('a') == (True, {'key': 'a'})
+
+    cache.put('d', {'key': 'd'}, 100)  # over the entry limit: 'b' is least recently used
+    assert cache.get('b') == (False, None)
+    assert all(cache.get(key)[0] for key in ('a', 'c', 'd'))
+
+    cache.put('e', {'key': 'e'}, 300)  # over a quarter of the budget: skipped
+    assert cache.get('e') == (False, None)
+
+    cache = LocalCache(max_bytes=1000, max_entries=100, ttl=60)
+    for key in ('a', 'b', 'c', 'd'):
+        cache.put(key, {'key': key}, 240)
+    cache.put('f', {'key': 'f'}, 240)  # over the byte budget: 'a' is least recently used
+    assert cache.bytes == 960 and cache.get('a') == (False, None)
+
+    cache.put('short', 1, 10, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') == (False, None)
+
+    cache.put('backtest:1', 1, 10)
+    cache.put('backtest:2', 2, 10)
+    cache.discard_pattern('backtest:*')
+    assert not cache.get('backtest:1')[0] and not cache.get('backtest:2')[0]
+    assert cache.bytes == sum(entry[1] for entry in cache.entries.values())
+
+    print("   ✅ L1 evicts by entries, bytes and TTL")
+    print()
+
+
+if __name__ == '__main__':
+    test_local_cache_limits()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test Single-Flight Cache Computation
+Concurrent identical misses must compute once; a lock left by a crashed holder
+must expire instead of blocking the key (requires Redis; the backtest test
+uses the in-memory cache stand-in)
+"""
+
+import threading
+import time
+from cache_service import CacheService
+from crypto_backtest_service import CryptoBacktestService
+from test_result_format import DictCache
+from test_shared_price_panel import make_price_data
+
+
+def test_single_flight():
+    """One of several concurrent callers computes; the others get its result"""
+
+    print("=" * 80)
+    print("🛫 SINGLE-FLIGHT CACHE TEST")
+    print("=" * 80)
+
+    cache = CacheService()
+    if not cache.enabled:
+        print("❌ Redis cache not available")
+        return
+
+    key = 'test_single_flight:result'
+    cache.delete(key)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.5)
+        return {'value': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_cached_or_compute(key, compute, ttl=60)))
+               for _ in range(8)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1, f"computed {len(calls)} times"
+    assert results == [{'value': 42}] * 8
+    print(f"   8 concurrent misses, 1 computation, {time.time() - start:.2f}s")
+
+    # A holder that never releases: the lock expires and a waiter computes
+    cache.delete(key)
+    assert cache.acquire_lock(key, ttl=1)
+    start = time.time()
+    assert cache.get_cached_or_compute(key, lambda: {'value': 7}, ttl=60) == {'value': 7}
+    assert 0.9 <= time.time() - start < 5
+    cache.delete(key)
+
+    print("   ✅ Concurrent misses coalesced; abandoned locks expire")
+    print()
+
+
+def test_concurrent_identical_backtests_compute_once():
+    """Two concurrent identical run_backtest calls: one computes, the other waits for its result"""
+    service = CryptoBacktestService(enable_cache=False)
+    service.cache = DictCache()
+    price_data = make_price_data(n_coins=1)[1]
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    parameters = {'rsi_period': 14, 'oversold_threshold': 30, 'overbought_threshold': 70,
+                  'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    # The computing call holds its lock until the other call is waiting on it
+    waiting = threading.Event()
+    computed = []
+    add_price_history, wait_for = service._add_price_history, service.cache.wait_for
+
+    def counted_add_price_history(result, df):
+        computed.append(1)
+        assert waiting.wait(timeout=30), "second call never waited for the lock"
+        add_price_history(result, df)
+
+    def signalled_wait_for(key, timeout=None):
+        waiting.set()
+        return wait_for(key, timeout=30)
+
+    service._add_price_history = counted_add_price_history
+    service.cache.wait_for = signalled_wait_for
+
+    results = []
+    run = lambda: results.append(service.run_backtest(1, 1, parameters, price_data=price_data, strategy=strategy))
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert len(computed) == 1, f"computed {len(computed)} times"
+    assert sorted(result['from_cache'] for result in results) == [False, True]
+    assert all(result['success'] for result in results)
+    assert results[0]['final_value'] == results[1]['final_value']
+    assert not service.cache.locks
+
+
+if __name__ == '__main__':
+    test_single_flight()
+    test_concurrent_identical_backtests_compute_once()
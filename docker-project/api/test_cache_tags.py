@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test Tag-Based Cache Invalidation
+Sets tagged entries and checks that invalidating a coin's tag deletes exactly
+its entries (requires Redis; the backtest test uses the in-memory cache stand-in)
+"""
+
+from cache_service import CacheService, crypto_tag, strategy_tag
+from crypto_backtest_service import CryptoBacktestService
+from test_result_format import STRATEGIES, DictCache
+from test_shared_price_panel import make_price_data
+
+
+def test_tag_invalidation():
+    """invalidate_tags deletes the tagged keys, from Redis and from L1"""
+
+    print("=" * 80)
+    print("🏷️ CACHE TAG INVALIDATION TEST")
+    print("=" * 80)
+
+    cache = CacheService()
+    if not cache.enabled:
+        print("❌ Redis cache not available")
+        return
+
+    crypto_id, other_id, strategy_id = 999001, 999002, 999003
+    keys = {(crypto, n): f'test_tags:{crypto}:{n}' for crypto in (crypto_id, other_id) for n in range(3)}
+    for (crypto, n), key in keys.items():
+        cache.set(key, {'crypto': crypto, 'n': n}, ttl=60, tags=[crypto_tag(crypto), strategy_tag(strategy_id)])
+    assert len(cache.get_many(list(keys.values()))) == len(keys)
+
+    assert cache.invalidate_tags(crypto_tag(crypto_id)) == 3
+    for (crypto, n), key in keys.items():
+        assert (cache.get(key) is None) == (crypto == crypto_id)
+    assert cache.invalidate_tags(crypto_tag(crypto_id)) == 0
+
+    # Keys of the other coin are still indexed by the strategy tag
+    assert cache.invalidate_tags(strategy_tag(strategy_id)) == 3
+    assert not cache.get_many(list(keys.values()))
+    assert cache.clear_pattern('test_tags:*') == 0
+
+    print("   ✅ Tagged entries invalidated per coin and per strategy")
+    print()
+
+
+def test_backtest_tag_invalidation():
+    """Backtest results are tagged by coin and strategy; invalidating a tag drops exactly its entries"""
+    service = CryptoBacktestService(enable_cache=False)
+    service.cache = DictCache()
+    price_data = make_price_data(n_coins=2)
+    strategies = {1: {'id': 1, 'name': 'RSI Buy/Sell'}, 2: {'id': 2, 'name': 'Bollinger Bands'}}
+    parameters = lambda strategy_id: {**STRATEGIES[strategies[strategy_id]['name']],
+                                      'initial_investment': 10000, 'transaction_fee': 0.1}
+    run = lambda strategy_id, crypto_id: service.run_backtest(strategy_id, crypto_id, parameters(strategy_id),
+                                                              price_data=price_data[crypto_id],
+                                                              strategy=strategies[strategy_id])
+    results = lambda: sorted(key for key in service.cache.store if key.startswith('backtest:'))
+
+    for strategy_id in strategies:
+        for crypto_id in price_data:
+            assert run(strategy_id, crypto_id)['success']
+    assert len(results()) == 4
+    assert run(1, 1)['from_cache']
+
+    # A coin's tag drops its results under every strategy, not the other coin's
+    kept = [key for key in results() if '"crypto_id": 2' in key]
+    assert service.cache.invalidate_tags(crypto_tag(1)) == 2
+    assert results() == kept
+    assert not run(1, 1)['from_cache']
+
+    # A strategy's tag also drops its checkpoints
+    assert service.cache.invalidate_tags(strategy_tag(1)) == 4
+    assert all('"strategy_id": 1' not in key for key in service.cache.store)
+    assert results() == [key for key in kept if '"strategy_id": 2' in key]
+
+
+if __name__ == '__main__':
+    test_tag_invalidation()
+    test_backtest_tag_invalidation()
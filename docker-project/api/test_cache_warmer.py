@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test Backtest Cache Warmer Planning
+Checks that the warm-up plan covers every active strategy's defaults followed by
+the most-requested run-alls from the usage log (requires Redis, no database)
+"""
+
+import cache_warmer
+from cache_warmer import CacheWarmer
+
+
+class PlanningService:
+    """Two active strategies with one parameter each (what the planner reads)"""
+
+    def get_available_strategies(self):
+        return [{'id': 1, 'name': 'RSI Buy/Sell'}, {'id': 2, 'name': 'Moving Average Crossover'}]
+
+    def canonical_parameters(self, strategy_id, parameters):
+        if int(parameters.get('period', 14)) < 2:
+            raise ValueError("'period' must be at least 2")
+        return {'period': int(parameters.get('period', 14))}
+
+
+def test_warm_plan():
+    """Defaults first, then requests by popularity; invalid and inactive requests are left out"""
+
+    print("=" * 80)
+    print("🔥 CACHE WARMER PLAN TEST")
+    print("=" * 80)
+
+    cache_warmer.USAGE_KEY = 'test_cache_warmer:usage:{day}'
+    warmer = CacheWarmer(PlanningService(), top_requests=2)
+    if not warmer.cache.enabled:
+        print("❌ Redis cache not available")
+        return
+    warmer.cache.clear_pattern('test_cache_warmer:*')
+
+    for _ in range(3):
+        warmer.record_request(2, {'period': '50'}, '2024-01-01', '2024-12-31')
+    warmer.record_request(1, {'period': 7}, interval='1h')
+    warmer.record_request(1, {'period': 1})  # invalid: not counted
+    warmer.record_request(1, {'period': None})  # not a number: not counted
+    warmer.record_request(1, {})  # the defaults: already planned
+
+    plan = warmer.plan()
+    assert [(run['strategy_id'], run['parameters']['period']) for run in plan] == [(1, 14), (2, 14), (2, 50), (1, 7)]
+    assert plan[2]['start_date'] == '2024-01-01' and plan[3]['interval'] == '1h'
+
+    warmer.cache.clear_pattern('test_cache_warmer:*')
+    print("   ✅ Plan: defaults, then the most-requested run-alls")
+    print()
+
+
+if __name__ == '__main__':
+    test_warm_plan()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test Chart Downsampling
+Downsamples an hourly backtest's price history with LTTB and checks the point
+budget, trade markers and row/columnar consistency (synthetic prices, no
+database required)
+"""
+
+import json
+import numpy as np
+from backtest_result_format import convert_result
+from chart_downsampling import lttb_indices
+from crypto_backtest_service import CryptoBacktestService
+from test_result_format import make_hourly_frame
+
+
+def test_lttb_keeps_shape():
+    """LTTB keeps the end points and (nearly) the extremes of a noisy series"""
+    rng = np.random.default_rng(2)
+    values = np.cumsum(rng.normal(0, 1, 20000))
+    indices = lttb_indices(values, 500)
+    assert len(indices) == 500 and indices[0] == 0 and indices[-1] == len(values) - 1
+    assert np.all(np.diff(indices) > 0)
+    value_range = values.max() - values.min()
+    assert values[indices].max() > values.max() - 0.02 * value_range
+    assert values[indices].min() < values.min() + 0.02 * value_range
+    assert len(lttb_indices(values[:100], 500)) == 100
+
+
+def test_downsampled_backtest_result():
+    """Hourly results fit the budget, keep every trade and match across formats"""
+
+    print("=" * 80)
+    print("📉 CHART DOWNSAMPLING TEST")
+    print("=" * 80)
+
+    service = CryptoBacktestService(enable_cache=False)
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    params = {'rsi_period': 14, 'oversold_threshold': 30, 'overbought_threshold': 70,
+              'initial_investment': 10000, 'transaction_fee': 0.1}
+    run = lambda **kwargs: service.run_backtest(1, 1, params, interval='1h', price_data=make_hourly_frame(),
+                                                strategy=strategy, **kwargs)
+
+    full = run()
+    chart = run(max_points=1000)
+    assert len(full['price_history']) == chart['price_history_points']
+    assert len(chart['price_history']) <= 1000
+    assert chart['trades'] == full['trades']
+
+    # Every trade has its own point (same date and execution price)
+    points = {(point['date'], point['price']) for point in chart['price_history']}
+    assert all((trade['date'], trade['price']) in points for trade in full['trades'])
+    assert chart['price_history'][0] == full['price_history'][0]
+    assert chart['price_history'][-1] == full['price_history'][-1]
+
+    columnar = run(max_points=1000, result_format='columnar')
+    assert convert_result(columnar, 'rows')['price_history'] == chart['price_history']
+
+    print(f"   {len(full['price_history'])} points -> {len(chart['price_history'])} "
+          f"({len(full['trades'])} trades kept), "
+          f"{len(json.dumps(full)) / 1024:.0f} KB -> {len(json.dumps(chart)) / 1024:.0f} KB")
+    print("   ✅ Downsampled history keeps every trade within the point budget")
+    print()
+
+
+if __name__ == '__main__':
+    test_lttb_keeps_shape()
+    test_downsampled_backtest_result()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test Intra-Bar Stop Execution
+Compares the kernel's low/high stop-loss and take-profit evaluation with a
+bar-by-bar reference, checks the panel kernel and the service parameter, and
+times the overhead (synthetic prices, no database required)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from crypto_backtest_service import CryptoBacktestService
+from test_panel_backtest import STRATEGIES
+from test_shared_price_panel import make_price_data
+from vectorized_indicators import VectorizedIndicators, VectorizedBacktestEngine
+
+
+def make_ohlc(rng, n):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    previous = np.concatenate(([close[0]], close[:-1]))
+    lows = np.minimum(previous, close) * (1 - np.abs(rng.normal(0, 0.015, n)))
+    highs = np.maximum(previous, close) * (1 + np.abs(rng.normal(0, 0.015, n)))
+    return close, lows, highs
+
+
+def reference_loop(close, lows, highs, entries, exits, tradable, stop_loss, take_profit, fill):
+    """Bar-by-bar intra-bar stops: stop first, then take profit, then the close-based exit"""
+    cash, position, entry_price = 10000.0, 0.0, 0.0
+    trades = []
+    for i in range(len(close)):
+        if not tradable[i]:
+            continue
+        if position > 0:
+            stop_level = entry_price * (1 - stop_loss)
+            target = entry_price * (1 + take_profit)
+            if lows[i] <= stop_level:
+                price, reason = (lows[i] if fill == 'worst' else min(stop_level, highs[i])), 'stop_loss'
+            elif highs[i] >= target:
+                price, reason = (target if fill == 'worst' else max(target, lows[i])), 'take_profit'
+            elif exits[i]:
+                price, reason = close[i], 'signal'
+            else:
+                continue
+            sell_value = position * price
+            cash = sell_value * (1 - 0.001)
+            position = 0.0
+            trades.append((i, 'SELL', reason))
+            continue
+        if entries[i]:
+            position = cash * (1 - 0.001) / close[i]
+            entry_price, cash = close[i], 0.0
+            trades.append((i, 'BUY', None))
+    return trades, cash + position * close[-1]
+
+
+def test_kernel_matches_reference():
+    """Intra-bar triggers, fills and reasons must match the reference loop"""
+
+    print("=" * 80)
+    print("🕯️  INTRA-BAR STOP TEST")
+    print("=" * 80)
+
+    rng = np.random.default_rng(21)
+    stops = 0
+    for seed in range(10):
+        close, lows, highs = make_ohlc(rng, 1500)
+        rsi = VectorizedIndicators.calculate_rsi_vectorized(close, 14)
+        tradable = ~np.isnan(rsi)
+        for fill in ('stop', 'worst'):
+            expected_trades, expected_final = reference_loop(close, lows, highs, rsi < 30, rsi > 70,
+                                                             tradable, 0.04, 0.06, fill)
+            run = VectorizedBacktestEngine.execute_trades_vectorized(
+                close, rsi < 30, 10000.0, fee_rate=0.001, exit_signals=rsi > 70, tradable=tradable,
+                stop_loss=0.04, take_profit=0.06, lows=lows, highs=highs, fill=fill
+            )
+            actual = [(t['index'], t['action'], t.get('reason')) for t in run['trades']]
+            assert actual == expected_trades, (seed, fill)
+            assert np.isclose(run['final_value'], expected_final), (seed, fill)
+            stops += sum(reason == 'stop_loss' for _, _, reason in actual)
+
+    # Low/high equal to the close reproduce the close-based kernel (fill='stop')
+    close, _, _ = make_ohlc(rng, 1500)
+    rsi = VectorizedIndicators.calculate_rsi_vectorized(close, 14)
+    args = (close, rsi < 30, 10000.0)
+    options = dict(exit_signals=rsi > 70, tradable=~np.isnan(rsi), stop_loss=0.04, take_profit=0.06)
+    on_close = VectorizedBacktestEngine.execute_trades_vectorized(*args, **options)
+    flat_bars = VectorizedBacktestEngine.execute_trades_vectorized(*args, lows=close, highs=close, **options)
+    assert flat_bars['trades'] == on_close['trades']
+    print(f"   ✅ Intra-bar stops match the reference loop ({stops} stop-loss exits)")
+
+
+def test_service_intrabar_stops():
+    """stop_fill reaches single-coin and panel backtests; stops fill at the level"""
+    price_data = make_price_data()
+    service = CryptoBacktestService(enable_cache=False)
+    strategy = {'id': 3, 'name': 'Price Momentum'}
+    params = {**STRATEGIES['Price Momentum'], 'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    intrabar = {**params, 'stop_fill': 'stop'}
+    panel = service.run_panel_backtest(strategy, intrabar, price_data)
+    for crypto_id, df in price_data.items():
+        result = service.run_backtest(3, crypto_id, intrabar, price_data=df, strategy=strategy)
+        strip = lambda r: {k: v for k, v in r.items() if k != 'calculation_time_ms'}
+        assert strip(panel[crypto_id]) == strip(result), crypto_id
+
+    # make_price_data lows sit 3% under the close: a 5% stop fills at exactly -5%
+    result = service.run_backtest(3, 1, intrabar, price_data=price_data[1], strategy=strategy)
+    close_based = service.run_backtest(3, 1, params, price_data=price_data[1], strategy=strategy)
+    trades = result['trades']
+    stops = [sell['price'] / buy['price'] - 1 for buy, sell in zip(trades[::2], trades[1::2])
+             if sell['trigger'].endswith('stop loss')]
+    assert stops and np.allclose(stops, -0.05)
+    assert result['trades'] != close_based['trades']
+
+    invalid = service.run_backtest(3, 1, {**params, 'stop_fill': 'open'}, price_data=price_data[1],
+                                   strategy=strategy)
+    assert not invalid['success'] and 'stop_fill' in invalid['error']
+    print("   ✅ stop_fill drives single-coin and panel backtests alike")
+
+
+def test_intrabar_overhead():
+    """Intra-bar evaluation runs on the same arrays without a measurable slowdown"""
+    rng = np.random.default_rng(8)
+    close, lows, highs = make_ohlc(rng, 5 * 8760)
+    rsi = VectorizedIndicators.calculate_rsi_vectorized(close, 14)
+    options = dict(exit_signals=rsi > 70, tradable=~np.isnan(rsi), stop_loss=0.05, take_profit=0.1,
+                   timestamps=pd.date_range('2020-01-01', periods=len(close), freq='h'),
+                   cooldown=pd.Timedelta(hours=24))
+
+    timings = {}
+    for name, extra in (('close', {}), ('intra-bar', {'lows': lows, 'highs': highs})):
+        start = time.time()
+        for _ in range(5):
+            VectorizedBacktestEngine.execute_trades_vectorized(close, rsi < 30, 10000.0, **options, **extra)
+        timings[name] = (time.time() - start) / 5
+    print(f"   Close-based: {timings['close']*1000:.1f}ms  Intra-bar: {timings['intra-bar']*1000:.1f}ms "
+          f"(5 years hourly)")
+    print()
+
+
+if __name__ == '__main__':
+    test_kernel_matches_reference()
+    test_service_intrabar_stops()
+    test_intrabar_overhead()
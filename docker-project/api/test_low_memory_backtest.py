@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test Low-Memory Hourly Backtest
+Runs every strategy chunk by chunk on float32 hourly prices and compares with
+the regular backtest of the same prices (synthetic prices, no database required)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from crypto_backtest_service import CryptoBacktestService
+from test_panel_backtest import STRATEGIES
+from test_result_format import make_hourly_frame
+
+
+def make_float32_frame():
+    """Hourly frame shaped like get_price_arrays: float32 closes over a datetime index"""
+    df = make_hourly_frame()
+    return pd.DataFrame(df['close_price'].to_numpy(dtype=np.float32)[:, None], index=df.index,
+                        columns=['close_price'], copy=False)
+
+
+def test_chunked_matches_regular_backtest():
+    """Chunk boundaries must not change trades; values agree to float32 precision"""
+
+    print("=" * 80)
+    print("🪶 LOW-MEMORY BACKTEST TEST")
+    print("=" * 80)
+
+    df = make_float32_frame()
+    os.environ['BACKTEST_CHUNK_BARS'] = '1500'  # ~12 chunk boundaries over two years
+    service = CryptoBacktestService(enable_cache=False)
+
+    for strategy_id, (name, params) in enumerate(STRATEGIES.items(), start=1):
+        params = {**params, 'initial_investment': 10000, 'transaction_fee': 0.1}
+        strategy = {'id': strategy_id, 'name': name}
+        run = lambda **kwargs: service.run_backtest(strategy_id, 1, params, interval='1h', price_data=df,
+                                                    strategy=strategy, **kwargs)
+
+        expected = run()
+        result = run(low_memory=True)
+        assert result['memory']['price_data_mb'] < 0.3 and result['memory']['peak_rss_mb'] > 0
+        if not expected['success']:
+            assert result['error'] == expected['error'], name
+            continue
+
+        assert result['trades'] == expected['trades'], name
+        assert np.isclose(result['final_value'], expected['final_value'], rtol=1e-6), name
+        assert result['max_drawdown'] == expected['max_drawdown'] or \
+            np.isclose(result['max_drawdown'], expected['max_drawdown'], atol=0.01), name
+        assert len(result['price_history']) == len(expected['price_history'])
+        print(f"   {name:26s} {result['total_trades']:4d} trades, "
+              f"peak RSS {result['memory']['peak_rss_mb']:.0f} MB")
+
+    del os.environ['BACKTEST_CHUNK_BARS']
+    print("   ✅ Chunked float32 backtests match regular backtests")
+    print()
+
+
+if __name__ == '__main__':
+    test_chunked_matches_regular_backtest()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Parameter Sweep
+Verifies sweep results against individual backtests and measures throughput
+(synthetic prices, no database required)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from crypto_backtest_service import CryptoBacktestService
+
+
+def make_price_data(n_coins=5, n_days=1000):
+    """Random-walk daily closes for a few fake coins"""
+    rng = np.random.default_rng(42)
+    index = pd.date_range('2022-01-01', periods=n_days, freq='D')
+    return {
+        crypto_id: pd.DataFrame({'close_price': 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n_days)))},
+                                index=index)
+        for crypto_id in range(1, n_coins + 1)
+    }
+
+
+def test_parameter_sweep():
+    """Sweep ranking must agree with running each combination individually"""
+
+    print("=" * 80)
+    print("🚀 PARAMETER SWEEP TEST")
+    print("=" * 80)
+    print()
+
+    price_data = make_price_data()
+    service = CryptoBacktestService(enable_cache=False)
+    service.get_strategy = lambda strategy_id: {'id': strategy_id, 'name': 'RSI Buy/Sell'}
+    service.get_price_data_batch = lambda crypto_ids, **kwargs: {i: price_data[i] for i in crypto_ids}
+
+    base_parameters = {'initial_investment': 10000, 'transaction_fee': 0.1}
+    parameter_grid = {
+        'rsi_period': [7, 14, 21],
+        'oversold_threshold': {'min': 20, 'max': 35, 'step': 5},
+        'overbought_threshold': [65, 70, 75, 80],
+        'stop_loss_threshold': [5, 10, 20],
+    }
+
+    start = time.time()
+    result = service.run_parameter_sweep(1, parameter_grid, base_parameters,
+                                         crypto_ids=list(price_data.keys()), top_n=10)
+    elapsed = time.time() - start
+
+    print(f"   Combinations: {result['total_combinations']} x {result['cryptocurrencies']} coins")
+    print(f"   ⏱️  Time: {elapsed:.2f}s ({result['evaluations_per_second']} evaluations/s)")
+    print(f"   🏆 Best: {result['ranking'][0]['parameters']} -> {result['ranking'][0]['average_return']}%")
+    print()
+
+    assert result['total_combinations'] == 3 * 4 * 4 * 3
+    grid = result['sensitivity_grid']
+    assert grid['x_parameter'] == 'rsi_period' and len(grid['values']) == 3 and len(grid['values'][0]) == 4
+
+    # Spot-check the top combinations against individual backtests
+    for entry in result['ranking'][:3]:
+        params = {**base_parameters, **entry['parameters']}
+        returns = [service.backtest_rsi_strategy(df, params)['total_return'] for df in price_data.values()]
+        assert round(float(np.mean(returns)), 2) == entry['average_return'], entry
+
+    print("   ✅ Ranking matches individual backtests")
+    print()
+
+
+if __name__ == '__main__':
+    test_parameter_sweep()
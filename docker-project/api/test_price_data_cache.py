@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test Price Data Cache Encoding
+Round-trips daily and hourly price frames through the binary cache format and
+compares size and speed with JSON (synthetic prices, no Redis required)
+"""
+
+import json
+import time
+import numpy as np
+import pandas as pd
+from price_data_cache import encode_frame, decode_frame
+from test_result_format import make_hourly_frame
+from test_shared_price_panel import make_price_data
+
+
+def test_frame_round_trip():
+    """Decoded frames must equal the originals (values, index, time zone, column order)"""
+
+    print("=" * 80)
+    print("📦 PRICE DATA CACHE ENCODING TEST")
+    print("=" * 80)
+
+    daily = make_price_data(n_coins=1)[1]
+    hourly = make_hourly_frame()
+    hourly['volume'] = np.nan
+    aware = daily.tz_localize('UTC')
+
+    for label, df in (('daily', daily), ('hourly', hourly), ('tz-aware', aware)):
+        start = time.perf_counter()
+        payload = encode_frame(df)
+        decoded = decode_frame(payload)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        pd.testing.assert_frame_equal(decoded, df.astype(np.float64), check_freq=False)
+        assert decoded.index.name == 'datetime'
+        json_bytes = len(json.dumps({'index': df.index.astype(str).tolist(),
+                                     **{name: df[name].tolist() for name in df.columns}}))
+        print(f"   {label:9s} {len(df):6d} bars: {len(payload) / 1024:7.1f} KB "
+              f"({json_bytes / len(payload):.1f}x smaller than JSON), round trip {elapsed:.1f}ms")
+
+    print("   ✅ Price frames round-trip exactly")
+    print()
+
+
+if __name__ == '__main__':
+    test_frame_round_trip()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Columnar Result Format
+Checks that columnar results round-trip to the exact row results (also
+through the cache) and compares payload size and serialization time
+(synthetic prices, no database or Redis required)
+"""
+
+import json
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from backtest_result_format import convert_result
+from crypto_backtest_service import CryptoBacktestService
+
+STRATEGIES = {
+    'RSI Buy/Sell': {'rsi_period': 14, 'oversold_threshold': 30, 'overbought_threshold': 70},
+    'Moving Average Crossover': {'short_ma_period': 20, 'long_ma_period': 50},
+    'Bollinger Bands': {'ma_period': 20, 'std_multiplier': 2},
+    'Mean Reversion': {'ma_period': 20, 'deviation_threshold': 2},
+}
+
+
+class DictCache:
+    """In-memory stand-in for CacheService (JSON round trip like Redis, thread-safe locks)"""
+    enabled = True
+
+    def __init__(self):
+        self.store = {}
+        self.counters = {}
+        self.tags = {}
+        self.locks = {}
+        self.released = threading.Condition()
+
+    def generate_cache_key(self, prefix, **params):
+        return f"{prefix}:{json.dumps(params, sort_keys=True)}"
+
+    def get(self, key):
+        return json.loads(self.store[key]) if key in self.store else None
+
+    def set(self, key, value, ttl=None, tags=None):
+        self.store[key] = json.dumps(value)
+        for tag in tags or ():
+            self.tags.setdefault(tag, set()).add(key)
+        return True
+
+    def invalidate_tags(self, *tags):
+        keys = set().union(*(self.tags.pop(tag, set()) for tag in tags))
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def increment_counters(self, key, counts):
+        counters = self.counters.setdefault(key, {})
+        for field, amount in counts.items():
+            counters[field] = counters.get(field, 0) + amount
+        return True
+
+    def get_counters(self, pattern):
+        prefix = pattern.rstrip('*')
+        return {key: dict(counts) for key, counts in self.counters.items() if key.startswith(prefix)}
+
+    def acquire_lock(self, key, ttl=None):
+        with self.released:
+            if key in self.locks:
+                return None
+            self.locks[key] = uuid.uuid4().hex
+            return self.locks[key]
+
+    def release_lock(self, key, token):
+        with self.released:
+            if token and self.locks.get(key) == token:
+                del self.locks[key]
+            self.released.notify_all()
+
+    def wait_for(self, key, timeout=None):
+        with self.released:
+            self.released.wait_for(lambda: key not in self.locks, timeout or 10)
+        return self.get(key)
+
+
+def make_hourly_frame(years=2):
+    rng = np.random.default_rng(3)
+    n = years * 8760
+    index = pd.date_range('2022-01-01', periods=n, freq='h', name='datetime')
+    return pd.DataFrame({'close_price': 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))}, index=index)
+
+
+def test_columnar_round_trip():
+    """Columnar results (direct and cached) must rebuild the exact row results"""
+
+    print("=" * 80)
+    print("📐 COLUMNAR RESULT FORMAT TEST")
+    print("=" * 80)
+
+    df = make_hourly_frame()
+    service = CryptoBacktestService(enable_cache=False)
+    service.cache = DictCache()
+
+    for strategy_id, (name, params) in enumerate(STRATEGIES.items(), start=1):
+        params = {**params, 'initial_investment': 10000, 'transaction_fee': 0.1, 'stop_loss_threshold': 10}
+        strategy = {'id': strategy_id, 'name': name}
+        run = lambda result_format: service.run_backtest(strategy_id, 1, params, interval='1h',
+                                                         price_data=df, strategy=strategy,
+                                                         result_format=result_format)
+
+        rows = run('rows')
+        assert rows['success'] and rows['trades'], name
+        columnar = run('columnar')
+        columnar32 = run('columnar32')
+        assert columnar['from_cache'] and columnar['result_format'] == 'columnar'
+
+        strip = lambda result: {k: v for k, v in result.items()
+                                if k not in ('from_cache', 'cache_key', 'calculation_time_ms')}
+        assert strip(convert_result(columnar, 'rows')) == strip(rows), name
+        assert [list(t) for t in convert_result(columnar, 'rows')['trades']] == [list(t) for t in rows['trades']]
+        assert len(columnar32['price_history']['price']) == len(rows['price_history'])
+
+        start = time.time()
+        rows_json = json.dumps(rows)
+        rows_time = time.time() - start
+        start = time.time()
+        columnar_json = json.dumps(columnar)
+        columnar_time = time.time() - start
+        columnar32_json = json.dumps(columnar32)
+
+        print(f"   {name:26s} rows {len(rows_json)/1024:7.0f} KB ({rows_time*1000:5.1f}ms)  "
+              f"columnar {len(columnar_json)/1024:6.0f} KB ({columnar_time*1000:5.1f}ms)  "
+              f"float32 {len(columnar32_json)/1024:6.0f} KB")
+        assert len(columnar_json) * 1.5 < len(rows_json) and len(columnar32_json) * 3 < len(rows_json)
+
+    print("   ✅ Columnar results round-trip exactly")
+    print()
+
+
+if __name__ == '__main__':
+    test_columnar_round_trip()
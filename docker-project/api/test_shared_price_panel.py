@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test Shared-Memory Price Panel
+Runs parallel backtests against a SharedPricePanel and compares them with
+backtests on the original frames (synthetic prices, no database required)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from crypto_backtest_service import CryptoBacktestService
+from shared_price_panel import SharedPricePanel
+
+
+def make_price_data(n_coins=12, n_days=800):
+    """Random-walk daily OHLCV for a few fake coins with different histories"""
+    rng = np.random.default_rng(5)
+    price_data = {}
+    for crypto_id in range(1, n_coins + 1):
+        days = n_days - 40 * crypto_id
+        index = pd.date_range('2022-01-01', periods=days, freq='D', name='datetime')
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        price_data[crypto_id] = pd.DataFrame({
+            'open_price': close * 0.99, 'high_price': close * 1.02, 'low_price': close * 0.97,
+            'close_price': close, 'volume': rng.uniform(1e5, 1e6, days)
+        }, index=index)
+    return price_data
+
+
+def test_panel_roundtrip():
+    """Frames read back from the panel must equal the frames written"""
+    price_data = make_price_data()
+    panel = SharedPricePanel.create(price_data)
+    try:
+        worker_view = SharedPricePanel.attach(panel.descriptor)
+        for crypto_id, df in price_data.items():
+            pd.testing.assert_frame_equal(worker_view.frame(crypto_id), df, check_freq=False)
+        assert worker_view.frame(999).empty
+        worker_view.close()
+    finally:
+        panel.close()
+    print("   ✅ Panel round-trip preserves every frame")
+
+
+def test_parallel_backtests_shared():
+    """Parallel backtests over the panel must match direct backtests"""
+
+    print("=" * 80)
+    print("📦 SHARED-MEMORY PRICE PANEL TEST")
+    print("=" * 80)
+
+    price_data = make_price_data()
+    cryptos = [{'id': crypto_id, 'symbol': f'C{crypto_id}', 'name': f'Coin {crypto_id}',
+                'total_records': len(df), 'days_of_data': len(df)}
+               for crypto_id, df in price_data.items()]
+    cryptos.append({'id': 999, 'symbol': 'EMPTY', 'name': 'No data', 'total_records': 0, 'days_of_data': 0})
+
+    service = CryptoBacktestService(enable_cache=False)
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    service.get_strategy = lambda strategy_id: strategy
+    service.get_price_data_batch = lambda crypto_ids, **kwargs: {i: price_data[i] for i in crypto_ids
+                                                                 if i in price_data}
+    parameters = {'rsi_period': 14, 'oversold_threshold': 30, 'overbought_threshold': 70,
+                  'initial_investment': 10000, 'transaction_fee': 0.1}
+
+    start = time.time()
+    results = service._run_parallel_backtests(1, parameters, cryptos)
+    elapsed = time.time() - start
+
+    for crypto, result in zip(cryptos, results):
+        if crypto['id'] not in price_data:
+            assert not result['success']
+            continue
+        expected = service.run_backtest(1, crypto['id'], parameters, price_data=price_data[crypto['id']],
+                                        strategy=strategy)
+        for key in ('final_value', 'total_return', 'total_trades', 'max_drawdown', 'trades', 'price_history'):
+            assert result[key] == expected[key], (crypto['symbol'], key)
+
+    print(f"   ⏱️  {len(cryptos)} backtests in {elapsed:.2f}s")
+    print("   ✅ Results match direct backtests")
+    print()
+
+
+if __name__ == '__main__':
+    test_panel_roundtrip()
+    test_parallel_backtests_shared()
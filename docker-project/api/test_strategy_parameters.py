@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test Strategy Parameter Normalization
+Checks coercion and validation against crypto_strategy_parameters-style
+schemas, that equivalent payloads share one cache entry, and the per-strategy
+hit-rate counters (in-memory cache stand-in, no database or Redis required)
+"""
+
+import json
+import time
+from crypto_backtest_service import CryptoBacktestService
+from strategy_parameters import normalize_parameters, schema_entry
+from test_result_format import DictCache
+from test_shared_price_panel import make_price_data
+
+# RSI Buy/Sell rows of add_crypto_strategy_tables.sql
+RSI_SCHEMA = {
+    'initial_investment': schema_entry('number', '1000', 100, 100000),
+    'rsi_period': schema_entry('integer', '14', 5, 50),
+    'oversold_threshold': schema_entry('number', '30', 10, 40),
+    'overbought_threshold': schema_entry('number', '70', 60, 90),
+    'transaction_fee': schema_entry('percentage', '0.1', 0, 2),
+}
+
+
+def expect_error(parameters, fragment):
+    try:
+        normalize_parameters(parameters, RSI_SCHEMA)
+    except ValueError as e:
+        assert fragment in str(e), str(e)
+    else:
+        raise AssertionError(f"{parameters} accepted")
+
+
+def test_normalize_parameters():
+    """Types are coerced, defaults filled, unknown keys dropped and ranges enforced"""
+
+    print("=" * 80)
+    print("🧾 STRATEGY PARAMETER NORMALIZATION TEST")
+    print("=" * 80)
+
+    canonical = normalize_parameters({'rsi_period': '14', 'oversold_threshold': '30'}, RSI_SCHEMA)
+    assert canonical == {'stop_fill': 'close', 'initial_investment': 1000.0, 'rsi_period': 14,
+                         'oversold_threshold': 30.0, 'overbought_threshold': 70.0, 'transaction_fee': 0.1}
+    spelled_out = normalize_parameters({'rsi_period': 14.0, 'oversold_threshold': 30, 'overbought_threshold': '70',
+                                        'initial_investment': 1000, 'transaction_fee': '0.10',
+                                        'stop_fill': ' close ', 'ui_tab': 'advanced'}, RSI_SCHEMA)
+    assert json.dumps(spelled_out, sort_keys=True) == json.dumps(canonical, sort_keys=True)
+    assert normalize_parameters({'rsi_period': ''}, RSI_SCHEMA)['rsi_period'] == 14
+
+    # Omitted parameters the strategy code defaults itself keep that default, not the schema's 24h
+    sr_schema = {'cooldown_value': schema_entry('integer', '24', 0, 168), 'cooldown_unit': schema_entry('text', 'hours')}
+    assert normalize_parameters({}, sr_schema) == {'stop_fill': 'close', 'cooldown_value': 0, 'cooldown_unit': 'hours'}
+    assert normalize_parameters({'cooldown_value': '24'}, sr_schema)['cooldown_value'] == 24
+
+    expect_error({'rsi_period': 14.5}, 'rsi_period')
+    expect_error({'rsi_period': 'fourteen'}, 'rsi_period')
+    expect_error({'rsi_period': True}, 'rsi_period')
+    expect_error({'rsi_period': 51}, 'at most 50')
+    expect_error({'oversold_threshold': 'nan'}, 'oversold_threshold')
+    expect_error({'transaction_fee': -1}, 'at least 0')
+    expect_error({'stop_fill': 'open'}, 'stop_fill')
+    print("   ✅ Parameters coerced, defaulted and validated against the schema")
+
+
+def test_equivalent_payloads_share_cache_entry():
+    """String/number and default-filled payloads hit the same cached result"""
+    price_data = make_price_data()
+    strategy = {'id': 1, 'name': 'RSI Buy/Sell'}
+    service = CryptoBacktestService(enable_cache=False)
+    service.cache = DictCache()
+    service.LOOKUP_FLUSH_SECONDS = 3600
+    CryptoBacktestService._parameter_schemas = (time.monotonic(), {1: RSI_SCHEMA})
+    try:
+        run = lambda parameters: service.run_backtest(1, 1, parameters, price_data=price_data[1], strategy=strategy)
+        computed = run({'rsi_period': '14', 'initial_investment': '10000', 'debug': True})
+        cached = run({'rsi_period': 14, 'initial_investment': 10000, 'oversold_threshold': 30,
+                      'overbought_threshold': 70, 'transaction_fee': 0.1, 'stop_fill': 'close'})
+        assert computed['success'] and not computed['from_cache']
+        # One result entry (a checkpoint is stored next to it)
+        assert cached['from_cache'] and len([key for key in service.cache.store if key.startswith('backtest:')]) == 1
+        assert cached['final_value'] == computed['final_value']
+
+        try:
+            run({'rsi_period': 3})
+        except ValueError as e:
+            assert 'rsi_period' in str(e)
+        else:
+            raise AssertionError('out-of-range rsi_period accepted')
+
+        # Strategies without a schema run with their parameters as sent
+        assert service.canonical_parameters(2, {'ma_period': '20'}) == {'ma_period': '20'}
+
+        # A failed schema load keeps the last schemas and is retried on the next call
+        def unreachable():
+            raise ConnectionError('database unreachable')
+        service.get_connection = unreachable
+        CryptoBacktestService._parameter_schemas = (None, {1: RSI_SCHEMA})
+        assert service.get_parameter_schemas() == {1: RSI_SCHEMA}
+        assert CryptoBacktestService._parameter_schemas[0] is None
+
+        # Lookups are counted in process and reach the shared counters when flushed
+        assert not service.cache.counters
+        assert service.get_cache_hit_rates() == [{'strategy_id': 1, 'lookups': 2, 'redis_hits': 1, 'store_hits': 0,
+                                                  'misses': 1, 'hit_rate': 50.0}]
+    finally:
+        CryptoBacktestService._parameter_schemas = (None, {})
+    print("   ✅ Equivalent payloads share one cache entry; hit rate tracked per strategy")
+    print()
+
+
+if __name__ == '__main__':
+    test_normalize_parameters()
+    test_equivalent_payloads_share_cache_entry()
@@ -6,8 +6,8 @@ Provides 3-5x speedup over pandas rolling operations
 
 import numpy as np
 import pandas as pd
-from scipy.ndimage import uniform_filter1d
-from typing import Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Optional, Tuple
 
 class VectorizedIndicators:
     """
@@ -20,13 +20,58 @@ class VectorizedIndicators:
     - Overall: 3-5x faster backtests
     """
     
+    @staticmethod
+    def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+        """
+        Mean of each bar's trailing window of `period` values
+        
+        Every value is reduced from its own window only. A running sum would
+        carry rounding from all earlier bars, so the same bar would get a
+        slightly different value depending on where the series starts;
+        resumed backtests (backtest_checkpoint) recompute indicators from a
+        warm-up window and rely on getting the full run's values.
+        
+        Args:
+            values: Value array (or 2-D time x asset matrix, computed per column)
+            period: Window length
+        
+        Returns:
+            Array of the input's shape, NaN before the first full window
+        """
+        return VectorizedIndicators._rolling(values, period, lambda windows: windows.mean(axis=-1))
+    
+    @staticmethod
+    def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+        """Sample standard deviation (ddof=1) of each bar's trailing window (see rolling_mean)"""
+        return VectorizedIndicators._rolling(values, period, lambda windows: windows.std(axis=-1, ddof=1))
+    
+    @staticmethod
+    def _rolling(values: np.ndarray, period: int, reduce, block_rows: int = 4096) -> np.ndarray:
+        """Apply `reduce` to blocks of strided windows (bounded temporaries; columns of a matrix one by one)"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 2:
+            result = np.empty(values.shape)
+            for j in range(values.shape[1]):
+                result[:, j] = VectorizedIndicators._rolling(np.ascontiguousarray(values[:, j]), period, reduce,
+                                                             block_rows)
+            return result
+        
+        result = np.full(len(values), np.nan)
+        if len(values) < period:
+            return result
+        windows = sliding_window_view(values, period)
+        for start in range(0, len(windows), block_rows):
+            block = windows[start:start + block_rows]
+            result[period - 1 + start:period - 1 + start + len(block)] = reduce(block)
+        return result
+    
     @staticmethod
     def calculate_rsi_vectorized(prices: np.ndarray, period: int = 14) -> np.ndarray:
         """
         Calculate RSI using vectorized NumPy operations
         
         Args:
-            prices: Price array
+            prices: Price array (or 2-D time x asset matrix, computed per column)
             period: RSI period (default: 14)
         
         Returns:
@@ -35,23 +80,18 @@ class VectorizedIndicators:
         Performance: ~10x faster than pandas rolling
         """
         if len(prices) < period + 1:
-            return np.full(len(prices), np.nan)
+            return np.full(np.shape(prices), np.nan)
         
         # Calculate price changes
-        deltas = np.diff(prices, prepend=prices[0])
+        deltas = np.diff(prices, axis=0, prepend=prices[:1])
         
         # Separate gains and losses
         gains = np.where(deltas > 0, deltas, 0.0)
         losses = np.where(deltas < 0, -deltas, 0.0)
         
-        # Calculate average gains and losses using uniform filter (moving average)
-        # uniform_filter1d is much faster than rolling operations
-        avg_gains = uniform_filter1d(gains, size=period, mode='constant', origin=-(period//2))
-        avg_losses = uniform_filter1d(losses, size=period, mode='constant', origin=-(period//2))
-        
-        # Shift to align with pandas rolling behavior
-        avg_gains = np.roll(avg_gains, period - 1)
-        avg_losses = np.roll(avg_losses, period - 1)
+        # Average gains and losses over each bar's window
+        avg_gains = VectorizedIndicators.rolling_mean(gains, period)
+        avg_losses = VectorizedIndicators.rolling_mean(losses, period)
         
         # Set initial values to NaN
         avg_gains[:period] = np.nan
@@ -80,22 +120,18 @@ class VectorizedIndicators:
         Calculate moving average using vectorized operations
         
         Args:
-            prices: Price array
+            prices: Price array (or 2-D time x asset matrix, computed per column)
             period: MA period
         
         Returns:
             Moving average array
         
-        Performance: ~48x faster than pandas rolling
+        Performance: one vectorized pass per block of windows (see rolling_mean)
         """
         if len(prices) < period:
-            return np.full(len(prices), np.nan)
+            return np.full(np.shape(prices), np.nan)
         
-        # Use uniform_filter1d for fast moving average
-        ma = uniform_filter1d(prices, size=period, mode='constant', origin=-(period//2))
-        
-        # Shift to align with pandas rolling behavior
-        ma = np.roll(ma, period - 1)
+        ma = VectorizedIndicators.rolling_mean(prices, period)
         
         # Set initial values to NaN
         ma[:period] = np.nan
@@ -133,26 +169,8 @@ class VectorizedIndicators:
         # Calculate moving average (middle band)
         middle_band = VectorizedIndicators.calculate_moving_average_vectorized(prices, period)
         
-        # Calculate rolling standard deviation using efficient strided approach
-        # Create strided view for vectorized std calculation
-        shape = (len(prices) - period + 1, period)
-        strides = (prices.strides[0], prices.strides[0])
-        
-        try:
-            # Use numpy stride tricks for efficient rolling std
-            from numpy.lib.stride_tricks import as_strided
-            windows = as_strided(prices, shape=shape, strides=strides)
-            rolling_std = np.std(windows, axis=1, ddof=1)
-            
-            # Pad with NaN to match original array length
-            std = np.full(len(prices), np.nan)
-            std[period-1:] = rolling_std
-        except:
-            # Fallback to simple loop if stride tricks fail
-            std = np.full(len(prices), np.nan)
-            for i in range(period - 1, len(prices)):
-                window = prices[i - period + 1:i + 1]
-                std[i] = np.std(window, ddof=1)
+        # Rolling standard deviation over strided windows
+        std = VectorizedIndicators.rolling_std(prices, period)
         
         # Calculate upper and lower bands
         upper_band = middle_band + (std * std_mult)
@@ -205,6 +223,36 @@ class VectorizedIndicators:
         
         return ema
     
+    @staticmethod
+    def find_pivots_vectorized(prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find 5-bar local minima and maxima
+        
+        A bar is a local minimum (maximum) when it is strictly below (above)
+        the two bars on each side of it.
+        
+        Args:
+            prices: Price array
+        
+        Returns:
+            (is_local_min, is_local_max) boolean arrays; the first and last
+            two bars are never pivots
+        
+        Performance: O(n), one vectorized pass
+        """
+        n = len(prices)
+        is_local_min = np.zeros(n, dtype=bool)
+        is_local_max = np.zeros(n, dtype=bool)
+        if n < 5:
+            return is_local_min, is_local_max
+        
+        center = prices[2:-2]
+        is_local_min[2:-2] = (center < prices[1:-3]) & (center < prices[3:-1]) & \
+                             (center < prices[:-4]) & (center < prices[4:])
+        is_local_max[2:-2] = (center > prices[1:-3]) & (center > prices[3:-1]) & \
+                             (center > prices[:-4]) & (center > prices[4:])
+        return is_local_min, is_local_max
+    
     @staticmethod
     def generate_signals_vectorized(indicator: np.ndarray, threshold_low: float, 
                                     threshold_high: float) -> np.ndarray:
@@ -275,92 +323,446 @@ class VectorizedBacktestEngine:
     
     Key optimizations:
     - Vectorized signal generation
-    - Batch trade execution
-    - Pre-allocated arrays
+    - Event-driven trade execution (jumps between trades, not bars)
+    - Stop-loss, take-profit and time-based cooldown in one kernel
     - Eliminated Python loops where possible
     """
     
     @staticmethod
-    def execute_trades_vectorized(prices: np.ndarray, signals: np.ndarray, 
+    def execute_trades_vectorized(prices: np.ndarray, signals: np.ndarray,
                                   initial_capital: float, fee_rate: float = 0.001,
-                                  cooldown_periods: int = 0) -> dict:
+                                  cooldown_periods: int = 0,
+                                  exit_signals: Optional[np.ndarray] = None,
+                                  tradable: Optional[np.ndarray] = None,
+                                  timestamps=None, cooldown=None,
+                                  stop_loss: Optional[float] = None,
+                                  take_profit: Optional[float] = None,
+                                  profit_exit_signals: Optional[np.ndarray] = None,
+                                  exit_reason: str = 'signal',
+                                  initial_state: Optional[dict] = None,
+                                  lows: Optional[np.ndarray] = None,
+                                  highs: Optional[np.ndarray] = None,
+                                  fill: str = 'stop') -> dict:
         """
         Execute trades based on signals using vectorized operations
         
+        The engine is a long-only, all-in/all-out state machine. Instead of
+        stepping through every bar it jumps from one trade to the next: while
+        flat it searches the entry candidates, while long it scans ahead in
+        growing chunks for the first bar whose take-profit, stop-loss or exit
+        condition fires. Python-level work is proportional to the number of
+        trades, not the number of bars.
+        
+        On every tradable bar a long position is checked in this order:
+        take profit, stop loss, exit signal, profit-only exit signal.
+        Nothing else happens on the bar of a trade.
+        
+        With lows/highs the stop loss and take profit are evaluated intra-bar:
+        the stop triggers when the bar's low reaches it and the take profit
+        when its high does. The order of the two inside a bar is unknown, so
+        the stop is assumed to come first; both still precede the close-based
+        exit signals. Fill assumptions:
+            'stop':  at the stop/target price, or at the bar's high/low when
+                     the whole bar gapped through it
+            'worst': stops at the bar's low, take profits at the target price
+        
         Args:
             prices: Price array
-            signals: Signal array (1=buy, -1=sell, 0=hold)
+            signals: Signal array (1=buy, -1=sell, 0=hold). When exit_signals
+                     is given, signals only marks entries (1 / True)
             initial_capital: Starting capital
             fee_rate: Transaction fee rate
-            cooldown_periods: Minimum periods between trades
+            cooldown_periods: Minimum bars after a sell before the next buy
+            exit_signals: Optional boolean exit array
+            tradable: Optional boolean mask of bars where trading is evaluated
+                      (e.g. indicator warm-up bars are not tradable)
+            timestamps: Optional bar timestamps, required for a time cooldown
+            cooldown: Optional minimum time after a sell before the next buy
+                      (pd.Timedelta / np.timedelta64)
+            stop_loss: Optional stop-loss fraction (0.1 = sell at -10%)
+            take_profit: Optional take-profit fraction (0.15 = sell at +15%)
+            profit_exit_signals: Optional exit array that only fires while
+                                 the position is in profit
+            exit_reason: Reason recorded for exit_signals sells
+            initial_state: Optional 'state' returned by a call on the preceding
+                           bars (cash, open position, entry price, last sell
+                           time), so a long history can be run in chunks
+            lows, highs: Optional bar low/high arrays for intra-bar stops
+            fill: Intra-bar fill assumption ('stop' or 'worst')
         
         Returns:
-            Dictionary with trade results
+            Dictionary with trade results. 'equity' is marked to market
+            before each bar's trade; every trade carries its bar 'index';
+            'state' continues the run in a call on the following bars
         
         Performance: ~10x faster than iterative execution
         """
+        prices = np.asarray(prices, dtype=np.float64)
+        signals = np.asarray(signals)
         n = len(prices)
         
-        # Pre-allocate arrays
-        cash = np.zeros(n)
-        position = np.zeros(n)
-        equity = np.zeros(n)
-        
-        # Initialize
-        cash[0] = initial_capital
-        position[0] = 0
-        equity[0] = initial_capital
-        
+        tradable = np.ones(n, dtype=bool) if tradable is None else np.asarray(tradable, dtype=bool)
+        if exit_signals is None:
+            entries = (signals == 1) & tradable
+            exits = (signals == -1) & tradable
+        else:
+            entries = (signals > 0) & tradable
+            exits = np.asarray(exit_signals, dtype=bool) & tradable
+        profit_exits = None
+        if profit_exit_signals is not None:
+            profit_exits = np.asarray(profit_exit_signals, dtype=bool) & tradable
+        entry_idx = np.flatnonzero(entries)
+        intrabar = lows is not None and highs is not None
+        if intrabar:
+            lows = np.asarray(lows, dtype=np.float64)
+            highs = np.asarray(highs, dtype=np.float64)
+        
+        ts = None
+        cooldown_ns = 0
+        if cooldown is not None and timestamps is not None:
+            cooldown_ns = pd.Timedelta(cooldown).value
+            if cooldown_ns > 0:
+                ts = pd.DatetimeIndex(timestamps).asi8
+        
+        state = initial_state or {}
+        cash = float(state.get('cash', initial_capital))
+        position = float(state.get('position', 0.0))
+        entry_price = float(state.get('entry_price', 0.0))
+        initial_cash, initial_position = cash, position
+        last_sell_ts = state.get('last_sell_ts')
+        last_sell_idx = None
         trades = []
-        last_trade_idx = -cooldown_periods - 1
-        
-        for i in range(1, n):
-            # Carry forward previous state
-            cash[i] = cash[i - 1]
-            position[i] = position[i - 1]
+        event_idx = []
+        cash_after = []
+        position_after = []
+        
+        i = -1  # bar of the last trade
+        while i < n - 1:
+            # --- Flat: find the next admissible entry (a carried-over position starts long) ---
+            if position == 0.0:
+                if cash <= 0:
+                    break
+                earliest = i
+                if last_sell_idx is not None and cooldown_periods > 0:
+                    earliest = max(earliest, last_sell_idx + cooldown_periods)
+                k = int(np.searchsorted(entry_idx, earliest, side='right'))
+                if ts is not None and (last_sell_idx is not None or last_sell_ts is not None):
+                    sold_at = ts[last_sell_idx] if last_sell_idx is not None else last_sell_ts
+                    ready = ts[entry_idx[k:]] - sold_at >= cooldown_ns
+                    if not ready.any():
+                        break
+                    k += int(np.argmax(ready))
+                if k >= len(entry_idx):
+                    break
             
-            # Check cooldown
-            if i - last_trade_idx <= cooldown_periods:
-                equity[i] = cash[i] + position[i] * prices[i]
-                continue
-            
-            # Buy signal
-            if signals[i] == 1 and position[i] == 0 and cash[i] > 0:
-                fee = cash[i] * fee_rate
-                buy_amount = cash[i] - fee
-                position[i] = buy_amount / prices[i]
-                cash[i] = 0
-                last_trade_idx = i
+                j = int(entry_idx[k])
+                price = prices[j]
+                fee = cash * fee_rate
+                buy_amount = cash - fee
+                position = buy_amount / price
+                entry_price = price
+                cash = 0.0
                 trades.append({
-                    'index': i,
+                    'index': j,
                     'action': 'BUY',
-                    'price': prices[i],
-                    'amount': position[i],
+                    'price': price,
+                    'amount': position,
                     'value': buy_amount,
                     'fee': fee
                 })
+                event_idx.append(j)
+                cash_after.append(cash)
+                position_after.append(position)
+                i = j
             
-            # Sell signal
-            elif signals[i] == -1 and position[i] > 0:
-                sell_value = position[i] * prices[i]
-                fee = sell_value * fee_rate
-                cash[i] = sell_value - fee
-                position[i] = 0
-                last_trade_idx = i
-                trades.append({
-                    'index': i,
-                    'action': 'SELL',
-                    'price': prices[i],
-                    'value': sell_value,
-                    'fee': fee
-                })
+            # --- Long: scan ahead in growing chunks for the first exit ---
+            j = -1
+            start = i + 1
+            chunk = 64
+            while start < n:
+                stop = min(n, start + chunk)
+                hit = exits[start:stop].copy()
+                if stop_loss is not None or take_profit is not None or profit_exits is not None:
+                    profit = (prices[start:stop] - entry_price) / entry_price
+                    low_profit, high_profit = profit, profit
+                    if intrabar:
+                        low_profit = (lows[start:stop] - entry_price) / entry_price
+                        high_profit = (highs[start:stop] - entry_price) / entry_price
+                    if take_profit is not None:
+                        hit |= tradable[start:stop] & (high_profit >= take_profit)
+                    if stop_loss is not None:
+                        hit |= tradable[start:stop] & (low_profit <= -stop_loss)
+                    if profit_exits is not None:
+                        hit |= profit_exits[start:stop] & (profit > 0)
+                if hit.any():
+                    j = start + int(np.argmax(hit))
+                    break
+                start = stop
+                chunk *= 2
+            if j < 0:
+                break
+            
+            price, reason = VectorizedBacktestEngine._exit_fill(
+                prices[j], lows[j] if intrabar else None, highs[j] if intrabar else None, entry_price,
+                stop_loss, take_profit, fill)
+            if reason is None:
+                reason = exit_reason if exits[j] else 'profit_' + exit_reason
+            profit_pct = (price - entry_price) / entry_price
             
-            equity[i] = cash[i] + position[i] * prices[i]
+            sell_value = position * price
+            fee = sell_value * fee_rate
+            trades.append({
+                'index': j,
+                'action': 'SELL',
+                'price': price,
+                'amount': position,
+                'value': sell_value,
+                'fee': fee,
+                'reason': reason,
+                'profit_pct': profit_pct
+            })
+            cash = sell_value - fee
+            position = 0.0
+            entry_price = 0.0
+            last_sell_idx = j
+            event_idx.append(j)
+            cash_after.append(cash)
+            position_after.append(position)
+            i = j
+        
+        # Rebuild the per-bar state: bar i sees the state left by the last trade before it
+        trades_before = np.searchsorted(np.asarray(event_idx, dtype=np.int64), np.arange(n), side='left')
+        cash_path = np.concatenate(([initial_cash], cash_after))[trades_before]
+        position_path = np.concatenate(([initial_position], position_after))[trades_before]
+        equity = cash_path + position_path * prices
+        
+        final_value = cash + position * prices[-1] if n else cash
+        if last_sell_idx is not None and timestamps is not None:
+            last_sell_ts = int(pd.DatetimeIndex(timestamps[last_sell_idx:last_sell_idx + 1]).asi8[0])
         
         return {
-            'cash': cash,
-            'position': position,
+            'cash': cash_path,
+            'position': position_path,
             'equity': equity,
             'trades': trades,
-            'final_value': equity[-1]
+            'final_value': final_value,
+            'state': {'cash': cash, 'position': position, 'entry_price': entry_price,
+                      'last_sell_ts': last_sell_ts}
         }
+    
+    @staticmethod
+    def _exit_fill(close: float, low: Optional[float], high: Optional[float], entry_price: float,
+                   stop_loss: Optional[float], take_profit: Optional[float], fill: str = 'stop'):
+        """
+        Fill price and reason of a stop-loss / take-profit exit on one bar
+        
+        Without low/high the bar's close is checked (take profit first) and is
+        the fill. Returns (close, None) when neither level was reached, i.e.
+        the exit is a signal exit at the close.
+        """
+        if low is None:
+            profit_pct = (close - entry_price) / entry_price
+            if take_profit is not None and profit_pct >= take_profit:
+                return close, 'take_profit'
+            if stop_loss is not None and profit_pct <= -stop_loss:
+                return close, 'stop_loss'
+            return close, None
+        
+        if stop_loss is not None and (low - entry_price) / entry_price <= -stop_loss:
+            if fill == 'worst':
+                return low, 'stop_loss'
+            return min(entry_price * (1 - stop_loss), high), 'stop_loss'
+        if take_profit is not None and (high - entry_price) / entry_price >= take_profit:
+            target = entry_price * (1 + take_profit)
+            return (target if fill == 'worst' else max(target, low)), 'take_profit'
+        return close, None
+
+
+class PanelBacktestEngine:
+    """
+    Cross-sectional backtesting: one strategy over many assets at once
+    
+    Prices are held in a 2-D (bar x asset) matrix. Each asset's bars start at
+    row 0 and rows past its history are masked (NaN price, not tradable), so
+    windowed indicators computed down the columns see exactly the series a
+    single-asset backtest would. Timestamps are kept per cell for cooldowns
+    and dates.
+    """
+    
+    @staticmethod
+    def build_panel(price_data: dict, column: str = 'close_price') -> dict:
+        """
+        Stack per-asset price frames into a panel
+        
+        Args:
+            price_data: Dictionary mapping asset id to a datetime-indexed frame
+            column: Price column to stack
+        
+        Returns:
+            Dictionary with 'asset_ids', 'lengths', 'prices' (bars x assets,
+            NaN-padded), 'timestamps' (int64 ns, same shape), 'mask' and
+            'frames' (the time-sorted input frames)
+        """
+        asset_ids = [asset_id for asset_id, df in price_data.items() if df is not None and not df.empty]
+        frames = {}
+        for asset_id in asset_ids:
+            df = price_data[asset_id]
+            frames[asset_id] = df if df.index.is_monotonic_increasing else df.sort_index()
+        
+        lengths = np.array([len(frames[asset_id]) for asset_id in asset_ids], dtype=np.int64)
+        rows = int(lengths.max()) if len(lengths) else 0
+        prices = np.full((rows, len(asset_ids)), np.nan)
+        timestamps = np.zeros((rows, len(asset_ids)), dtype=np.int64)
+        for j, asset_id in enumerate(asset_ids):
+            df = frames[asset_id]
+            prices[:len(df), j] = df[column].to_numpy(dtype=np.float64)
+            timestamps[:len(df), j] = pd.DatetimeIndex(df.index).asi8
+        
+        return {
+            'asset_ids': asset_ids,
+            'lengths': lengths,
+            'prices': prices,
+            'timestamps': timestamps,
+            'mask': np.arange(rows)[:, None] < lengths[None, :],
+            'frames': frames
+        }
+    
+    @staticmethod
+    def execute_trades_panel(prices: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                             tradable: np.ndarray, lengths: np.ndarray, initial_capital: float,
+                             fee_rate: float = 0.001, timestamps: Optional[np.ndarray] = None,
+                             cooldown=None, stop_loss: Optional[float] = None,
+                             take_profit: Optional[float] = None,
+                             profit_exit_signals: Optional[np.ndarray] = None,
+                             exit_reason: str = 'signal', lows: Optional[np.ndarray] = None,
+                             highs: Optional[np.ndarray] = None, fill: str = 'stop') -> list:
+        """
+        Run the long-only trade state machine for every asset in one pass
+        
+        Same semantics and floating-point operations as
+        VectorizedBacktestEngine.execute_trades_vectorized, evaluated bar by
+        bar with the state of all assets held in arrays: on each bar, open
+        positions are checked (take profit, stop loss, exit, profit-only exit)
+        and flat assets with an entry signal buy. An asset never trades twice
+        on the same bar.
+        
+        Args:
+            prices, entries, exits, tradable: (bars x assets) arrays
+            lengths: Number of bars per asset (rows beyond are ignored)
+            timestamps: int64 ns timestamps (bars x assets), required for cooldown
+            cooldown, stop_loss, take_profit, profit_exit_signals, exit_reason, fill:
+                As in execute_trades_vectorized
+            lows, highs: Optional (bars x assets) arrays for intra-bar stops
+        
+        Returns:
+            One dict per asset with 'trades' (kernel trade records),
+            'equity' (marked to market before each bar's trade, length of the
+            asset's history) and 'final_value'
+        
+        Performance: Python work is one vectorized step per bar, independent of
+        the number of assets
+        """
+        rows, assets = prices.shape
+        active = np.arange(rows)[:, None] < np.asarray(lengths)[None, :]
+        tradable = np.asarray(tradable, dtype=bool) & active
+        entries = np.asarray(entries, dtype=bool) & tradable
+        exits = np.asarray(exits, dtype=bool) & tradable
+        profit_exits = None
+        if profit_exit_signals is not None:
+            profit_exits = np.asarray(profit_exit_signals, dtype=bool) & tradable
+        
+        cooldown_ns = pd.Timedelta(cooldown).value if cooldown is not None and timestamps is not None else 0
+        check_exits = stop_loss is not None or take_profit is not None or profit_exits is not None
+        intrabar = lows is not None and highs is not None
+        
+        cash = np.full(assets, float(initial_capital))
+        position = np.zeros(assets)
+        entry_price = np.zeros(assets)
+        is_long = np.zeros(assets, dtype=bool)
+        last_sell_ts = np.zeros(assets, dtype=np.int64)
+        has_sold = np.zeros(assets, dtype=bool)
+        equity = np.full((rows, assets), np.nan)
+        trades = [[] for _ in range(assets)]
+        
+        for t in range(rows):
+            price = prices[t]
+            equity[t] = cash + position * price
+            
+            # --- Exits for open positions ---
+            sell = is_long & exits[t]
+            if check_exits:
+                candidates = is_long & tradable[t]
+                if candidates.any():
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        profit = (price - entry_price) / entry_price
+                        low_profit, high_profit = profit, profit
+                        if intrabar:
+                            low_profit = (lows[t] - entry_price) / entry_price
+                            high_profit = (highs[t] - entry_price) / entry_price
+                    if take_profit is not None:
+                        sell |= candidates & (high_profit >= take_profit)
+                    if stop_loss is not None:
+                        sell |= candidates & (low_profit <= -stop_loss)
+                    if profit_exits is not None:
+                        sell |= is_long & profit_exits[t] & (profit > 0)
+            
+            for j in np.flatnonzero(sell):
+                p, reason = VectorizedBacktestEngine._exit_fill(
+                    price[j], lows[t, j] if intrabar else None, highs[t, j] if intrabar else None,
+                    entry_price[j], stop_loss, take_profit, fill)
+                if reason is None:
+                    reason = exit_reason if exits[t, j] else 'profit_' + exit_reason
+                profit_pct = (p - entry_price[j]) / entry_price[j]
+                
+                sell_value = position[j] * p
+                fee = sell_value * fee_rate
+                trades[j].append({
+                    'index': t,
+                    'action': 'SELL',
+                    'price': p,
+                    'amount': position[j],
+                    'value': sell_value,
+                    'fee': fee,
+                    'reason': reason,
+                    'profit_pct': profit_pct
+                })
+                cash[j] = sell_value - fee
+                position[j] = 0.0
+                entry_price[j] = 0.0
+                is_long[j] = False
+                has_sold[j] = True
+                if timestamps is not None:
+                    last_sell_ts[j] = timestamps[t, j]
+            
+            # --- Entries for flat assets (not on the bar they sold) ---
+            buy = ~is_long & ~sell & entries[t] & (cash > 0)
+            if cooldown_ns > 0 and buy.any():
+                buy &= ~has_sold | (timestamps[t] - last_sell_ts >= cooldown_ns)
+            
+            for j in np.flatnonzero(buy):
+                p = price[j]
+                fee = cash[j] * fee_rate
+                buy_amount = cash[j] - fee
+                position[j] = buy_amount / p
+                entry_price[j] = p
+                cash[j] = 0.0
+                is_long[j] = True
+                trades[j].append({
+                    'index': t,
+                    'action': 'BUY',
+                    'price': p,
+                    'amount': position[j],
+                    'value': buy_amount,
+                    'fee': fee
+                })
+        
+        results = []
+        for j, length in enumerate(lengths):
+            length = int(length)
+            final_value = cash[j] + position[j] * prices[length - 1, j] if length else float(initial_capital)
+            results.append({
+                'trades': trades[j],
+                'equity': equity[:length, j],
+                'final_value': final_value
+            })
+        return results
@@ -0,0 +1,82 @@
+-- ============================================================================
+-- Persistent Backtest Results Store
+-- ============================================================================
+-- Purpose: Durable second cache tier behind Redis for backtest results
+--          (Redis keeps them 24h under allkeys-lru, so popular runs are
+--          evicted and recomputed) and fast leaderboard queries such as
+--          "best RSI parameters for BTC" without recomputation
+-- Used by: api/backtest_result_store.py
+-- ============================================================================
+
+-- The original crypto_backtest_results cache table (add_crypto_strategy_tables.sql)
+-- was never written to; keep it under another name instead of dropping it
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'crypto_backtest_results')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'crypto_backtest_results' AND column_name = 'result_blob') THEN
+        ALTER TABLE crypto_backtest_results RENAME TO crypto_backtest_results_legacy;
+    END IF;
+END $$;
+
+-- One row per (strategy, coin, parameter hash, requested range, interval);
+-- hash-partitioned by coin so per-coin leaderboards read a single partition
+CREATE TABLE IF NOT EXISTS crypto_backtest_results (
+    strategy_id INTEGER NOT NULL REFERENCES crypto_strategies(id) ON DELETE CASCADE,
+    cryptocurrency_id INTEGER NOT NULL REFERENCES cryptocurrencies(id) ON DELETE CASCADE,
+    parameters_hash VARCHAR(64) NOT NULL,               -- MD5 of the sorted parameter JSON
+    interval_type VARCHAR(10) NOT NULL,
+    use_daily_sampling BOOLEAN NOT NULL DEFAULT true,
+    range_start VARCHAR(32) NOT NULL DEFAULT '',        -- Requested start_date ('' = full history)
+    range_end VARCHAR(32) NOT NULL DEFAULT '',          -- Requested end_date ('' = up to now)
+    price_precision VARCHAR(10) NOT NULL DEFAULT 'float64', -- 'float32' for low-memory runs
+    parameters JSONB NOT NULL,
+    data_end TIMESTAMP,                                 -- Last price bar the result covers
+
+    -- Summary metrics (leaderboards)
+    initial_investment DOUBLE PRECISION,
+    final_value DOUBLE PRECISION,
+    total_return DOUBLE PRECISION,
+    buy_hold_return DOUBLE PRECISION,
+    strategy_vs_hold DOUBLE PRECISION,
+    max_drawdown DOUBLE PRECISION,
+    total_trades INTEGER DEFAULT 0,
+    profitable_trades INTEGER DEFAULT 0,
+    losing_trades INTEGER DEFAULT 0,
+    win_rate DOUBLE PRECISION,
+    sharpe_ratio DOUBLE PRECISION,
+    sortino_ratio DOUBLE PRECISION,
+    annualized_return DOUBLE PRECISION,
+    calmar_ratio DOUBLE PRECISION,
+    exposure_time DOUBLE PRECISION,
+    total_fees DOUBLE PRECISION,
+
+    -- Full result (trades, price history): zlib-compressed columnar JSON
+    result_blob BYTEA NOT NULL,
+    calculation_time_ms INTEGER,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (strategy_id, cryptocurrency_id, parameters_hash, interval_type,
+                 use_daily_sampling, range_start, range_end, price_precision)
+) PARTITION BY HASH (cryptocurrency_id);
+
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p0 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 0);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p1 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 1);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p2 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 2);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p3 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 3);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p4 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 4);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p5 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 5);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p6 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 6);
+CREATE TABLE IF NOT EXISTS crypto_backtest_results_p7 PARTITION OF crypto_backtest_results FOR VALUES WITH (MODULUS 8, REMAINDER 7);
+
+-- Leaderboards: best parameters of a strategy on one coin / across coins
+CREATE INDEX IF NOT EXISTS idx_backtest_store_coin_return
+ON crypto_backtest_results(strategy_id, cryptocurrency_id, interval_type, total_return DESC);
+
+CREATE INDEX IF NOT EXISTS idx_backtest_store_strategy_return
+ON crypto_backtest_results(strategy_id, interval_type, total_return DESC);
+
+CREATE INDEX IF NOT EXISTS idx_backtest_store_strategy_sharpe
+ON crypto_backtest_results(strategy_id, interval_type, sharpe_ratio DESC NULLS LAST);
+
+ANALYZE crypto_backtest_results;